@@ -14,15 +14,25 @@
 
 int main(void)
 {
+#ifndef ML_CODE_PAGES
     Char *str;
+#endif
     size_t len, i;
 
     ML_setLang(L_English);
+#ifndef ML_CODE_PAGES
     ML_getMsgStr(MSG_English, &str, &len);
+#else
+    len = ML_getMsgLen(MSG_English);
+#endif
     printf("len: %d\n", (int)len);
     printf("str: ");
     for (i=0; i<len; ++i) {
+#ifndef ML_CODE_PAGES
         printf("%d,", str[i]);
+#else
+        printf("%d,", ML_getMsgChar(MSG_English, i));
+#endif
     }
     printf("\n");
 
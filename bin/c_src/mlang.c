@@ -20,6 +20,12 @@ static const uint16_t _pack[] = {
 #define LANGS _pack[1]
 #define LANG_OFFSET (&_pack[2])
 
+#ifdef ML_MSG_ORDER
+#define SLOT(m) (LANG_OFFSET[LANGS + 1 + (m)])
+#else
+#define SLOT(m) (m)
+#endif
+
 
 static Lang _lang;
 
@@ -32,6 +38,15 @@ void ML_setLang(Lang lang)
 }
 
 
+/** Gets current language. */
+Lang ML_getLang(void)
+{
+    return _lang;
+}
+
+
+#ifndef ML_CODE_PAGES
+
 /** Gets Char string of a given message.
  * @param m message ID
  * @param str buffer of the Char string of the message
@@ -43,6 +58,62 @@ void ML_getMsgStr(MsgID m, Char** str, size_t* len)
 
     assert (m < MSGS);
 
-    *str = (Char*)&msgOffset[msgOffset[m]];
-    *len = msgOffset[m+1] - msgOffset[m];
+    *str = (Char*)&msgOffset[msgOffset[SLOT(m)]];
+    *len = msgOffset[SLOT(m)+1] - msgOffset[SLOT(m)];
+}
+
+#else // ML_CODE_PAGES
+
+#define LANG_BASE(lang) (&LANG_OFFSET[LANG_OFFSET[lang]])
+#define CODE_PAGE_SIZE(base) ((base)[0])
+#define MSG_OFFSET(base) (&(base)[1 + CODE_PAGE_SIZE(base)])
+#define TEXT(base) (&MSG_OFFSET(base)[MSGS + 1])
+
+
+/** Gets the code page of a given language.
+ * @param lang language ID
+ * @param page buffer of the code page; a code page maps a 8-bit char of the
+ *      language to a Char
+ * @param len size of the code page; 0 denotes the language has no code page
+ *      and its messages are of Chars
+ */
+void ML_getCodePage(Lang lang, const uint16_t** page, size_t* len)
+{
+    const uint16_t *base = LANG_BASE(lang);
+
+    assert (lang < LANGS);
+
+    *page = &base[1];
+    *len = CODE_PAGE_SIZE(base);
+}
+
+
+/** Gets the length of a given message. */
+size_t ML_getMsgLen(MsgID m)
+{
+    const uint16_t *msgOffset = MSG_OFFSET(LANG_BASE(_lang));
+
+    assert (m < MSGS);
+
+    return msgOffset[SLOT(m)+1] - msgOffset[SLOT(m)];
+}
+
+
+/** Gets a Char of a given message.
+ * @param m message ID
+ * @param i index of the char in the message
+ */
+Char ML_getMsgChar(MsgID m, size_t i)
+{
+    const uint16_t *base = LANG_BASE(_lang);
+    const uint16_t *text = TEXT(base);
+    size_t pos = MSG_OFFSET(base)[SLOT(m)] + i;
+
+    assert (i < ML_getMsgLen(m));
+
+    if (CODE_PAGE_SIZE(base) == 0)
+        return text[pos];
+    return base[1 + ((text[pos >> 1] >> ((pos & 1) << 3)) & 0xFF)];
 }
+
+#endif // ML_CODE_PAGES
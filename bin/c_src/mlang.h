@@ -19,7 +19,14 @@
 typedef uint16_t Char;
 
 void ML_setLang(Lang);
+Lang ML_getLang(void);
+#ifndef ML_CODE_PAGES
 void ML_getMsgStr(MsgID, Char**, size_t* len);
+#else
+void ML_getCodePage(Lang, const uint16_t** page, size_t* len);
+size_t ML_getMsgLen(MsgID);
+Char ML_getMsgChar(MsgID, size_t i);
+#endif
 
 
 #endif
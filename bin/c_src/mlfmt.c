@@ -0,0 +1,191 @@
+/**
+ * @file mlfmt.c
+ *      for assembling multi-language messages with arguments from the
+ *      segments of their placeholders, without parsing formats (see
+ *      segments.py for the format, and the --formats option of pack command
+ *      to generate mfmt.i)
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+#include <assert.h>
+
+#include "mlfmt.h"
+
+
+#ifndef MLF_FMT_FILE
+#define MLF_FMT_FILE "mfmt.i"   /* the format table of the --formats option */
+#endif
+
+static const uint16_t _fmt[] = {
+    #include MLF_FMT_FILE
+};
+
+
+#define MSGS _fmt[0]
+#define LANGS _fmt[1]
+#define DIGITS (&_fmt[2])
+#define UPPER_DIGITS (&DIGITS[16 - 10])
+#define MINUS DIGITS[22]
+#define SPACE DIGITS[23]
+#define LANG_OFFSET (&_fmt[2 + 24])
+
+#define IS_SLOT(w) ((w) & 0x8000)
+#define SLOT_TYPE(w) (((w) >> 12) & 0x7)
+#define SLOT_ARG(w) (((w) >> 8) & 0xF)
+#define SLOT_ZERO(w) ((w) & 0x80)
+#define SLOT_LEFT(w) ((w) & 0x40)
+#define SLOT_WIDTH(w) ((w) & 0x3F)
+
+enum { T_INT, T_UINT, T_HEX, T_UPPER_HEX, T_OCT, T_STR, T_CHAR };
+
+
+/** A buffer of an assembled message. */
+typedef struct {
+    Char* buf;
+    size_t size;
+    size_t len;     /* the length of the message, which may exceed size */
+} Out;
+
+
+static void _put(Out* out, Char c)
+{
+    if (out->len < out->size)
+        out->buf[out->len] = c;
+    ++out->len;
+}
+
+
+static void _pad(Out* out, Char c, size_t n)
+{
+    while (n-- > 0)
+        _put(out, c);
+}
+
+
+/** Puts a number of a slot. */
+static void _putNum(Out* out, uint16_t slot, uint32_t n, int neg)
+{
+    static const unsigned bases[] = {10, 10, 16, 16, 8};
+    unsigned base = bases[SLOT_TYPE(slot)];
+    Char digits[11];
+    size_t k = 0, len, pad;
+
+    do {
+        unsigned d = n % base;
+        digits[k++] = (SLOT_TYPE(slot) == T_UPPER_HEX && d >= 10) ?
+            UPPER_DIGITS[d] : DIGITS[d];
+        n /= base;
+    } while (n != 0);
+
+    len = k + (neg ? 1 : 0);
+    pad = SLOT_WIDTH(slot) > len ? SLOT_WIDTH(slot) - len : 0;
+    if (!SLOT_LEFT(slot) && !SLOT_ZERO(slot)) {
+        _pad(out, SPACE, pad);
+        pad = 0;
+    }
+    if (neg)
+        _put(out, MINUS);
+    if (!SLOT_LEFT(slot)) {
+        _pad(out, DIGITS[0], pad);
+        pad = 0;
+    }
+    while (k > 0)
+        _put(out, digits[--k]);
+    _pad(out, SPACE, pad);
+}
+
+
+/** Puts a Char string of a slot. */
+static void _putStr(Out* out, uint16_t slot, const Char* str, size_t len)
+{
+    size_t pad = SLOT_WIDTH(slot) > len ? SLOT_WIDTH(slot) - len : 0;
+    size_t i;
+
+    if (!SLOT_LEFT(slot))
+        _pad(out, SPACE, pad);
+    for (i = 0; i < len; ++i)
+        _put(out, str[i]);
+    if (SLOT_LEFT(slot))
+        _pad(out, SPACE, pad);
+}
+
+
+/** Puts the argument of a slot. */
+static void _putArg(Out* out, uint16_t slot, const MLArg* arg)
+{
+    switch (SLOT_TYPE(slot)) {
+    case T_INT:
+        if (arg->i < 0)
+            _putNum(out, slot, 0u - (uint32_t)arg->i, 1);
+        else
+            _putNum(out, slot, (uint32_t)arg->i, 0);
+        break;
+    case T_STR:
+        _putStr(out, slot, arg->s.str, arg->s.len);
+        break;
+    case T_CHAR:
+        _putStr(out, slot, &arg->c, 1);
+        break;
+    default:
+        _putNum(out, slot, arg->u, 0);
+        break;
+    }
+}
+
+
+/** Assembles a message of current language with arguments.
+ * A message without placeholders is copied as it is.
+ * @param m message ID
+ * @param args arguments by their numbers in the ENGLISH message, i.e.,
+ *      args[0] for "%1$d" or the first placeholder
+ * @param buf buffer of the Char string of the message
+ * @param size size of the buffer in Chars; the message is truncated to it
+ * @return the length of the message; a length over size denotes that the
+ *      message is truncated
+ */
+size_t MLF_formatMsg(MsgID m, const MLArg* args, Char* buf, size_t size)
+{
+    const uint16_t *segOffset, *seg, *end;
+    Out out;
+
+    assert (m < MSGS);
+
+    segOffset = &LANG_OFFSET[LANG_OFFSET[ML_getLang()]];
+    seg = &segOffset[MSGS + 1 + segOffset[m]];
+    end = &segOffset[MSGS + 1 + segOffset[m+1]];
+
+    out.buf = buf;
+    out.size = size;
+    out.len = 0;
+
+    if (seg == end) {
+#ifndef ML_CODE_PAGES
+        Char *str;
+        size_t len, i;
+
+        ML_getMsgStr(m, &str, &len);
+        for (i = 0; i < len; ++i)
+            _put(&out, str[i]);
+#else
+        size_t len = ML_getMsgLen(m), i;
+
+        for (i = 0; i < len; ++i)
+            _put(&out, ML_getMsgChar(m, i));
+#endif
+        return out.len;
+    }
+
+    while (seg < end) {
+        uint16_t w = *seg++;
+
+        if (IS_SLOT(w)) {
+            _putArg(&out, w, &args[SLOT_ARG(w)]);
+        } else {
+            while (w-- > 0)
+                _put(&out, *seg++);
+        }
+    }
+    return out.len;
+}
@@ -0,0 +1,34 @@
+/**
+ * @file mlfmt.h
+ *      for assembling multi-language messages with arguments
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+
+#ifndef __MLFMT_H
+#define __MLFMT_H
+
+#include <stdint.h>
+#include <stdlib.h>
+
+#include "mlang.h"
+
+
+/** An argument of a placeholder of a message. */
+typedef union {
+    int32_t i;          /**< of %d and %i */
+    uint32_t u;         /**< of %u, %x, %X, and %o */
+    Char c;             /**< of %c */
+    struct {
+        const Char* str;
+        size_t len;
+    } s;                /**< of %s, a Char string */
+} MLArg;
+
+
+size_t MLF_formatMsg(MsgID, const MLArg* args, Char* buf, size_t size);
+
+
+#endif
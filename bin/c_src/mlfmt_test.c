@@ -0,0 +1,113 @@
+/**
+ * @file mlfmt_test.c
+ *      Unit test of the mlfmt module; assembles the messages of the format
+ *      table of mlfmt_test.i, whose char indexes are ASCII codes
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+#include <stdio.h>
+#include <stdint.h>
+#include <string.h>
+
+#define MLF_FMT_FILE "mlfmt_test.i"
+#include "mlfmt.c"
+
+
+static Lang _lang;  /* the language of messages: 0 for ENGLISH, 1 for Other */
+
+static const Char _plain[] = {'P', 'l', 'a', 'i', 'n'};
+
+
+/* The messages of mlang.c, for a message without placeholders */
+Lang ML_getLang(void)
+{
+    return _lang;
+}
+
+#ifndef ML_CODE_PAGES
+void ML_getMsgStr(MsgID m, Char** str, size_t* len)
+{
+    (void)m;
+    *str = (Char*)_plain;
+    *len = sizeof _plain / sizeof _plain[0];
+}
+#else
+size_t ML_getMsgLen(MsgID m)
+{
+    (void)m;
+    return sizeof _plain / sizeof _plain[0];
+}
+
+Char ML_getMsgChar(MsgID m, size_t i)
+{
+    (void)m;
+    return _plain[i];
+}
+#endif
+
+
+/** Checks a message assembled into a buffer of a given size; returns 1 on
+ * failure. */
+static int _check(unsigned m, const MLArg* args, size_t size,
+                  const char* expected)
+{
+    Char buf[64];
+    size_t len = MLF_formatMsg((MsgID)m, args, buf, size);
+    size_t n = strlen(expected), i;
+    int ok = (len == n);
+
+    for (i = 0; ok && i < n && i < size; ++i)
+        ok = (buf[i] == (Char)expected[i]);
+    if (ok)
+        return 0;
+    printf("FAIL: message %u of language %d: \"", m, (int)_lang);
+    for (i = 0; i < len && i < size; ++i)
+        putchar((char)buf[i]);
+    printf("\" (%d chars) for \"%s\"\n", (int)len, expected);
+    return 1;
+}
+
+
+int main(void)
+{
+    static const Char disk[] = {'d', 'i', 's', 'k'};
+    static const Char ab[] = {'a', 'b'};
+    MLArg files[2], padded[6], percent[1];
+    int failures = 0;
+
+    files[0].s.str = disk;
+    files[0].s.len = sizeof disk / sizeof disk[0];
+    files[1].i = 3;
+
+    padded[0].s.str = ab;
+    padded[0].s.len = sizeof ab / sizeof ab[0];
+    padded[1].i = -42;
+    padded[2].i = 42;
+    padded[3].u = 255;
+    padded[4].u = 0xBEEF;
+    padded[5].u = 8;
+
+    percent[0].c = 'x';
+
+    _lang = (Lang)0;
+    failures += _check(0, files, 64, "disk has 3 files");
+    failures += _check(1, padded, 64, "[ab    |  -42|00042|ff  |BEEF|10]");
+    failures += _check(2, percent, 64, "100% of x");
+    failures += _check(3, NULL, 64, "Plain");
+
+    /* arguments reordered by a translation */
+    _lang = (Lang)1;
+    failures += _check(0, files, 64, "3 files in disk");
+    failures += _check(1, padded, 64, "[ab    |  -42|00042|ff  |BEEF|10]");
+    failures += _check(2, percent, 64, "x: 100%");
+    failures += _check(3, NULL, 64, "Plain");
+
+    /* truncated messages keep their lengths */
+    failures += _check(0, files, 4, "3 files in disk");
+    failures += _check(3, NULL, 2, "Plain");
+
+    printf("messages: %d, failures: %d\n", 10, failures);
+    return failures != 0;
+}
@@ -0,0 +1,35 @@
+// The format table of mlfmt_test.c, as the --formats option of pack command
+// generates it for the messages below, with the char index of each char
+// being its ASCII code.
+//
+//    ENGLISH                          Other
+//    "%s has %d files"                "%2$d files in %1$s"
+//    "[%-6s|%5d|%05d|%-4x|%X|%o]"     "[%-6s|%5d|%05d|%-4x|%X|%o]"
+//    "100%% of %c"                    "%c: 100%%"
+//    "Plain"                          "Plain"
+
+   4,   // the total messages of a language
+   2,   // the total number of languages
+
+// The chars of "0123456789abcdefABCDEF- "
+  48,  49,  50,  51,  52,  53,  54,  55,  56,  57,  97,  98,
+  99, 100, 101, 102,  65,  66,  67,  68,  69,  70,  45,  32,
+
+// The offsets of languages
+   3,  53,  99,
+
+// English segment offsets of messages
+   0,  15,  35,  45,  45,
+
+// English segments of parameterized messages
+53248,   5,  32, 104,  97, 115,  32,33024,   6,  32, 102, 105, 108, 101, 115,
+   1,  91,53318,   1, 124,33029,   1, 124,33413,   1, 124,41796,   1, 124,46080,   1, 124,50432,   1,  93,
+   8,  49,  48,  48,  37,  32, 111, 102,  32,57344,
+
+// Other segment offsets of messages
+   0,  13,  33,  41,  41,
+
+// Other segments of parameterized messages
+33024,  10,  32, 102, 105, 108, 101, 115,  32, 105, 110,  32,53248,
+   1,  91,53318,   1, 124,33029,   1, 124,33413,   1, 124,41796,   1, 124,46080,   1, 124,50432,   1,  93,
+57344,   6,  58,  32,  49,  48,  48,  37,
\ No newline at end of file
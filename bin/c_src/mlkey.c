@@ -0,0 +1,61 @@
+/**
+ * @file mlkey.c
+ *      for looking message IDs up by their names with a minimal perfect hash
+ *      (see perfhash.py for the hash, and the --keys option of msg_id
+ *      command to generate MsgKey.i)
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+#include <stdint.h>
+#include <string.h>
+
+#include "mlkey.h"
+
+#include "MsgKey.i"
+
+
+#define FNV_BASIS 0x811C9DC5u
+#define FNV_PRIME 0x01000193u
+#define SLOT_SEED 0x5BD1E995u
+
+
+/** Returns the FNV-1a hash of a string with the offset basis xored with a
+ * seed. */
+static uint32_t _hash(const char* key, uint32_t seed)
+{
+    uint32_t h = FNV_BASIS ^ seed;
+
+    while (*key != '\0')
+        h = (h ^ (uint8_t)*key++) * FNV_PRIME;
+    return h;
+}
+
+
+/** Returns a hash mixed by the finalizer of MurmurHash3. */
+static uint32_t _mix(uint32_t h)
+{
+    h ^= h >> 16;
+    h *= 0x85EBCA6Bu;
+    h ^= h >> 13;
+    h *= 0xC2B2AE35u;
+    return h ^ (h >> 16);
+}
+
+
+/** Gets the message ID of a given name.
+ * @param key name of a message ID without "MSG_", e.g., "SaveSettings"
+ * @return the message ID; MSG_End if no message ID is of the name
+ */
+MsgID MLK_getMsgID(const char* key)
+{
+    int32_t seed = _mlkSeeds[_hash(key, 0) % MLK_KEYS];
+    uint32_t slot;
+
+    if (seed < 0)
+        slot = (uint32_t)(-seed - 1);
+    else
+        slot = _mix(_hash(key, SLOT_SEED) ^ (uint32_t)seed) % MLK_KEYS;
+    return strcmp(key, _mlkKeys[slot]) == 0 ? _mlkIDs[slot] : MSG_End;
+}
@@ -0,0 +1,19 @@
+/**
+ * @file mlkey.h
+ *      for looking message IDs up by their names
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+
+#ifndef __MLKEY_H
+#define __MLKEY_H
+
+#include "MsgID.h"
+
+
+MsgID MLK_getMsgID(const char* key);
+
+
+#endif
@@ -0,0 +1,65 @@
+/**
+ * @file mlkey_test.c
+ *      Unit test of the mlkey module; checks every key of MsgKey.i
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+#include <stdio.h>
+#include <stdint.h>
+#include <string.h>
+
+#include "mlkey.h"
+
+#include "MsgKey.i"
+
+
+static const char* _keyOf[MSG_Total];  /* the key of each message ID */
+
+
+/** Checks the message ID of a given name; returns 1 on failure. */
+static int _check(const char* key)
+{
+    MsgID m = MLK_getMsgID(key);
+
+    if (m == MSG_End || (m < MSG_Total && _keyOf[m] != NULL
+            && strcmp(key, _keyOf[m]) == 0))
+        return 0;
+    printf("FAIL: \"%s\"\n", key);
+    return 1;
+}
+
+
+int main(void)
+{
+    char key[256];
+    size_t i, n;
+    int failures = 0;
+
+    for (i = 0; i < MLK_KEYS; ++i)
+        _keyOf[_mlkIDs[i]] = _mlkKeys[i];
+
+    for (i = 0; i < MLK_KEYS; ++i) {
+        if (MLK_getMsgID(_mlkKeys[i]) != _mlkIDs[i]) {
+            printf("FAIL: \"%s\" not found\n", _mlkKeys[i]);
+            ++failures;
+        }
+
+        /* keys with their last char changed or removed are not found, or
+         * found as other keys */
+        n = strlen(_mlkKeys[i]);
+        if (n == 0 || n >= sizeof key)
+            continue;
+        memcpy(key, _mlkKeys[i], n + 1);
+        key[n-1] ^= 0x20;
+        failures += _check(key);
+        key[n-1] = '\0';
+        failures += _check(key);
+    }
+    failures += _check("");
+    failures += _check("MSG_End");
+
+    printf("keys: %d, failures: %d\n", MLK_KEYS, failures);
+    return failures != 0;
+}
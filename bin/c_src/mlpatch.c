@@ -0,0 +1,105 @@
+/**
+ * @file mlpatch.c
+ *      for applying a patch of packed multi-language messages in place
+ *      (see packdiff.py for the patch format)
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+#include <string.h>
+
+#include "mlpatch.h"
+
+
+typedef struct {
+    const uint8_t *p;
+    const uint8_t *end;
+} Reader;
+
+
+/** Reads an unsigned LEB128 varint; sets the reader to NULL on overrun. */
+static uint32_t _readVarint(Reader* r)
+{
+    uint32_t n = 0;
+    unsigned shift = 0;
+
+    while (r->p != NULL && r->p < r->end && shift < 32) {
+        uint8_t b = *r->p++;
+        n |= (uint32_t)(b & 0x7F) << shift;
+        if (b < 0x80)
+            return n;
+        shift += 7;
+    }
+    r->p = NULL;
+    return 0;
+}
+
+
+/** Returns the CRC-32 of words in little endian. */
+static uint32_t _crc32(const uint16_t* words, size_t len)
+{
+    uint32_t crc = 0xFFFFFFFF;
+    size_t i;
+    int k;
+
+    for (i = 0; i < 2*len; ++i) {
+        crc ^= (words[i >> 1] >> ((i & 1) << 3)) & 0xFF;
+        for (k = 0; k < 8; ++k)
+            crc = (crc >> 1) ^ (0xEDB88320 & (0 - (crc & 1)));
+    }
+    return ~crc;
+}
+
+
+/** Applies a patch to a pack in place.
+ * @param pack buffer holding the old pack
+ * @param capacity size of the buffer in words; it should hold both the old
+ *      and the new pack
+ * @param patch the patch
+ * @param size size of the patch in bytes
+ * @return the number of words of the new pack; 0 if the patch does not match
+ *      the old pack, or the new pack does not match the patch
+ */
+size_t MLP_apply(uint16_t* pack, size_t capacity,
+                 const uint8_t* patch, size_t size)
+{
+    Reader r;
+    uint32_t oldLen, newLen, oldCrc, newCrc, count, dst, src, len;
+
+    if (size < 4 || memcmp(patch, "MLP\x01", 4) != 0)
+        return 0;
+    r.p = patch + 4;
+    r.end = patch + size;
+
+    oldLen = _readVarint(&r);
+    newLen = _readVarint(&r);
+    oldCrc = _readVarint(&r);
+    newCrc = _readVarint(&r);
+    if (r.p == NULL || oldLen > capacity || newLen > capacity
+            || _crc32(pack, oldLen) != oldCrc)
+        return 0;
+
+    for (count = _readVarint(&r); r.p != NULL && count > 0; --count) {
+        dst = _readVarint(&r);
+        src = _readVarint(&r);
+        len = _readVarint(&r);
+        if (r.p == NULL || dst + len > capacity || src + len > capacity)
+            return 0;
+        memmove(&pack[dst], &pack[src], len * sizeof pack[0]);
+    }
+
+    for (count = _readVarint(&r); r.p != NULL && count > 0; --count) {
+        dst = _readVarint(&r);
+        len = _readVarint(&r);
+        if (r.p == NULL || dst + len > capacity
+                || (size_t)(r.end - r.p) < 2*len)
+            return 0;
+        for (; len > 0; --len, r.p += 2)
+            pack[dst++] = (uint16_t)(r.p[0] | (r.p[1] << 8));
+    }
+
+    if (r.p == NULL || _crc32(pack, newLen) != newCrc)
+        return 0;
+    return newLen;
+}
@@ -0,0 +1,21 @@
+/**
+ * @file mlpatch.h
+ *      for applying a patch of packed multi-language messages in place
+ * @author agent, agent@local
+ * @version 1.0
+ * @date 2026/10/19 (initial version)
+ * @date 2026/10/19 (last revision)
+ */
+
+#ifndef __MLPATCH_H
+#define __MLPATCH_H
+
+#include <stdint.h>
+#include <stdlib.h>
+
+
+size_t MLP_apply(uint16_t* pack, size_t capacity,
+                 const uint8_t* patch, size_t size);
+
+
+#endif
@@ -2,7 +2,9 @@ set c_dir=c_src
 
 del %c_dir%\LangID.h
 del %c_dir%\MsgID.h
+del %c_dir%\MsgKey.i
 del %c_dir%\mlang.i
+del %c_dir%\mfmt.i
 del verify.report
 del dic_trans.xls
 
@@ -9,8 +9,10 @@ echo =^> Generate a C header file (%tgt%) of language ID enumeration.
 
 set dic=dic.xls
 set tgt=%c_dir%\MsgID.h
-echo =^> Generate a C header file (%tgt%) of message ID enumeration.
-%langconv% msg_id -o%tgt% %dic%
+set key=%c_dir%\MsgKey.i
+echo =^> Generate a C header file (%tgt%) of message ID enumeration, and a C
+echo    included file (%key%) of the perfect hash of message ID names.
+%langconv% msg_id -o%tgt% --keys %key% %dic%
 
 set dic=dic.xls
 set lst=char.lst
@@ -23,7 +25,8 @@ set dic=dic.xls
 set lst=char.lst
 set tgt=%c_dir%\mlang.i
 echo =^> Generate a C included file (%tgt%) listing an array that packs
-echo    multilanguage messages.
-%langconv% pack -o%tgt% %dic% %lst%
+echo    multilanguage messages, and one (%c_dir%\mfmt.i) listing segments of
+echo    parameterized messages.
+%langconv% pack -o%tgt% --formats %c_dir%\mfmt.i %dic% %lst%
 
 pause
@@ -16,3 +16,24 @@ pause
 langconv pack -h
 pause
 
+langconv footprint -h
+pause
+
+langconv pack_diff -h
+pause
+
+langconv font -h
+pause
+
+langconv export_mo -h
+pause
+
+langconv batch -h
+pause
+
+langconv watch -h
+pause
+
+langconv serve -h
+pause
+
@@ -0,0 +1,9 @@
+@echo off
+set langconv=langconv.exe
+set c_dir=c_src
+
+set dic=dic.xls
+set lst=char.lst
+echo =^> Regenerate %c_dir%\LangID.h, %c_dir%\MsgID.h, verify.report, and
+echo    %c_dir%\mlang.i whenever %dic% or %lst% is modified (Ctrl+C to stop).
+%langconv% watch --lang-id %c_dir%\LangID.h --msg-id %c_dir%\MsgID.h --pack %c_dir%\mlang.i %dic% %lst%
@@ -420,7 +420,20 @@ def reorder(unistr):
     >>> reorder(u'\u0645\u0651\u064e\u0646')    # D T T D
     u'\u0646\u0645\u0651\u064e'
     """
-    chars = list(unistr)
+    return ''.join([unistr[i] for i in reorder_positions(unistr)])
+
+
+def reorder_positions(unistr):
+    """Return the positions of the characters of a given Unicode string in
+    the order of display, i.e., reorder(unistr) lists the characters at these
+    positions.
+
+    Examples
+    --------
+    >>> reorder_positions(u'\uFEE0\uFE8E\u0660\u0661\u0662')
+    [2, 3, 4, 1, 0]
+    """
+    order = range(len(unistr))
 
     # 1. reverse none Arabic characters and digits
 
@@ -433,7 +446,7 @@ def reorder(unistr):
     ])
     pattern = re.compile(u'[^%s]{2,}' % rtl_chars)
     for m in pattern.finditer(unistr):
-        chars[m.start():m.end()] = m.group(0)[::-1]
+        order[m.start():m.end()] = range(m.start(), m.end())[::-1]
 
     # 2. reverse the Arabic characters of to be combined sequence
 
@@ -442,10 +455,10 @@ def reorder(unistr):
                u'\u06DF-\u06E4\u06E7-\u06E8\u06EA-\u06ED'
     pattern = re.compile(u'[^%s][%s]+' % (ArabicMn, ArabicMn))
     for m in pattern.finditer(unistr):
-        chars[m.start():m.end()] = m.group(0)[::-1]
+        order[m.start():m.end()] = range(m.start(), m.end())[::-1]
 
-    # 3. reverse all and join chars
-    return ''.join(chars[::-1])
+    # 3. reverse all
+    return order[::-1]
 
 
 def mirror(unistr):
@@ -497,15 +510,34 @@ def shape(unistr):
     >>> shape('你好嗎？'.decode('utf8'))
     u'\u4f60\u597d\u55ce\uff1f'
     """
+    text, order = shape_order(unistr)
+    return ''.join([text[i] for i in order])
+
+
+def shape_order(unistr):
+    """Return a given Unicode string shaped in memory representation order,
+    and the positions of its characters in the order of display, i.e.,
+    shape(unistr) lists the characters at these positions. Mirroring does
+    not move characters, so it is applied before reordering.
+
+    Examples
+    --------
+    >>> unistr = u'\u0627\u0644\u0639\u0631\u0628\u064a\u0629'
+    >>> text, order = shape_order(unistr)
+    >>> text
+    u'\ufe8d\ufedf\ufecc\ufead\ufe91\ufef4\ufe94'
+    >>> order
+    [6, 5, 4, 3, 2, 1, 0]
+    """
     normailized = unicodedata.normalize('NFKC', unistr)
-    if any(is_arabic(c) for c in normailized):
-        unistr = normailized
-        unistr = combine(unistr)
-        unistr = join(unistr)
-        unistr = ligature(unistr)
-        unistr = reorder(unistr)
-        unistr = mirror(unistr)
-    return unistr
+    if not any(is_arabic(c) for c in normailized):
+        return unistr, range(len(unistr))
+    unistr = normailized
+    unistr = combine(unistr)
+    unistr = join(unistr)
+    unistr = ligature(unistr)
+    unistr = mirror(unistr)
+    return unistr, reorder_positions(unistr)
 
 
 #------------------------------------------------------------------------------
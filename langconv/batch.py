@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+This module reads a batch manifest listing the products to build, and caches
+files parsed for products.
+
+The Manifest Format
+-------------------
+A manifest is a JSON file, e.g.,
+
+    {
+        "jobs": 4,
+        "products": [
+            {
+                "name": "ProductA",
+                "dic": "dic/product_a.xls",
+                "chars": "char.lst",
+                "output": "out/product_a",
+                "commands": {
+                    "lang_id": {},
+                    "msg_id": {"registry_fn": "msg_id.reg"},
+                    "verify": {},
+                    "pack": {"code_pages": true, "output": "mlang.i"}
+                }
+            }
+        ]
+    }
+
+"jobs" (default 1) is the number of products built at a time. A product maps
+a command to its options, which are keyword arguments of the function of the
+command; "output" names the output file in the output directory of the
+product. "dic" is a dictionary spec or a list of them (see the XLS-file
+argument of commands, e.g., "dic/menu.xls#*"). Without "commands", lang_id,
+msg_id, verify, and pack are run with their default options. Input paths are
+relative to the manifest file, and output paths of options (e.g., "json_fn")
+are relative to the output directory.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import json
+import inspect
+from collections import OrderedDict
+
+
+DEFAULT_COMMANDS = ('lang_id', 'msg_id', 'verify', 'pack')
+
+INPUT_OPTIONS = ('access_profile', 'registry_fn', 'bdf_fn', 'widget_widths')
+OUTPUT_OPTIONS = ('json_fn', 'width_fn', 'overflow_fn', 'cache_fn',
+                  'key_fn', 'state_fn', 'fmt_fn')
+
+
+#------------------------------------------------------------------------------
+# Manifest
+#------------------------------------------------------------------------------
+
+def read_manifest(fn, commands):
+    """Return the jobs and the products of a manifest file. Paths of a product
+    are resolved.
+
+    Arguments
+    ---------
+    fn
+        filename of the manifest
+    commands
+        command: (function, uses char list) items of known commands
+    """
+    def error(msg):
+        return ValueError('Bad manifest "%s": %s' % (fn, msg))
+
+    with open(fn) as in_file:
+        try:
+            manifest = json.load(in_file, object_pairs_hook=OrderedDict)
+        except ValueError as err:
+            raise error(err)
+    base = os.path.dirname(os.path.abspath(fn))
+    path = lambda x: os.path.normpath(os.path.join(base, x))
+
+    products = manifest.get('products')
+    if not isinstance(products, list) or not products:
+        raise error('no products')
+
+    result = []
+    for i, p in enumerate(products):
+        name = p.get('name', 'product%d' % (i + 1))
+        if 'dic' not in p:
+            raise error('no dic of %s' % name)
+        dics = p['dic'] if isinstance(p['dic'], list) else [p['dic']]
+        output = path(p.get('output', name))
+        cmds = p.get('commands',
+                      OrderedDict((cmd, {}) for cmd in DEFAULT_COMMANDS))
+        for cmd, opts in cmds.items():
+            if cmd not in commands:
+                raise error('unknown command %s of %s' % (cmd, name))
+            func, uses_chars = commands[cmd]
+            if uses_chars and 'chars' not in p:
+                raise error('no chars of %s for %s' % (name, cmd))
+            known = command_options(func)
+            for k in opts:
+                if k not in known:
+                    raise error('unknown option %s of %s for %s' %
+                                (k, name, cmd))
+            for k in INPUT_OPTIONS:
+                if opts.get(k):
+                    opts[k] = path(opts[k])
+            for k in OUTPUT_OPTIONS:
+                if opts.get(k):
+                    opts[k] = os.path.join(output, opts[k])
+        result += [OrderedDict([
+            ('name', name),
+            ('dic', [path(x) for x in dics]),
+            ('chars', path(p['chars']) if 'chars' in p else None),
+            ('output', output),
+            ('commands', cmds),
+        ])]
+
+    names = [p['name'] for p in result]
+    dups = sorted(set(x for x in names if names.count(x) > 1))
+    if dups:
+        raise error('duplicate product %s' % dups[0])
+    return manifest.get('jobs', 1), result
+
+
+def command_options(func):
+    """Return the options of a manifest command of a function: its keyword
+    arguments but cache, with "output" and "jobs".
+
+    Example
+    -------
+    >>> def pack(rows, char_tbl, h_fn, code_pages=False, jobs=1, cache=None):
+    ...     pass
+    >>> sorted(command_options(pack))
+    ['code_pages', 'jobs', 'output']
+    """
+    spec = inspect.getargspec(func)
+    keywords = spec.args[len(spec.args) - len(spec.defaults or ()):]
+    return set(keywords + ['output', 'jobs']) - set(['cache'])
+
+
+#------------------------------------------------------------------------------
+# File Cache
+#------------------------------------------------------------------------------
+
+_files = {}     # (function name, path, arguments): (mtime, result)
+
+
+def file_key(read, fn, *args):
+    """Return the cache key of a file read by a function with arguments
+    following the filename.
+    """
+    return read.__name__, os.path.abspath(fn), args
+
+
+def cached(read, fn, *args):
+    """Return True if read(fn, *args) is cached and its file is unmodified.
+    """
+    entry = _files.get(file_key(read, fn, *args))
+    return (entry is not None and os.path.exists(fn) and
+            entry[0] == os.path.getmtime(fn))
+
+
+def cached_read(read, fn, *args):
+    """Return read(fn, *args). A file is read once until it is modified, and
+    only the result of its last version is kept.
+    """
+    if not os.path.exists(fn):
+        return read(fn, *args)     # raises the error of a missing file
+    key = file_key(read, fn, *args)
+    mtime = os.path.getmtime(fn)
+    if _files.get(key, (None,))[0] != mtime:
+        _files[key] = (mtime, read(fn, *args))
+    return _files[key][1]
+
+
+def store(read, fn, result, *args):
+    """Cache the result of read(fn, *args) read elsewhere (e.g., by a worker
+    process).
+    """
+    _files[file_key(read, fn, *args)] = (os.path.getmtime(fn), result)
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""
+This tool benchmarks the stages of the Multi-language converting tool with
+synthetic dictionaries. It generates a dictionary of N messages by L languages
+(mixing Latin, Cyrillic, CJK, Hangul, Kana and Arabic scripts with comment rows
+and comment columns) and the matching char list, times each stage, and saves
+the results as JSON. Results can be compared against a saved baseline; a stage
+slower than the baseline beyond a threshold fails the benchmark.
+
+The import of langconv is timed as a stage too, and modules that langconv
+imports only for the commands needing them are checked to stay unimported.
+"""
+__software__ = "Multi-language converting benchmark"
+__version__ = "1.00"
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import sys
+import time
+import json
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+from myutil import save_utf8_file, seq_divide
+import timing
+
+
+LANGCONV = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'langconv.py')
+
+ID_TOTAL = 100000      # IDs converted by the c_identifier stages
+TM_TOTAL = 100000      # texts indexed by the TransMemory stages
+TM_SEARCHES = 100      # near matches searched by the TransMemory stage
+
+# Modules imported by the commands needing them, not by importing langconv
+LAZY_MODULES = ('xlrd', 'xlutils', 'xlwt', 'gtrans', 'urllib2', 'arabic',
+                'unicodedata', 'httplib', 'ssl', 'server', 'client', 'tmem',
+                'workbook', 'multiprocessing', 'subprocess', 'cProfile')
+
+
+#------------------------------------------------------------------------------
+# Synthetic Dictionary
+#------------------------------------------------------------------------------
+
+def _chars(first, last):
+    return u''.join(unichr(c) for c in xrange(first, last + 1))
+
+SCRIPTS = {
+    'latin': _chars(0x61, 0x7A),
+    'latin1': _chars(0x61, 0x7A) + u'áéíóúñçäöüßàèìòù',
+    'latin2': _chars(0x61, 0x7A) + u'ąćęłńóśźżčěřšž',
+    'cyrillic': _chars(0x430, 0x44F),
+    'cjk': _chars(0x4E00, 0x4E00 + 799),
+    'hangul': _chars(0xAC00, 0xAC00 + 399),
+    'kana': _chars(0x3041, 0x3096) + _chars(0x4E00, 0x4E00 + 199),
+    'arabic': u'آأؤإئابةت'
+              u'ثجحخدذرزس'
+              u'شصضطظعغفق'
+              u'كلمنهوىي',
+}
+
+LANGS = [
+    ('English', 'latin'), ('Chinese', 'cjk'), ('Korean', 'hangul'),
+    ('Spanish', 'latin1'), ('Russian', 'cyrillic'), ('Polish', 'latin2'),
+    ('Arabic', 'arabic'), ('Japanese', 'kana'), ('French', 'latin1'),
+    ('German', 'latin1'), ('Ukrainian', 'cyrillic'), ('Czech', 'latin2'),
+    ('Italian', 'latin1'), ('Portuguese', 'latin1'), ('Taiwan', 'cjk'),
+]
+
+UNSPACED = ('cjk', 'kana')
+
+
+def lang_scripts(n):
+    """Return (language, script) pairs of n languages. English comes first
+    and Arabic is the 7th language.
+
+    Example
+    -------
+    >>> [lang for lang, _ in lang_scripts(17)][-3:]
+    ['Taiwan', 'Lang16', 'Lang17']
+    """
+    pairs = LANGS[:n]
+    pairs += [('Lang%02d' % (i + 1), LANGS[i % len(LANGS)][1])
+                for i in xrange(len(pairs), n)]
+    return pairs
+
+
+def gen_msg(rnd, script, id_no=None):
+    """Return a random message of a script, ended with an ID number if any.
+    """
+    chars = SCRIPTS[script]
+    sep = u'' if script in UNSPACED else u' '
+    words = [u''.join(rnd.choice(chars) for _ in xrange(rnd.randint(2, 8)))
+                for _ in xrange(rnd.randint(1, 6))]
+    msg = sep.join(words)
+    if rnd.random() < 0.2:
+        msg += rnd.choice(u'?!.:')
+    if id_no is not None:
+        msg += u' %d' % id_no
+    return msg
+
+
+def gen_dic_rows(msg_total, lang_total, seed=0):
+    """Return rows of a synthetic dictionary as read_xls returns.
+    """
+    rnd = random.Random(seed)
+    langs = lang_scripts(lang_total)
+    rows = [tuple([u'ID'] + [lang for lang, _ in langs])]
+    for i in xrange(msg_total):
+        msgs = [gen_msg(rnd, script) for _, script in langs]
+        msgs[0] = gen_msg(rnd, 'latin', i).upper()
+        id = u'Msg%d' % i if rnd.random() < 0.1 else u''
+        rows += [tuple([id] + msgs)]
+    return rows
+
+
+def save_dic_xls(fn, rows, seed=0):
+    """Save dictionary rows into an Excel file with a comment row, a comment
+    column, comment rows, and a commented column as dic.xls has.
+    """
+    import xlwt
+
+    rnd = random.Random(seed)
+    book = xlwt.Workbook(encoding='utf-8')
+    sheet = book.add_sheet('dic')
+
+    # column 0: comment marks of rows; row 0: comment marks of columns
+    heads = list(rows[0])
+    sheet.write(0, len(heads) + 1, u'x')
+    y = 1
+    for i, vals in enumerate(rows):
+        if i > 0 and i % 50 == 0:
+            sheet.write(y, 0, u'x')
+            sheet.write(y, 2, u'comment row %d' % i)
+            y += 1
+        for x, v in enumerate(vals):
+            if v:
+                sheet.write(y, x + 1, v)
+        sheet.write(y, len(heads) + 1, u'Note' if i == 0 else
+                    u'note %d' % rnd.randint(0, 9))
+        y += 1
+    book.save(fn)
+
+
+def save_trans_xls(fn, rows):
+    """Save dictionary rows into an Excel file to translate with the header
+    row in row 1 and the source language in column 2, as dic_empty.xls has.
+    """
+    import xlwt
+
+    book = xlwt.Workbook(encoding='utf-8')
+    sheet = book.add_sheet('dic')
+    for y, vals in enumerate(rows):
+        for x, v in enumerate(vals):
+            if v:
+                sheet.write(y + 1, x + 1, v)
+    book.save(fn)
+
+
+def save_char_lst(fn, rows):
+    """Save the char list file of chars used by dictionary rows.
+    """
+    import arabic
+
+    heads = [h.upper() for h in rows[0]]
+    chars = set()
+    for i, h in enumerate(heads):
+        if h == 'ID':
+            continue
+        col = [r[i] for r in rows[1:]]
+        if h == 'ARABIC':
+            col = [arabic.shape(m) for m in col]
+        chars |= set(u''.join(col))
+
+    ascii = _chars(0x20, 0x7E)
+    others = sorted(chars - set(ascii))
+    lines = [u'# A synthetic character list file', u'', u':0x20']
+    lines += seq_divide(ascii, 32)
+    lines += [u'', u':0x80']
+    lines += seq_divide(u''.join(others), 32)
+    save_utf8_file(fn, lines)
+
+
+#------------------------------------------------------------------------------
+# Timing
+#------------------------------------------------------------------------------
+
+def best_time(func, repeat=3, setup=None):
+    """Return the best and the mean wall time in seconds of calling a function.
+    A setup function, if any, is called before each call untimed.
+    """
+    times = []
+    for _ in xrange(repeat):
+        if setup:
+            setup()
+        start = time.time()
+        func()
+        times += [time.time() - start]
+    return min(times), sum(times) / len(times)
+
+
+def import_stage(repeat=3):
+    """Return the best and the mean cumulative time in seconds of importing
+    langconv in a fresh interpreter.
+    """
+    here = os.path.dirname(LANGCONV)
+    times = [timing.import_times('import langconv', here)['langconv'][1]
+                for _ in xrange(repeat)]
+    return min(times), sum(times) / len(times)
+
+
+# Run the command line of argv[1:] and print the peak resident set size of
+# its process. The process is started from this small process, since the
+# peak of a process forked from a large one counts the memory of the latter.
+_PEAK_RUNNER = r'''
+import os, sys, subprocess
+with open(os.devnull, 'w') as devnull:
+    proc = subprocess.Popen(sys.argv[1:], stdout=devnull)
+_, status, usage = os.wait4(proc.pid, 0)
+print usage.ru_maxrss
+sys.exit(1 if status else 0)
+'''
+
+
+def peak_memory_run(args, cwd):
+    """Run a langconv command line, and return the peak resident set size
+    in bytes of its process; None if it is unknown on the platform.
+    """
+    argv = [sys.executable, LANGCONV] + args
+    if not hasattr(os, 'wait4'):
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call(argv, cwd=cwd, stdout=devnull)
+        return None
+    out = subprocess.check_output([sys.executable, '-c', _PEAK_RUNNER] + argv,
+                                  cwd=cwd)
+    return int(out) * (1 if sys.platform == 'darwin' else 1024)
+
+
+def lazy_imports(stmt='import langconv'):
+    """Return the modules of LAZY_MODULES imported by a statement.
+
+    Example
+    -------
+    >>> lazy_imports()
+    []
+    >>> lazy_imports('import langconv; langconv.shape(u"a")')
+    ['arabic', 'unicodedata']
+    """
+    here = os.path.dirname(LANGCONV)
+    imported = timing.import_times(stmt, here)
+    return [m for m in LAZY_MODULES if m in imported]
+
+
+def start_server(address):
+    """Start a langconv server at an address, and return its process once it
+    serves requests.
+    """
+    import client
+
+    with open(os.devnull, 'w') as devnull:
+        proc = subprocess.Popen([sys.executable, LANGCONV, 'serve',
+                                 '--address', address], stdout=devnull)
+    for _ in xrange(100):
+        try:
+            client.request(address, ['langconv', '-v'])
+            return proc
+        except EnvironmentError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise IOError('The langconv server does not start at %s' % address)
+
+
+def serve_stages(tmp, xls_fn, lst_fn, address):
+    """Return stages running commands as cold command lines and as warm
+    requests to a langconv server at an address.
+    """
+    import client
+
+    commands = OrderedDict([
+        ('lang_id', ['lang_id', '-o', 'LangID.h', xls_fn]),
+        ('msg_id', ['msg_id', '-o', 'MsgID.h', xls_fn]),
+        ('verify', ['verify', '-o', 'verify.report', xls_fn, lst_fn]),
+        ('pack', ['pack', '-o', 'mlang.i', xls_fn, lst_fn]),
+    ])
+
+    def cold(args):
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call([sys.executable, LANGCONV] + args, cwd=tmp,
+                                  stdout=devnull)
+
+    def warm(args):
+        status, _, err = client.request(address, ['langconv.py'] + args, tmp)
+        if status:
+            raise ValueError(err)
+
+    stages = OrderedDict()
+    for cmd, args in commands.items():
+        warm(args)      # warm the caches of the server up
+        stages['cold ' + cmd] = lambda args=args: cold(args)
+        stages['warm ' + cmd] = lambda args=args: warm(args)
+    return stages
+
+
+def run_stages(msg_total, lang_total, repeat=3, seed=0, work_dir=None,
+               jobs=(1,), serve=False):
+    """Return the timing of each stage with a synthetic dictionary. Stages
+    running with a pool of processes are timed with each number of jobs; a
+    stage with n jobs (n > 1) is named with a suffix " -jn". The caches of
+    langconv are cleared before each run of a stage, so every run is cold
+    and the stages with a pool do their work in the pool. With serve=True,
+    commands are also timed as cold command lines ("cold <command>") and as
+    warm requests to a langconv server ("warm <command>"). trans_dic is timed
+    as a command line writing an .xls and an .xlsx file ("trans_dic xls" and
+    "trans_dic xlsx"), with the peak memory in bytes of its process.
+    """
+    import langconv
+    import arabic
+    from dictionary import Dictionary
+    from myutil import c_identifier, c_identifiers
+    from tmem import TransMemory
+
+    rows = gen_dic_rows(msg_total, lang_total, seed)
+    tmp = work_dir or tempfile.mkdtemp(prefix='langconv_bench_')
+    server = None
+    try:
+        xls_fn = os.path.join(tmp, 'dic.xls')
+        lst_fn = os.path.join(tmp, 'char.lst')
+        save_char_lst(lst_fn, rows)
+        has_xls = msg_total + msg_total // 50 + 2 <= 65536
+        if has_xls:
+            save_dic_xls(xls_fn, rows, seed)
+            if langconv.read_xls(xls_fn) != rows:
+                raise ValueError('Synthetic dictionary is not read back')
+            trans_fn = os.path.join(tmp, 'dic_empty.xls')
+            save_trans_xls(trans_fn, rows)
+
+        char_tbl = langconv.read_char_lst(lst_fn)
+        dic = Dictionary.from_rows(rows)
+        heads = [h.upper() for h in rows[0]]
+        arabic_msgs = ([r[heads.index('ARABIC')] for r in rows[1:]]
+                       if 'ARABIC' in heads else [])
+        english = [r[heads.index('ENGLISH')] for r in rows[1:]] or [u'']
+        texts = [u'%s %d' % (english[i % len(english)], i)
+                    for i in xrange(ID_TOTAL)]
+        n = len(english)
+        tm_texts = [u'%s %s' % (english[i % n], english[i // n % n])
+                        for i in xrange(TM_TOTAL)]
+        memory = TransMemory(tm_texts)
+        near_texts = [tm_texts[i] + u'!'
+                        for i in xrange(0, TM_TOTAL, TM_TOTAL // TM_SEARCHES)]
+
+        stages = OrderedDict()
+        if has_xls:
+            stages['read_xls'] = lambda: langconv.read_xls(xls_fn)
+        stages['read_char_lst'] = lambda: langconv.read_char_lst(lst_fn)
+        stages['Dictionary'] = lambda: Dictionary.from_rows(rows)
+        stages['gen_msg_ids'] = lambda: langconv.gen_msg_ids(dic)
+        stages['c_identifier %dk' % (ID_TOTAL // 1000)] = lambda: [
+            c_identifier(x) for x in texts]
+        stages['c_identifiers %dk' % (ID_TOTAL // 1000)] = lambda: (
+            c_identifiers(texts))
+        stages['TransMemory %dk' % (TM_TOTAL // 1000)] = lambda: (
+            TransMemory(tm_texts))
+        stages['TM search x%d' % TM_SEARCHES] = lambda: [
+            memory.search(x) for x in near_texts]
+        stages['arabic.shape'] = lambda: [arabic.shape(m) for m in arabic_msgs]
+        for n in jobs:
+            suffix = ' -j%d' % n if n > 1 else ''
+            stages['verify' + suffix] = lambda n=n: langconv.verify(dic,
+                char_tbl, os.path.join(tmp, 'verify.report'), jobs=n)
+        for n in jobs:
+            suffix = ' -j%d' % n if n > 1 else ''
+            stages['pack' + suffix] = lambda n=n: langconv.pack(dic,
+                char_tbl, os.path.join(tmp, 'mlang.i'), jobs=n)
+
+        peaks = {}      # stage: peak memory of each run
+        for ext in ('xls', 'xlsx') if has_xls else ():
+            name = 'trans_dic ' + ext
+            args = ['trans_dic', trans_fn, '-o', 'dic_trans.' + ext]
+            stages[name] = lambda name=name, args=args: peaks.setdefault(
+                name, []).append(peak_memory_run(args, tmp))
+
+        if serve and has_xls:
+            if hasattr(socket, 'AF_UNIX'):
+                address = 'unix:' + os.path.join(tmp, 'langconv.sock')
+            else:
+                address = 'pipe:langconv-bench-%d' % os.getpid()
+            server = start_server(address)
+            stages.update(serve_stages(tmp, xls_fn, lst_fn, address))
+
+        results = OrderedDict()
+        best, mean = import_stage(repeat)
+        results['import langconv'] = OrderedDict([('best', best),
+                                                  ('mean', mean)])
+        for name, func in stages.items():
+            best, mean = best_time(func, repeat, langconv.clear_caches)
+            results[name] = OrderedDict([('best', best), ('mean', mean)])
+            if None not in peaks.get(name, [None]):
+                results[name]['peak'] = max(peaks[name])
+        return results
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if work_dir is None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+#------------------------------------------------------------------------------
+# Baseline
+#------------------------------------------------------------------------------
+
+def regressions(results, baseline, threshold):
+    """Return (stage, baseline, current) of stages slower than the baseline
+    beyond a threshold (e.g., 0.25 for 25%).
+
+    Example
+    -------
+    >>> base = {'pack': {'best': 1.0}, 'verify': {'best': 1.0}}
+    >>> cur = {'pack': {'best': 1.3}, 'verify': {'best': 1.1}}
+    >>> regressions(cur, base, 0.25)
+    [('pack', 1.0, 1.3)]
+    """
+    slow = []
+    for name in sorted(results):
+        if name in baseline:
+            base, cur = baseline[name]['best'], results[name]['best']
+            if cur > base * (1 + threshold):
+                slow += [(name, base, cur)]
+    return slow
+
+
+#------------------------------------------------------------------------------
+# Command Line Interface
+#------------------------------------------------------------------------------
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-v', '--version', action='version',
+                        version='%s v%s by %s' %
+                        (__software__, __version__, __author__))
+    parser.add_argument('-n', '--messages', metavar='<N>', type=int,
+        default=1000,
+        help='the number of messages (default %(default)s).')
+    parser.add_argument('-l', '--languages', metavar='<L>', type=int,
+        default=8,
+        help='the number of languages (default %(default)s).')
+    parser.add_argument('-r', '--repeat', metavar='<n>', type=int, default=3,
+        help='time each stage <n> times (default %(default)s).')
+    parser.add_argument('--seed', metavar='<n>', type=int, default=0,
+        help='the seed of the synthetic dictionary (default %(default)s).')
+    parser.add_argument('-o', '--output', metavar='<file>', dest='outfile',
+        default='bench.json',
+        help='place the results into <file> (default "%(default)s").')
+    parser.add_argument('-b', '--baseline', metavar='<file>',
+        help='compare the results against <file>, saved results.')
+    parser.add_argument('-t', '--threshold', metavar='<ratio>', type=float,
+        default=0.25,
+        help='''fail if a stage is slower than the baseline by more than
+            <ratio> (default %(default)s).''')
+    parser.add_argument('-j', '--jobs', metavar='<n>', type=int, nargs='+',
+        default=[1],
+        help='''time verify and pack with each number of processes to show
+            scaling (default %(default)s).''')
+    parser.add_argument('--serve', action='store_true',
+        help='''time commands as cold command lines and as warm requests to
+            a langconv server as well.''')
+    parser.add_argument('--import-time', action='store_true',
+        help='''list the time of the modules imported by langconv, in the
+            format of python -X importtime.''')
+    parser.add_argument('--keep', metavar='<dir>',
+        help='generate the synthetic files into <dir> and keep them.')
+    return parser.parse_args(args)
+
+
+def main():
+    """Start point of this module.
+    """
+    args = parse_args(sys.argv[1:])
+    if args.import_time:
+        here = os.path.dirname(LANGCONV)
+        print '\n'.join(timing.import_time_lines('import langconv', here))
+    if args.keep and not os.path.isdir(args.keep):
+        os.makedirs(args.keep)
+
+    results = run_stages(args.messages, args.languages, args.repeat,
+                         args.seed, args.keep, args.jobs, args.serve)
+    report = OrderedDict()
+    report['config'] = OrderedDict([('messages', args.messages),
+                                    ('languages', args.languages),
+                                    ('repeat', args.repeat),
+                                    ('seed', args.seed)])
+    report['results'] = results
+    with open(args.outfile, 'w') as out_file:
+        json.dump(report, out_file, indent=2, separators=(',', ': '))
+        out_file.write('\n')
+
+    for name, t in results.items():
+        print '%-20s %10.4f s (mean %.4f s)%s' % (name, t['best'], t['mean'],
+            ', peak %.1f MiB' % (t['peak'] / 2.0**20) if 'peak' in t else '')
+
+    if args.baseline:
+        with open(args.baseline) as in_file:
+            baseline = json.load(in_file)
+        if baseline.get('config') != report['config']:
+            print 'Warning: the baseline was run with %s' % baseline['config']
+        slow = regressions(results, baseline['results'], args.threshold)
+        for name, base, cur in slow:
+            print 'Regression: %s %.4f s -> %.4f s (+%.0f%%)' % (
+                name, base, cur, 100 * (cur / base - 1))
+        if slow:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+This module keeps the rows of a C integer array in typed arrays, and formats
+them as lines of the C array one at a time.
+
+The integers of all rows are stored in one array (e.g., array('H') for 16-bit
+words) with an int array of the end offsets of rows, instead of a list of
+integer lists, so a large C array takes a few bytes per integer until it is
+formatted, and its lines need not be held in memory at once.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+from array import array
+
+
+_formats = {}   # the number of integers: the format of a line of them
+
+
+#------------------------------------------------------------------------------
+# Format
+#------------------------------------------------------------------------------
+
+def ints_str(ints):
+    """Return the string of a C integer array from an integer sequence, as
+    myutil.array_str_from_ints does.
+
+    Example
+    -------
+    >>> ints_str(array('H', [1, 2, 300]))
+    '   1,   2, 300,'
+    """
+    n = len(ints)
+    try:
+        fmt = _formats[n]
+    except KeyError:
+        fmt = _formats.setdefault(n, '%4d,' * n)
+    return fmt % tuple(ints)
+
+
+#------------------------------------------------------------------------------
+# Rows
+#------------------------------------------------------------------------------
+
+class IntRows(object):
+    """Rows of integers stored as an array of the integers and an int array
+    of the end offsets of rows.
+
+    Example
+    -------
+    >>> rows = IntRows.divide(array('H', range(5)), 2)
+    >>> len(rows), rows.size(), [list(x) for x in rows]
+    (3, 5, [[0, 1], [2, 3], [4]])
+    >>> list(rows.lines())
+    ['   0,   1,', '   2,   3,', '   4,']
+    """
+    __slots__ = ('values', 'ends')
+
+    def __init__(self, values, ends):
+        self.values = values
+        self.ends = ends
+
+    @classmethod
+    def from_lists(cls, lists, typecode='i'):
+        """Return IntRows of integer lists.
+
+        Example
+        -------
+        >>> [list(x) for x in IntRows.from_lists([[7], [], [8, 9]])]
+        [[7], [], [8, 9]]
+        """
+        values = array(typecode)
+        ends = array('i')
+        for x in lists:
+            values.extend(x)
+            ends.append(len(values))
+        return cls(values, ends)
+
+    @classmethod
+    def divide(cls, values, n):
+        """Return IntRows of an array divided into rows of n integers; the
+        last row may be shorter.
+        """
+        ends = array('i', xrange(n, len(values), n))
+        if values:
+            ends.append(len(values))
+        return cls(values, ends)
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __iter__(self):
+        values = self.values
+        begin = 0
+        for end in self.ends:
+            yield values[begin:end]
+            begin = end
+
+    def __reduce__(self):
+        return IntRows, (self.values, self.ends)
+
+    def size(self):
+        """Return the number of integers of all rows.
+        """
+        return len(self.values)
+
+    def lines(self):
+        """Return an iterator over the lines of the C array of rows, a line
+        per row.
+        """
+        return (ints_str(row) for row in self)
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+This module keeps an inverted index from chars to the messages using them,
+updates it incrementally for changed messages, and keeps the indexes of
+languages in a state file between runs.
+
+The State File Format
+---------------------
+A state file is a marshal dump of (STATE_VERSION, the item size of an int
+array, {language: (text, offsets, {char: message indexes})}), where the text
+and the offsets are of the Column of the messages of a language, and the
+offsets and the message indexes are the bytes of int arrays. A state file is
+plain data, so loading it runs no code, and it is checked before use.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import json
+import marshal
+from array import array
+from collections import defaultdict, OrderedDict
+from itertools import izip
+
+from dictionary import Column
+
+
+STATE_VERSION = 1
+
+#------------------------------------------------------------------------------
+# Index
+#------------------------------------------------------------------------------
+
+class CharIndex(object):
+    """An inverted index from chars to the sorted indexes of the messages
+    using them, of a Column of messages.
+
+    Example
+    -------
+    >>> idx = CharIndex(Column.from_msgs([u'ab', u'b'] + [u'c'] * 8))
+    >>> sorted(idx.chars()), list(idx.messages(u'b'))
+    ([u'a', u'b', u'c'], [0, 1])
+    >>> idx.update(Column.from_msgs([u'ab', u'ca'] + [u'c'] * 8))
+    1
+    >>> list(idx.messages(u'a')), list(idx.messages(u'b'))
+    ([0, 1], [0])
+    >>> idx == CharIndex(idx.msgs)
+    True
+    """
+    __slots__ = ('msgs', 'index')
+
+    # the ratio of changed messages above which an index is rebuilt instead
+    # of being updated
+    REBUILD_RATIO = 0.125
+
+    def __init__(self, msgs, index=None):
+        self.msgs = msgs
+        self.index = self.build(msgs) if index is None else index
+
+    @staticmethod
+    def build(msgs):
+        """Return a char: array of message indexes dictionary of a Column
+        of messages.
+        """
+        index = defaultdict(lambda: array('i'))
+        for i, m in enumerate(msgs):
+            for c in set(m):
+                index[c].append(i)
+        return dict(index)
+
+    def __reduce__(self):
+        return CharIndex, (self.msgs, self.index)
+
+    def __eq__(self, other):
+        return (isinstance(other, CharIndex) and self.msgs == other.msgs and
+                self.index == other.index)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def chars(self):
+        """Return the chars used by the messages.
+        """
+        return self.index.viewkeys()
+
+    def messages(self, c):
+        """Return the sorted indexes of the messages using a char.
+        """
+        return self.index.get(c, array('i'))
+
+    def update(self, msgs):
+        """Update the index to a new Column of messages, and return the
+        number of messages indexed again. Only changed messages are indexed
+        again, unless the number of messages differs or many messages are
+        changed, when the index is rebuilt.
+        """
+        old = self.msgs
+        if msgs == old:
+            return 0
+        self.msgs = msgs
+        if len(msgs) != len(old):
+            self.index = self.build(msgs)
+            return len(msgs)
+        changed = [i for i, (a, b) in enumerate(izip(old, msgs)) if a != b]
+        if len(changed) > len(msgs) * self.REBUILD_RATIO:
+            self.index = self.build(msgs)
+            return len(msgs)
+
+        gone = set(changed)
+        added = defaultdict(list)
+        for i in changed:
+            for c in set(msgs[i]):
+                added[c] += [i]
+        touched = set(added)
+        for i in changed:
+            touched.update(old[i])
+        for c in touched:
+            kept = [i for i in self.index.get(c, ()) if i not in gone]
+            ids = sorted(kept + added.get(c, []))
+            if ids:
+                self.index[c] = array('i', ids)
+            else:
+                self.index.pop(c, None)
+        return len(changed)
+
+
+#------------------------------------------------------------------------------
+# Report
+#------------------------------------------------------------------------------
+
+def json_report(not_listed, not_used):
+    """Return a verify report as a JSON object.
+
+    Arguments
+    ---------
+    not_listed
+        (char, [(language, message IDs)]) items of chars used but not listed
+    not_used
+        chars listed but not used
+
+    Example
+    -------
+    >>> report = json_report([(u'X', [('English', ['MSG_Ok'])])], [u'!'])
+    >>> print json.dumps(report['chars_not_listed'])
+    [{"char": "X", "code": "U+0058", "messages": {"English": ["MSG_Ok"]}}]
+    >>> print json.dumps(report['chars_not_used'])
+    [{"char": "!", "code": "U+0021"}]
+    """
+    report = OrderedDict()
+    report['chars_not_listed'] = [OrderedDict([
+        ('char', c), ('code', 'U+%04X' % ord(c)),
+        ('messages', OrderedDict(uses))]) for c, uses in not_listed]
+    report['chars_not_used'] = [OrderedDict([
+        ('char', c), ('code', 'U+%04X' % ord(c))]) for c in not_used]
+    return report
+
+
+def save_json_file(fn, report):
+    """Save a verify report into a JSON file.
+    """
+    with open(fn, 'w') as out_file:
+        json.dump(report, out_file, indent=2, separators=(',', ': '))
+        out_file.write('\n')
+
+
+#------------------------------------------------------------------------------
+# State
+#------------------------------------------------------------------------------
+def int_array(data, limit):
+    """Return an int array of its bytes, whose items are in [0, limit];
+    raise a ValueError for bad bytes.
+    """
+    if not isinstance(data, str) or len(data) % array('i').itemsize:
+        raise ValueError('Bad int array')
+    ints = array('i')
+    ints.fromstring(data)
+    if ints and not 0 <= min(ints) <= max(ints) <= limit:
+        raise ValueError('Int array out of range')
+    return ints
+
+
+def char_index(item):
+    """Return a CharIndex of the (text, offsets, index) item of a language in
+    a state file; raise a ValueError for a bad item.
+    """
+    text, offsets, index = item
+    if not isinstance(text, unicode) or not isinstance(index, dict):
+        raise ValueError('Bad char index')
+    offsets = int_array(offsets, len(text))
+    if (not offsets or offsets[0] != 0 or offsets[-1] != len(text) or
+            any(a > b for a, b in izip(offsets, offsets[1:]))):
+        raise ValueError('Bad offsets of messages')
+    msgs = Column(text, offsets)
+    ids = {}
+    for c, data in index.iteritems():
+        if not isinstance(c, unicode):
+            raise ValueError('Bad char of char index')
+        ids[c] = int_array(data, len(msgs) - 1)
+    return CharIndex(msgs, ids)
+
+
+def load_state(fn):
+    """Return the language: CharIndex items kept in a state file; an empty
+    dictionary if the file is missing, broken, or of another version.
+
+    Example
+    -------
+    >>> import os, shutil, tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> fn = os.path.join(folder, 'verify.state')
+    >>> idx = CharIndex(Column.from_msgs([u'ab', u'b']))
+    >>> save_state(fn, {'English': idx})
+    >>> load_state(fn) == {'English': idx}
+    True
+    >>> with open(fn, 'wb') as out_file:
+    ...     marshal.dump((STATE_VERSION, 4, {'English': (u'ab', '', {})}),
+    ...                  out_file)
+    >>> load_state(fn)
+    {}
+    >>> shutil.rmtree(folder)
+    """
+    try:
+        with open(fn, 'rb') as in_file:
+            version, itemsize, langs = marshal.load(in_file)
+        if (version != STATE_VERSION or itemsize != array('i').itemsize or
+                not isinstance(langs, dict)):
+            return {}
+        return dict((lang, char_index(item))
+                    for lang, item in langs.iteritems())
+    except (IOError, EOFError, TypeError, ValueError):
+        return {}
+
+
+def save_state(fn, state):
+    """Save language: CharIndex items into a state file.
+    """
+    langs = dict((lang, (idx.msgs.text, idx.msgs.offsets.tostring(),
+                         dict((c, ids.tostring())
+                              for c, ids in idx.index.iteritems())))
+                 for lang, idx in state.iteritems())
+    with open(fn, 'wb') as out_file:
+        marshal.dump((STATE_VERSION, array('i').itemsize, langs), out_file)
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
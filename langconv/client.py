@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+This is a thin client of the server of the Multi-language converting tool
+(see the serve command of langconv). It takes the same command line as
+langconv, sends it to the server, and prints the output of the server;
+without a running server, the command is run locally.
+
+The server is addressed by the LANGCONV_SERVER environment variable, e.g.,
+"unix:/tmp/langconv.sock", "pipe:langconv" (a named pipe on Windows), or
+"localhost:8923" (TCP). By default, it is at a Unix domain socket in the
+private ~/.langconv directory, or at a named pipe of the user on Windows.
+
+A TCP server takes requests only from clients with the token of the
+LANGCONV_TOKEN environment variable, which the server requires; a token is
+optional for a socket or a pipe, which only the user can connect to, and
+DEFAULT_TOKEN is used without one.
+
+The Protocol
+------------
+A request is sent over a multiprocessing connection, authenticated with the
+token if any, as a dictionary with "argv" (the command line with the program
+name) and "cwd" (the working directory to run the command in). The response
+is a dictionary with "status" (the exit status), "stdout", and "stderr" of
+the command.
+
+This module imports nothing but the standard library, so it starts fast.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import sys
+import socket
+from multiprocessing.connection import Client, AuthenticationError
+
+DEFAULT_TOKEN = 'langconv'
+
+#------------------------------------------------------------------------------
+# Address
+#------------------------------------------------------------------------------
+
+def parse_address(address):
+    """Return ('unix', path), ('pipe', path), or ('tcp', (host, port)) of a
+    server address.
+
+    Example
+    -------
+    >>> parse_address('unix:/tmp/langconv.sock')
+    ('unix', '/tmp/langconv.sock')
+    >>> parse_address('pipe:langconv')
+    ('pipe', '\\\\\\\\.\\\\pipe\\\\langconv')
+    >>> parse_address('localhost:8923'), parse_address('8000')
+    (('tcp', ('localhost', 8923)), ('tcp', ('localhost', 8000)))
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if address.startswith('pipe:'):
+        return 'pipe', r'\\.\pipe\%s' % address[len('pipe:'):]
+    host, _, port = address.rpartition(':')
+    if not port.isdigit():
+        raise ValueError('Bad server address "%s"' % address)
+    return 'tcp', (host or 'localhost', int(port))
+
+
+def default_address():
+    """Return the default server address: a Unix domain socket in the
+    ~/.langconv directory, or a named pipe of the user on Windows.
+    """
+    if hasattr(socket, 'AF_UNIX'):
+        return 'unix:' + os.path.join(os.path.expanduser('~'), '.langconv',
+                                      'server.sock')
+    return 'pipe:langconv-%s' % os.environ.get('USERNAME', 'user')
+
+
+def server_address():
+    """Return the server address given by the LANGCONV_SERVER environment
+    variable, or the default address.
+    """
+    return os.environ.get('LANGCONV_SERVER') or default_address()
+
+
+def server_token():
+    """Return the token of the LANGCONV_TOKEN environment variable to
+    authenticate requests; None without a token.
+    """
+    return os.environ.get('LANGCONV_TOKEN') or None
+
+
+#------------------------------------------------------------------------------
+# Request
+#------------------------------------------------------------------------------
+
+def connect(address):
+    """Return a connection to a server. An EnvironmentError (e.g.,
+    socket.error) is raised if the server is not running, and an
+    AuthenticationError if the token is not accepted.
+    """
+    where = parse_address(address)[1]
+    return Client(where, authkey=server_token() or DEFAULT_TOKEN)
+
+
+def request(address, argv, cwd=None):
+    """Run a command line on a server, and return the exit status, the
+    standard output, and the standard error of the command (see connect for
+    errors of connecting).
+    """
+    return run(connect(address), argv, cwd)
+
+
+def run(conn, argv, cwd=None):
+    """Run a command line over a connection to a server, which is closed
+    then, and return the exit status, the standard output, and the standard
+    error of the command.
+    """
+    try:
+        conn.send({'argv': list(argv), 'cwd': cwd or os.getcwd()})
+        result = conn.recv()
+    finally:
+        conn.close()
+    return result['status'], result['stdout'], result['stderr']
+
+
+#------------------------------------------------------------------------------
+# Main
+#------------------------------------------------------------------------------
+
+def main():
+    """Start point of this module. The command is run locally only if the
+    server cannot be connected to.
+    """
+    try:
+        conn = connect(server_address())
+    except EnvironmentError:
+        import langconv
+        langconv.main()
+        return
+    except AuthenticationError:
+        sys.exit('The token of LANGCONV_TOKEN is not accepted by the server')
+
+    # errors after connecting are not run locally, since the server may
+    # have run the command already
+    status, out, err = run(conn, sys.argv)
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
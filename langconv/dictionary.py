@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+This module keeps a multi-language dictionary in memory by columns.
+
+A column (the messages of a language, or the message IDs) is stored as one
+concatenated string with an offset table (an int array) instead of a tuple of
+message objects, so a cell and the length of a cell are looked up in O(1) time
+and the text of a whole column is at hand without joining messages.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+from array import array
+from itertools import izip, islice
+
+
+#------------------------------------------------------------------------------
+# Column
+#------------------------------------------------------------------------------
+
+class Column(object):
+    """Messages stored as a concatenated text and an offset table.
+
+    Example
+    -------
+    >>> col = Column.from_msgs([u'Yes', u'', u'No'])
+    >>> len(col), col[2], col.length(0), col.text
+    (3, u'No', 3, u'YesNo')
+    >>> list(col), list(col.lengths())
+    ([u'Yes', u'', u'No'], [3, 0, 2])
+    >>> col == Column.from_msgs(col), col == Column.from_msgs([u'YesNo'])
+    (True, False)
+    """
+    __slots__ = ('text', 'offsets')
+
+    def __init__(self, text=u'', offsets=None):
+        self.text = text
+        self.offsets = array('i', [0]) if offsets is None else offsets
+
+    @classmethod
+    def from_msgs(cls, msgs):
+        """Return a Column of given messages.
+        """
+        msgs = list(msgs)
+        offsets = array('i', [0])
+        end = 0
+        for m in msgs:
+            end += len(m)
+            offsets.append(end)
+        return cls(u''.join(msgs), offsets)
+
+    @classmethod
+    def concat(cls, columns):
+        """Return a Column of the messages of given columns in order.
+
+        Example
+        -------
+        >>> a, b = Column.from_msgs([u'a', u'bc']), Column.from_msgs([u'd'])
+        >>> list(Column.concat([a, b]))
+        [u'a', u'bc', u'd']
+        """
+        offsets = array('i', [0])
+        base = 0
+        for col in columns:
+            offsets.extend(base + x for x in islice(col.offsets, 1, None))
+            base += len(col.text)
+        return cls(u''.join(col.text for col in columns), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('Column index out of range')
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        text, offsets = self.text, self.offsets
+        return (text[begin:end] for begin, end
+                    in izip(offsets, islice(offsets, 1, None)))
+
+    def __reduce__(self):
+        return Column, (self.text, self.offsets)
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, Column) and
+                                 self.text == other.text and
+                                 self.offsets == other.offsets)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def length(self, i):
+        """Return the length of the i-th message.
+        """
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def lengths(self):
+        """Return an iterator over the lengths of messages.
+        """
+        offsets = self.offsets
+        return (end - begin for begin, end
+                    in izip(offsets, islice(offsets, 1, None)))
+
+    def msgs(self):
+        """Return the list of messages; identical messages are interned to
+        one object.
+
+        Example
+        -------
+        >>> msgs = Column.from_msgs([u'OK', u'Cancel', u'OK']).msgs()
+        >>> msgs[0] is msgs[2]
+        True
+        """
+        interned = {}
+        return [interned.setdefault(m, m) for m in self]
+
+
+#------------------------------------------------------------------------------
+# Dictionary
+#------------------------------------------------------------------------------
+
+class Dictionary(object):
+    """A multi-language dictionary of columns named by headings. A column is
+    looked up by its heading in any case.
+
+    Example
+    -------
+    >>> dic = Dictionary.from_rows([(u'ID', u'English', u'Chinese'),
+    ...                             (u'', u'OK', u'\\u597d'),
+    ...                             (u'No', u'CANCEL', u'\\u53d6\\u6d88')])
+    >>> len(dic), dic.langs, dic.cell(1, 'chinese'), dic.length(1, 'ENGLISH')
+    (2, [u'English', u'Chinese'], u'\\u53d6\\u6d88', 6)
+    >>> dic.rows()[1]
+    (u'', u'OK', u'\\u597d')
+    """
+    __slots__ = ('heads', 'keys', 'columns', 'origins', '_index')
+
+    def __init__(self, heads=(), columns=(), origins=()):
+        self.heads = tuple(heads)
+        self.keys = tuple(h.upper() for h in self.heads)
+        self.columns = tuple(columns)
+        self.origins = tuple(origins)   # (sheet, row numbers) of messages
+        self._index = dict(izip(self.keys, self.columns))
+
+    @classmethod
+    def from_rows(cls, rows, origin=None):
+        """Return a Dictionary of rows as read_xls returns; the first row
+        lists headings. Given (sheet, row numbers of the rows), the sheet and
+        the row of each message are kept (see origin).
+        """
+        if not rows:
+            return cls()
+        heads = rows[0]
+        cols = zip(*rows[1:]) or [()] * len(heads)
+        origins = [(origin[0], array('i', origin[1][1:]))] if origin else ()
+        return cls(heads, [Column.from_msgs(col) for col in cols], origins)
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __contains__(self, key):
+        return key.upper() in self._index
+
+    def __reduce__(self):
+        return Dictionary, (self.heads, self.columns, self.origins)
+
+    @property
+    def langs(self):
+        """Language names, i.e., headings except ID.
+        """
+        return [h for h in self.heads if h.upper() != 'ID']
+
+    def column(self, key):
+        """Return the column of a heading.
+        """
+        try:
+            return self._index[key.upper()]
+        except KeyError:
+            raise ValueError('No column "%s" in the dictionary' % key)
+
+    def cell(self, i, key):
+        """Return the message of the i-th row in the column of a heading.
+        """
+        return self.column(key)[i]
+
+    def length(self, i, key):
+        """Return the length of the message of the i-th row in the column of
+        a heading.
+        """
+        return self.column(key).length(i)
+
+    def origin(self, i):
+        """Return the sheet and the row of the i-th message, or None if they
+        are not kept.
+
+        Example
+        -------
+        >>> dic = Dictionary.from_rows([(u'ID', u'English'), (u'', u'OK')],
+        ...                            (u'dic.xls:Sheet1', [2, 4]))
+        >>> dic.origin(0)
+        u'dic.xls:Sheet1 row 4'
+        """
+        for sheet, numbers in self.origins:
+            if i < len(numbers):
+                return u'%s row %d' % (sheet, numbers[i])
+            i -= len(numbers)
+        return None
+
+    def rows(self):
+        """Return rows as read_xls returns.
+        """
+        return [self.heads] + zip(*self.columns)
+
+
+def as_dictionary(rows):
+    """Return a Dictionary of rows, or the given Dictionary as is.
+    """
+    if isinstance(rows, Dictionary):
+        return rows
+    return Dictionary.from_rows(rows)
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+This module reads glyphs of a bitmap font in BDF (Glyph Bitmap Distribution
+Format), rasterizes them into rows of 16-bit words, and formats a C glyph
+table indexed by the char indexes of a char list, as those of packed
+messages. Rasterized glyphs are cached in a file between runs, so the font is
+read again only if it is modified or a glyph is not cached yet.
+
+The Glyph Table Format
+----------------------
+GlyphHeader GlyphOffset^(N+1) Glyph^G
+    N: the total number of char indexes (the largest index + 1)
+    G: the number of glyphs in the table
+GlyphHeader: IndexCount FontAscent FontDescent
+GlyphOffset: the offset in words of the glyph of a char index from the first
+             Glyph; an index has no glyph if its offset equals the next one
+Glyph: DWidth Width Height XOffset YOffset Row^Height
+    DWidth: the advance width in pixels
+    Width, Height, XOffset, YOffset: the bounding box of the bitmap (BBX)
+    Row: ceil(Width / 16) words of pixels; the most significant bit of the
+         first word is the leftmost pixel
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import cPickle
+
+from myutil import array_str_from_ints
+
+
+#------------------------------------------------------------------------------
+# BDF
+#------------------------------------------------------------------------------
+
+def parse_bdf(lines):
+    """Return the ascent, the descent, and code point: (DWidth, BBX, hex rows)
+    glyph items of the lines of a BDF font. Glyphs without a code point
+    (ENCODING -1) are skipped.
+
+    Example
+    -------
+    >>> ascent, descent, glyphs = parse_bdf(BDF_SAMPLE.splitlines())
+    >>> ascent, descent, glyphs[65]
+    (6, 2, (5, (3, 4, 1, 0), ['40', 'A0', 'E0', 'A0']))
+    """
+    ascent = descent = None
+    font_bbx = (0, 0, 0, 0)
+    font_dwidth = None
+    glyphs = {}
+    glyph = None
+    bitmap = None
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        key = words[0]
+        if bitmap is not None:
+            if key == 'ENDCHAR':
+                code, dwidth, bbx = glyph
+                if code >= 0:
+                    dwidth = dwidth if dwidth is not None else (
+                        font_dwidth if font_dwidth is not None else bbx[0])
+                    glyphs[code] = (dwidth, bbx, bitmap)
+                glyph = bitmap = None
+            else:
+                bitmap.append(key)
+        elif key == 'FONTBOUNDINGBOX':
+            font_bbx = tuple(int(x) for x in words[1:5])
+        elif key == 'FONT_ASCENT':
+            ascent = int(words[1])
+        elif key == 'FONT_DESCENT':
+            descent = int(words[1])
+        elif key == 'DWIDTH' and glyph is None:
+            font_dwidth = int(words[1])
+        elif key == 'STARTCHAR':
+            glyph = [-1, None, font_bbx]
+        elif glyph is not None:
+            if key == 'ENCODING':
+                glyph[0] = int(words[1])
+            elif key == 'DWIDTH':
+                glyph[1] = int(words[1])
+            elif key == 'BBX':
+                glyph[2] = tuple(int(x) for x in words[1:5])
+            elif key == 'BITMAP':
+                bitmap = []
+    if ascent is None:
+        ascent = font_bbx[1] + font_bbx[3]
+    if descent is None:
+        descent = -font_bbx[3]
+    return ascent, descent, glyphs
+
+
+def read_bdf(fn):
+    """Return the ascent, the descent, and the glyphs of a BDF font file (see
+    parse_bdf).
+    """
+    with open(fn, 'rU') as in_file:
+        return parse_bdf(in_file)
+
+
+def raster(glyph):
+    """Return a (DWidth, BBX, hex rows) glyph as a tuple of the words of a
+    Glyph of the glyph table.
+
+    Example
+    -------
+    >>> raster((5, (3, 4, 1, 0), ['40', 'A0', 'E0', 'A0']))
+    (5, 3, 4, 1, 0, 16384, 40960, 57344, 40960)
+    >>> raster((18, (17, 1, 0, 0), ['FFFF80']))
+    (18, 17, 1, 0, 0, 65535, 32768)
+    """
+    dwidth, (width, height, x, y), rows = glyph
+    n = (width + 15) // 16
+    words = [dwidth, width, height, x, y]
+    rows = (rows + ['0'] * height)[:height]
+    for row in rows:
+        shift = n * 16 - len(row) * 4
+        bits = int(row or '0', 16)
+        bits = bits << shift if shift >= 0 else bits >> -shift
+        words += [(bits >> (16 * k)) & 0xFFFF for k in xrange(n - 1, -1, -1)]
+    return tuple(words)
+
+
+#------------------------------------------------------------------------------
+# Cache
+#------------------------------------------------------------------------------
+
+def font_stamp(fn):
+    """Return the (path, modification time, size) stamp of a font file.
+    """
+    return os.path.abspath(fn), os.path.getmtime(fn), os.path.getsize(fn)
+
+
+def load_cache(fn, stamp):
+    """Return the glyph cache of a font with a given stamp from a cache file;
+    an empty cache if the file is missing, broken, or of another version of
+    the font.
+    """
+    try:
+        with open(fn, 'rb') as in_file:
+            cache = cPickle.load(in_file)
+        if cache['font'] == stamp:
+            return cache
+    except (IOError, EOFError, KeyError, TypeError, ValueError,
+            cPickle.UnpicklingError):
+        pass
+    return {'font': stamp, 'metrics': None, 'glyphs': {}}
+
+
+def save_cache(fn, cache):
+    """Save a glyph cache into a cache file.
+    """
+    with open(fn, 'wb') as out_file:
+        cPickle.dump(cache, out_file, 2)
+
+
+def cache_filename(bdf_fn):
+    """Return the default cache filename of a BDF font file, named after the
+    font file, so that each font is cached in a file of its own.
+
+    Example
+    -------
+    >>> cache_filename('fonts/unifont.bdf')
+    'fonts/unifont.bdf.cache'
+    """
+    return bdf_fn + '.cache'
+
+
+def glyph_records(bdf_fn, codes, cache_fn=None):
+    """Return the ascent, the descent, and code point: rasterized glyph items
+    of given code points of a BDF font file; a glyph is None if the font has
+    no glyph of its code point.
+
+    With a cache file, the font is read only if it is modified or a code
+    point is not cached yet, and newly rasterized glyphs are cached.
+    """
+    stamp = font_stamp(bdf_fn)
+    cache = (load_cache(cache_fn, stamp) if cache_fn else
+             {'font': stamp, 'metrics': None, 'glyphs': {}})
+    cached = cache['glyphs']
+    todo = [x for x in codes if x not in cached]
+    if todo or cache['metrics'] is None:
+        ascent, descent, glyphs = read_bdf(bdf_fn)
+        cache['metrics'] = (ascent, descent)
+        for code in todo:
+            cached[code] = raster(glyphs[code]) if code in glyphs else None
+        if cache_fn:
+            save_cache(cache_fn, cache)
+    ascent, descent = cache['metrics']
+    return ascent, descent, dict((x, cached[x]) for x in codes)
+
+
+#------------------------------------------------------------------------------
+# Glyph Table
+#------------------------------------------------------------------------------
+
+def table_lines(ascent, descent, glyphs):
+    """Return lines of the C glyph table of glyphs, a list indexed by char
+    indexes of (char, rasterized glyph or None) items.
+
+    Example
+    -------
+    >>> g = raster((5, (3, 4, 1, 0), ['40', 'A0', 'E0', 'A0']))
+    >>> for line in table_lines(6, 2, [(None, None), (u'A', g)]):
+    ...     print line
+    <BLANKLINE>
+       2,   // the total number of char indexes
+       6,   // the font ascent
+       2,   // the font descent
+    <BLANKLINE>
+    // The offsets of glyphs
+       0,   0,   9,
+    <BLANKLINE>
+    // Glyphs (DWidth Width Height XOffset YOffset Rows)
+    // 1: U+0041
+       5,   3,   4,   1,   0,16384,40960,57344,40960,
+    """
+    sizes = [len(g) if g else 0 for _, g in glyphs]
+    offsets = [0]
+    for size in sizes:
+        offsets += [offsets[-1] + size]
+    lines = ['']
+    lines += ['%4d,   // the total number of char indexes' % len(glyphs)]
+    lines += ['%4d,   // the font ascent' % ascent]
+    lines += ['%4d,   // the font descent' % descent]
+    lines += ['', '// The offsets of glyphs']
+    lines += [array_str_from_ints(offsets[i:i + 16])
+                for i in xrange(0, len(offsets), 16)]
+    lines += ['', '// Glyphs (DWidth Width Height XOffset YOffset Rows)']
+    for i, (ch, g) in enumerate(glyphs):
+        if g:
+            lines += ['// %d: U+%04X' % (i, ord(ch))]
+            lines += [array_str_from_ints(g)]
+    return lines
+
+
+BDF_SAMPLE = """\
+STARTFONT 2.1
+FONT -sample-fixed-medium-r-normal--8-80-75-75-c-50-iso10646-1
+SIZE 8 75 75
+FONTBOUNDINGBOX 5 8 0 -2
+STARTPROPERTIES 2
+FONT_ASCENT 6
+FONT_DESCENT 2
+ENDPROPERTIES
+CHARS 2
+STARTCHAR A
+ENCODING 65
+SWIDTH 500 0
+DWIDTH 5 0
+BBX 3 4 1 0
+BITMAP
+40
+A0
+E0
+A0
+ENDCHAR
+STARTCHAR unencoded
+ENCODING -1 200
+DWIDTH 5 0
+BBX 1 1 0 0
+BITMAP
+80
+ENDCHAR
+ENDFONT
+"""
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+This module breaks the ROM footprint of a pack of multilanguage messages
+down, and formats the breakdown as a table or as JSON.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import json
+from collections import OrderedDict
+
+
+#------------------------------------------------------------------------------
+# Breakdown
+#------------------------------------------------------------------------------
+
+def words(rows):
+    """Return the number of words of given IntRows.
+    """
+    return rows.size()
+
+
+def breakdown(langs, header, lang_msgs, ordered=False):
+    """Return sizes in bytes of sections of a pack.
+
+    Arguments
+    ---------
+    langs
+        language names
+    header
+        the MLangHeader of the pack as an integer list
+    lang_msgs
+        the LangMsg sections of each language as (comment, IntRows) pairs
+    ordered
+        True if the header has a MsgSlot table
+    """
+    msg_total = header[0]
+    sizes = OrderedDict()
+    sizes['header'] = 2 * 2
+    sizes['lang_offsets'] = 2 * (len(langs) + 1)
+    sizes['msg_slots'] = 2 * msg_total if ordered else 0
+    sizes['languages'] = OrderedDict()
+    for lang, sections in zip(langs, lang_msgs):
+        lines = [ints for _, ints in sections]
+        size = OrderedDict()
+        size['code_page'] = 2 * sum(words(x) for x in lines[:-2])
+        size['msg_offsets'] = 2 * words(lines[-2])
+        size['text'] = 2 * words(lines[-1])
+        size['total'] = sum(size.values())
+        sizes['languages'][lang] = size
+    sizes['total'] = (sizes['header'] + sizes['lang_offsets'] +
+                      sizes['msg_slots'] +
+                      sum(x['total'] for x in sizes['languages'].values()))
+    return sizes
+
+
+def top_messages(langs, msg_ids, msgs, char_sizes, n=10):
+    """Return the n largest messages as dicts of language, ID, size in bytes,
+    and text.
+    """
+    items = [(len(m) * size, lang, id, m)
+                for lang, lang_msgs, size in zip(langs, msgs, char_sizes)
+                for id, m in zip(msg_ids, lang_msgs)]
+    items.sort(key=lambda x: -x[0])
+    return [OrderedDict([('lang', lang), ('id', id), ('bytes', size),
+                         ('text', m)])
+                for size, lang, id, m in items[:n]]
+
+
+def duplicates(langs, msg_ids, msgs, char_sizes, n=10):
+    """Return the n most wasteful duplicate messages of a language as dicts
+    of language, IDs, wasted bytes, and text.
+
+    Example
+    -------
+    >>> dup = duplicates(['En'], 'ABC', [['ab', '', 'ab']], [2])[0]
+    >>> dup['ids'], dup['bytes']
+    (['A', 'C'], 4)
+    """
+    items = []
+    for lang, lang_msgs, size in zip(langs, msgs, char_sizes):
+        groups = OrderedDict()
+        for id, m in zip(msg_ids, lang_msgs):
+            if m:
+                groups.setdefault(m, []).append(id)
+        items += [((len(ids) - 1) * len(m) * size, lang, ids, m)
+                    for m, ids in groups.items() if len(ids) > 1]
+    items.sort(key=lambda x: -x[0])
+    return [OrderedDict([('lang', lang), ('ids', ids), ('bytes', wasted),
+                         ('text', m)])
+                for wasted, lang, ids, m in items[:n]]
+
+
+#------------------------------------------------------------------------------
+# Output
+#------------------------------------------------------------------------------
+
+def table_lines(fp):
+    """Return lines of a footprint in a table.
+    """
+    def row(name, size):
+        percent = 100.0 * size / fp['total'] if fp['total'] else 0.0
+        return '%-36s %8d %6.1f%%' % (name, size, percent)
+
+    def excerpt(text, width=30):
+        text = text.replace('\n', ' ')
+        return text if len(text) <= width else text[:width - 3] + '...'
+
+    sizes = fp['sections']
+    lines = ['', '# ROM footprint (bytes)']
+    lines += [row('Header', sizes['header'])]
+    lines += [row('Language offsets', sizes['lang_offsets'])]
+    if sizes['msg_slots']:
+        lines += [row('Message slots', sizes['msg_slots'])]
+    for lang, size in sizes['languages'].items():
+        if size['code_page']:
+            lines += [row('%s code page' % lang, size['code_page'])]
+        lines += [row('%s message offsets' % lang, size['msg_offsets'])]
+        lines += [row('%s text' % lang, size['text'])]
+    lines += [row('Total', fp['total'])]
+
+    lines += ['', '# ROM footprint of packing options (bytes)']
+    lines += ['%-36s %8d' % x for x in fp['options'].items()]
+
+    lines += ['', '# Top %d largest messages (bytes)' % len(fp['top'])]
+    lines += ['%-10s %-24s %6d  %s' % (x['lang'], x['id'], x['bytes'],
+                                       excerpt(x['text']))
+                for x in fp['top']]
+
+    if fp['duplicates']:
+        lines += ['', '# Duplicate messages (wasted bytes)']
+        lines += ['%-10s %-24s %6d  %s' % (x['lang'], ','.join(x['ids']),
+                                           x['bytes'], excerpt(x['text']))
+                    for x in fp['duplicates']]
+    return lines
+
+
+def save_json_file(fn, fp):
+    """Save a footprint into a JSON file.
+    """
+    with open(fn, 'w') as out_file:
+        json.dump(fp, out_file, indent=2, separators=(',', ': '))
+        out_file.write('\n')
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -10,30 +10,225 @@ __version__ = "1.07"
 __author__ = "Jiang Yu-Kuan <yukuan.jiang@gmail.com>"
 __date__ = "2012/11/27 (initial version) ~ 2019/04/10 (last revision)"
 
+import os
 import sys
 import re
+import time
 import argparse
-from itertools import izip, islice, ifilterfalse, takewhile
-
-import xlrd
-import xlutils.copy
+import traceback
+from StringIO import StringIO
+from collections import OrderedDict
+from array import array
+from itertools import izip, ifilterfalse, chain
 
 from myutil import read_unicode, save_utf8_file, save_utf16_file
-from myutil import prefix_info, c_identifier, wrap_header_guard
+from myutil import prefix_info, c_identifiers, wrap_header_guard
 from myutil import seq_divide, array_str_from_ints, offsets_from_lens
-import gtrans
-import arabic
+from myutil import cumsum, pool_map, close_pools, keep_unchanged_files
+import layout
+import footprint
+import registry
+import perfhash
+import charuse
+import mo
+import packdiff
+import font
+import metrics
+import segments
+import batch
+from dictionary import Column, Dictionary, as_dictionary
+from carray import IntRows
+import timing
+from timing import phase
 
 
 #-----------------------------------------------------------------------------
 # File Read
 #-----------------------------------------------------------------------------
 
-def read_xls(fn='dic.xls'):
-    """Read an Excel file and return rows.
+def read_xls(fn='dic.xls', sheet=0):
+    """Read a sheet (the first one by default) of an Excel file and return
+    rows. A sheet is given by its index or its name.
     This function will remove empty rows, empty columns, comment rows, and
     comment columns. A comment row/col is prefixing with a letter 'x' or 'X'.
     """
+    return read_numbered_xls(fn, sheet)[1]
+
+
+def read_numbered_xls(fn='dic.xls', sheet=0):
+    """Return the name of a sheet of an Excel file, its rows as read_xls
+    returns, and the row numbers (from 1) of the rows in the sheet.
+    """
+    import xlrd
+
+    with phase('read'):
+        book = xlrd.open_workbook(fn, on_demand=True)
+        if isinstance(sheet, basestring):
+            if sheet not in book.sheet_names():
+                raise ValueError('No sheet "%s" in "%s"' % (sheet, fn))
+            sheet = book.sheet_by_name(sheet)
+        else:
+            sheet = book.sheet_by_index(sheet)
+        rows = [sheet.row_values(y) for y in xrange(sheet.nrows)]
+        book.release_resources()
+
+    with phase('clean'):
+        numbers = []
+        rows = remove_comments(rows, numbers)
+    return sheet.name, rows, numbers
+
+
+def read_sheet(fn, sheet=0):
+    """Return a Dictionary of a sheet of an Excel file (see read_xls), which
+    keeps the sheet and the row of each message.
+    """
+    name, rows, numbers = read_numbered_xls(fn, sheet)
+    with phase('clean'):
+        return Dictionary.from_rows(rows, (u'%s:%s' % (fn, name), numbers))
+
+
+def split_spec(spec):
+    """Return the filename and the sheet name (None for the first sheet) of a
+    dictionary spec.
+
+    Example
+    -------
+    >>> split_spec('dic.xls'), split_spec('dic.xls#Menu')
+    (('dic.xls', None), ('dic.xls', 'Menu'))
+    """
+    fn, sep, sheet = spec.rpartition('#')
+    if not sep or os.path.exists(spec):
+        return spec, None
+    return fn, sheet
+
+
+def dic_sources(specs):
+    """Return (filename, sheet) sources of dictionary specs. A spec is a
+    filename for the first sheet of the file, "<filename>#<sheet name>" for a
+    sheet, or "<filename>#*" for all sheets of the file.
+    """
+    sources = []
+    for spec in specs:
+        fn, sheet = split_spec(spec)
+        if sheet is None:
+            sources += [(fn, 0)]
+        elif sheet == '*':
+            import xlrd
+            with phase('read'):
+                book = xlrd.open_workbook(fn, on_demand=True)
+                sources += [(fn, name) for name in book.sheet_names()]
+                book.release_resources()
+        else:
+            sources += [(fn, sheet)]
+    return sources
+
+
+def source_name(source):
+    """Return the name of a (filename, sheet) source in messages.
+
+    Example
+    -------
+    >>> source_name(('dic.xls', 0)), source_name(('dic.xls', 'Menu'))
+    ('dic.xls', 'dic.xls#Menu')
+    """
+    fn, sheet = source
+    return fn if sheet == 0 else '%s#%s' % (fn, sheet)
+
+
+def read_sources(sources, jobs=None):
+    """Return a Dictionary of each (filename, sheet) source. A source is parsed
+    once
+    until its file is modified, and sources not parsed yet are parsed in
+    parallel by the given jobs (default: a process per source, up to the
+    number of CPUs).
+    """
+    import multiprocessing
+
+    todo = [s for s in sorted(set(sources))
+                if not batch.cached(read_sheet, *s)]
+    if jobs is None:
+        jobs = min(len(todo), multiprocessing.cpu_count())
+    todo = [(read_sheet,) + s for s in todo]
+    for job, dic in zip(todo, pool_map(read_file_job, todo, jobs)):
+        batch.store(read_sheet, job[1], dic, job[2])
+    return [batch.cached_read(read_sheet, *s) for s in sources]
+
+
+def merge_sources(sources, dics):
+    """Return a Dictionary merging the Dictionaries of sources into one.
+
+    Languages are the columns of the first source, and the other sources
+    must have the same columns, which may be in another order (the case of
+    headings is ignored). Messages are ordered by sources, and then by rows
+    of a source. A message ID defined by more than one source is an error.
+
+    Example
+    -------
+    >>> a = Dictionary.from_rows([(u'ID', u'English', u'Chinese'),
+    ...                           (u'', u'OK', u'\\u597d')])
+    >>> b = Dictionary.from_rows([(u'chinese', u'english', u'id'),
+    ...                           (u'\\u662f', u'YES', u'')])
+    >>> merge_sources([('a.xls', 0), ('b.xls', 0)], [a, b]).rows()[1:]
+    [(u'', u'OK', u'\\u597d'), (u'', u'YES', u'\\u662f')]
+    >>> merge_sources([('a.xls', 0), ('b.xls', 0)], [a, a])
+    Traceback (most recent call last):
+    ...
+    ValueError: Duplicate message ID "OK" in "a.xls" and "b.xls"
+    """
+    pairs = [(s, dic) for s, dic in zip(sources, dics) if dic.heads]
+    if len(pairs) < 2:
+        return pairs[0][1] if pairs else Dictionary()
+
+    first = pairs[0][1]
+    for source, dic in pairs:
+        if sorted(dic.keys) != sorted(first.keys):
+            raise ValueError('Languages of "%s" (%s) differ from those of '
+                             '"%s" (%s)' % (source_name(source),
+                             ', '.join(dic.heads), source_name(pairs[0][0]),
+                             ', '.join(first.heads)))
+
+    if 'ID' in first and 'ENGLISH' in first and not _id_collisions['suffix']:
+        owners = {}     # message ID: index of pairs
+        for i, (source, dic) in enumerate(pairs):
+            for id in gen_msg_ids(dic):
+                if owners.get(id, i) != i:
+                    first_source = pairs[owners[id]][0]
+                    raise ValueError('Duplicate message ID "%s" in "%s" and '
+                                     '"%s"' % (id, source_name(first_source),
+                                               source_name(source)))
+                owners[id] = i
+
+    origins = sum((dic.origins for _, dic in pairs), ())
+    if not all(dic.origins for _, dic in pairs):
+        origins = ()
+    return Dictionary(first.heads, [Column.concat([dic.column(k)
+                                                   for _, dic in pairs])
+                                    for k in first.keys], origins)
+
+
+def read_dic(specs, jobs=None):
+    """Return a Dictionary merged from the sheets of dictionary specs (see
+    dic_sources and merge_sources).
+    """
+    sources = dic_sources(specs)
+    return merge_sources(sources, read_sources(sources, jobs))
+
+
+def remove_comments(rows, numbers=None):
+    """Return rows of cell values removing empty rows, empty columns, comment
+    rows, and comment columns. Given a list, the row numbers (from 1) of the
+    rows returned are appended to it.
+
+    Example
+    -------
+    >>> numbers = []
+    >>> remove_comments([(u'', u'ID', u'English'), (u'', u'', u''),
+    ...                  (u'', u'Yes', u'OK'), (u'x', u'No', u'Note'),
+    ...                  (u'', u'', u'Cancel')], numbers)
+    [(u'ID', u'English'), (u'Yes', u'OK'), (u'', u'Cancel')]
+    >>> numbers
+    [1, 3, 5]
+    """
     def is_all_empty(seq):
         for v in seq:
             if v is not u'':
@@ -46,55 +241,75 @@ def read_xls(fn='dic.xls'):
                 return False
         return True
 
-    sheet = xlrd.open_workbook(fn).sheet_by_index(0)
-    rows = (sheet.row_values(y) for y in xrange(sheet.nrows))
-    rows = ([unicode(v).strip() for v in vals] for vals in rows)
+    def remove_rows(ys, rows, removed):
+        pairs = [(y, vals) for y, vals in izip(ys, rows) if not removed(vals)]
+        return [y for y, _ in pairs], [vals for _, vals in pairs]
+
+    rows = [[unicode(v).strip() for v in vals] for vals in rows]
+    ys = range(1, len(rows) + 1)
 
     # Remove empty rows and empty columns
-    rows = ifilterfalse(is_all_empty, rows)
+    ys, rows = remove_rows(ys, rows, is_all_empty)
     cols = ifilterfalse(is_all_empty, izip(*rows))
 
     cols = list(cols)
-    comment_col = list(islice(takewhile(is_comment_line, cols), 0, None))
-    has_comment_col = bool(comment_col)
+    has_comment_col = bool(cols) and is_comment_line(cols[0])
 
     rows = zip(*cols)
-    comment_row = list(islice(takewhile(is_comment_line, rows), 0, None))
-    has_comment_row = bool(comment_row)
+    has_comment_row = bool(rows) and is_comment_line(rows[0])
 
     # Remove comment rows and comment columns
     if has_comment_col:
-        rows = (vals[1:] for vals in rows if vals[0] not in ('x', 'X'))
+        ys, rows = remove_rows(ys, rows, lambda vals: vals[0] in ('x', 'X'))
+        rows = [vals[1:] for vals in rows]
     if has_comment_row:
         cols = (vals[1:] for vals in izip(*rows) if vals[0] not in ('x', 'X'))
-        rows = izip(*cols)
+        rows = zip(*cols)
+        ys = ys[1:]
 
     # Remove empty rows and empty columns (after removing comments)
-    rows = ifilterfalse(is_all_empty, rows)
+    ys, rows = remove_rows(ys, rows, is_all_empty)
     cols = ifilterfalse(is_all_empty, izip(*rows))
-    rows = izip(*cols)
+    rows = zip(*cols)
+
+    if numbers is not None:
+        numbers += ys[:len(rows)]
+    return rows
 
-    return list(rows)
+
+def cached_char_lst(fn):
+    """Return char:index items from a given char list file. The file is read
+    once until it is modified.
+    """
+    return batch.cached_read(read_char_lst, fn)
 
 
 def read_char_lst(fn):
     """Return char:index items from a given char list file.
     """
-    lines = read_unicode(fn).splitlines()
-    lines = (x.rstrip() for x in lines)
-    lines = (x for x in lines if len(x) > 0 and not x.startswith('#'))
-    idx = 0
-    dic = {}
-    for line in lines:
-        if line.startswith(':'):
-            offset = eval(line[1:])
-            if str(offset).isdigit():
-                idx = offset
-        else:
-            idxes = range(idx, idx + len(line))
-            dic.update(zip(line, idxes))
-            idx += len(line)
-    return dic
+    with phase('read'):
+        lines = read_unicode(fn).splitlines()
+        lines = (x.rstrip() for x in lines)
+        lines = (x for x in lines if len(x) > 0 and not x.startswith('#'))
+        idx = 0
+        dic = {}
+        for line in lines:
+            if line.startswith(':'):
+                offset = eval(line[1:])
+                if str(offset).isdigit():
+                    idx = offset
+            else:
+                idxes = range(idx, idx + len(line))
+                dic.update(zip(line, idxes))
+                idx += len(line)
+        return dic
+
+
+def read_file_job(job):
+    """Return the result of a read function with (function, filename,
+    arguments...).
+    """
+    return job[0](*job[1:])
 
 
 #-----------------------------------------------------------------------------
@@ -121,47 +336,128 @@ def trans(text, src, dest):
         sub = lambda mo: unichr(int(mo.group(1)))
         return pat.sub(sub, unicode(line))
 
+    import gtrans
+
     sys.stdout.write('.')
     return html_decode(gtrans.translate(text, src, dest))
 
 
 def trans_dicfile(infile='dic_empty.xls', outfile='dic_trans.xls',
-                  lang_name_row=1, src_lang_col=2):
+                  lang_name_row=1, src_lang_col=2, tm_threshold=0.7,
+                  tm_flag=False, report_fn='trans.report'):
     """Translate/Fill an Excel dictionary file.
 
+    An empty message is filled from a translation memory of the messages of
+    its language before it is sent to the translator: the translation of the
+    same source text is reused, and that of a near match (see the tmem
+    module), with numbers changed if the texts differ only in numbers. Near
+    matches are listed in a report file to review.
+
+    The output is an .xls file copied from the input file, or an .xlsx file
+    streamed row by row if its name ends with ".xlsx" (see the workbook
+    module); either has all the sheets and columns of the input file.
+
     Arguments
     ---------
     infile
         The Excel file to be translated
+    outfile
+        The Excel file of the output, an .xls or .xlsx file
     trans
         A translator
     lang_name_row
         row of language names
     src_lang_col
         column of the source language
+    tm_threshold
+        the least similarity (0 < tm_threshold <= 1) of a near match; 1 to
+        reuse only the translations of the same source texts
+    tm_flag
+        True to translate the messages of near matches other than changed
+        numbers, instead of filling them, with the near matches still listed
+        in the report file
+    report_fn
+        filename of the report file of near matches
     """
-    wb_r = xlrd.open_workbook(infile)
+    import xlrd
+    import tmem
+    import workbook
+
+    if not 0 < tm_threshold <= 1:
+        raise ValueError('Threshold of near matches %s is not in (0, 1]'
+                         % tm_threshold)
+
+    with phase('read'):
+        wb_r = xlrd.open_workbook(infile)
     sh_r = wb_r.sheet_by_index(0)
     header = [cell.value for cell in sh_r.row(lang_name_row)]
     keys_ = [cell.value for cell in sh_r.col(src_lang_col)[lang_name_row + 1:]]
 
-    wb_w = xlutils.copy.copy(wb_r)
-    sh_w = wb_w.get_sheet(0)
-
     src = header[src_lang_col]
     dests = header[src_lang_col + 1:]
     c_idxs = range(src_lang_col + 1, len(dests) + src_lang_col + 1)
     r_idxs = range(lang_name_row + 1, len(keys_) + lang_name_row + 1)
 
     sys.stdout.write('translating')
+    exact = near = translated = 0
+    lines = []
+    filled = {}     # column: messages
     for c, dest in zip(c_idxs, dests):
-        msgs = [cell.value for cell in sh_r.col(c)[lang_name_row + 1:]]
-        msgs = [m or trans(k, src, dest) for m, k in zip(msgs, keys_)]
-        for r, m in zip(r_idxs, msgs):
-            sh_w.write(r, c, m)
-
-    wb_w.save(outfile)
+        msgs = filled[c] = [cell.value
+                                for cell in sh_r.col(c)[lang_name_row + 1:]]
+        if all(msgs):
+            continue
+        with phase('index'):
+            known = {}      # source text: translation
+            for m, k in zip(msgs, keys_):
+                if m and k:
+                    known.setdefault(k, m)
+            memory = tmem.TransMemory(known)
+        found = []
+        for i, (m, k) in enumerate(zip(msgs, keys_)):
+            if m:
+                continue
+            if k in known:
+                msgs[i] = known[k]
+                exact += 1
+                continue
+            matches = memory.search(k, tm_threshold) if k else []
+            if matches:
+                ratio, match = matches[0]
+                adapted = tmem.adapt(k, match, known[match])
+                found += [(i, ratio, match, adapted)]
+                near += 1
+                if adapted is not None or not tm_flag:
+                    msgs[i] = known[match] if adapted is None else adapted
+                    continue
+            msgs[i] = trans(k, src, dest)
+            translated += 1
+            if k and k not in known:
+                known[k] = msgs[i]
+                memory.add(k)
+        if found:
+            lines += ['', '# %s: near matches' % dest]
+            lines += [u'Row %d: %.2f "%s" ~ "%s"%s'
+                        % (r_idxs[i] + 1, ratio, keys_[i], match,
+                           ' (numbers changed)' if adapted is not None else
+                           ' (translated)' if tm_flag else '')
+                        for i, ratio, match, adapted in found]
+
+    with phase('write'):
+        with workbook.open_writer(outfile, wb_r) as writer:
+            for i, sheet in enumerate(wb_r.sheets()):
+                writer.add_sheet(sheet.name)
+                for r in xrange(sheet.nrows):
+                    values = sheet.row_values(r)
+                    if i == 0 and r > lang_name_row:
+                        for c in c_idxs:
+                            values[c] = filled[c][r - lang_name_row - 1]
+                    writer.write_row(values)
+        save_utf16_file(report_fn, prefix_authorship(lines,
+                                                     comment_mark='#'))
     sys.stdout.write('\nFile "%s" has saved' % outfile)
+    sys.stdout.write('\nTranslation memory: %d same, %d near, %d translated '
+                     '(see "%s")\n' % (exact, near, translated, report_fn))
 
 
 #-----------------------------------------------------------------------------
@@ -181,24 +477,156 @@ def get_lang_names(rows):
     """
     Get language names
     """
-    heads = rows[0]
-    return [h for h in heads if h.upper() != 'ID']
+    return as_dictionary(rows).langs
 
 
 def gen_mlang_tbl(rows):
-    """Generate the multilanguage message table.
+    """Generate the multilanguage message table, i.e., heading: Column items.
     """
-    heads = (h.upper() for h in rows[0])
-    cols = izip(*rows[1:])
-    return dict(izip(heads, cols))
+    dic = as_dictionary(rows)
+    return dict(izip(dic.keys, dic.columns))
+
+
+class BuildCache(object):
+    """Results kept between builds of a long-running process (see watch and
+    serve), so that a build redoes only the work of what changed. Commands
+    run without a cache start from scratch.
+    """
+    def __init__(self):
+        self.char_indexes = {}  # language: CharIndex of the messages of
+                                # the last verify
+        self.packed = {}        # language: (pack_lang arguments,
+                                # pack_lang_job result) of the last pack
+
+
+def clear_caches():
+    """Clear the caches of this process: shaped Arabic messages, message IDs,
+    the translate table of char_idxes, and the pools of processes with their
+    own caches, so that the next command runs cold (e.g., between runs of a
+    benchmark).
+    """
+    close_pools()
+    _shaped.clear()
+    _msg_ids.clear()
+    _idx_tbl[:] = [None, None]
+
+
+_shaped = {}    # message: shaped message
+
+
+def shape(msg):
+    """Return a shaped Arabic message. Shaped messages are cached, so a
+    message is shaped once in a process (e.g., by verify and pack of a batch).
+    """
+    try:
+        return _shaped[msg]
+    except KeyError:
+        import arabic
+        _shaped[msg] = arabic.shape(msg)
+        return _shaped[msg]
+
+
+_msg_ids = {}   # ID or English message: message ID
+_id_collisions = {'suffix': False}
+
+
+def suffix_id_collisions(suffix=True):
+    """Make gen_msg_ids append a suffix ("_2", "_3", ...) to a message ID
+    generated again by a later message, instead of raising a ValueError.
+    """
+    _id_collisions['suffix'] = suffix
+
+
+def unique_ids(ids, texts, origin=None):
+    """Return message IDs with collisions resolved. A message ID generated
+    again from the text of a later message is an error, or it gets the first
+    free suffix "_n" (n = 2, 3, ...) in the order of messages. The error
+    names messages by the sheets and the rows returned by a given function
+    of a message index (e.g., Dictionary.origin), or by their numbers.
+
+    Message IDs are generated by c_identifiers, so they have no underscore,
+    and a suffixed ID never takes the name of another message.
+    """
+    if len(set(ids)) == len(ids):
+        return ids
+    where = lambda i: (origin and origin(i)) or 'message %d' % (i + 1)
+    firsts = {}     # message ID: index of the message taking it
+    unique = []
+    for i, id in enumerate(ids):
+        if id in firsts:
+            if not _id_collisions['suffix']:
+                j = firsts[id]
+                raise ValueError('Message ID "MSG_%s" of %s ("%s") collides '
+                                 'with that of %s ("%s")' % (id, where(i),
+                                 texts[i], where(j), texts[j]))
+            n = 2
+            while '%s_%d' % (id, n) in firsts:
+                n += 1
+            id = '%s_%d' % (id, n)
+        firsts[id] = i
+        unique += [id]
+    return unique
 
 
 def gen_msg_ids(rows):
-    """ Generate and return message IDs.
+    """ Generate and return message IDs. Message IDs are cached, so a message
+    is converted once in a process (e.g., by watch). Messages converted to
+    the same message ID collide (see unique_ids).
+
+    Example
+    -------
+    >>> rows = [(u'ID', u'English'), (u'', u'Play!'), (u'', u'Hello World'),
+    ...         (u'', u'hello world'), (u'Bye', u'Ciao')]
+    >>> gen_msg_ids(Dictionary.from_rows(rows))
+    Traceback (most recent call last):
+      ...
+    ValueError: Message ID "MSG_HelloWorld" of message 3 ("hello world") \
+collides with that of message 2 ("Hello World")
+    >>> dic = Dictionary.from_rows(rows, (u'dic.xls:Sheet1', [1, 2, 4, 5, 9]))
+    >>> gen_msg_ids(dic)
+    Traceback (most recent call last):
+      ...
+    ValueError: Message ID "MSG_HelloWorld" of dic.xls:Sheet1 row 5 \
+("hello world") collides with that of dic.xls:Sheet1 row 4 ("Hello World")
+    >>> suffix_id_collisions()
+    >>> gen_msg_ids(dic)
+    [u'PlayE', u'HelloWorld', u'HelloWorld_2', u'Bye']
+    >>> suffix_id_collisions(False)
     """
-    tbl = gen_mlang_tbl(rows)
-    ids = (id or msg for id, msg in zip(tbl['ID'], tbl['ENGLISH']))
-    return [c_identifier(id) for id in ids]
+    with phase('clean'):
+        dic = as_dictionary(rows)
+        texts = [id or msg for id, msg in izip(dic.column('ID'),
+                                               dic.column('ENGLISH'))]
+        new = [x for x in set(texts) if x not in _msg_ids]
+        _msg_ids.update(izip(new, c_identifiers(new)))
+        return unique_ids([_msg_ids[x] for x in texts], texts, dic.origin)
+
+
+def registered_rows(rows, registry_fn, block=16):
+    """Return a Dictionary of rows ordered by the values of message IDs in a
+    registry file. The registry file is not updated.
+
+    Rows are padded up to a multiple of the given block, so that new messages
+    take reserved rows without changing the number of rows. The row of a
+    tombstone or a reserved value has an ID only.
+    """
+    dic = as_dictionary(rows)
+    msg_ids = gen_msg_ids(dic)
+    with phase('read'):
+        entries = registry.read_registry(registry_fn)
+    entries = registry.register(entries, msg_ids)
+    ids = dict((v, id) for v, id, _ in entries)
+    slots = list(registry.slots(entries, msg_ids, block))
+
+    columns = []
+    for key, col in zip(dic.keys, dic.columns):
+        if key == 'ID':
+            msgs = (ids.get(v, u'Reserved%d' % v) if i is None else col[i]
+                        for v, i in enumerate(slots))
+        else:
+            msgs = (u'' if i is None else col[i] for i in slots)
+        columns += [Column.from_msgs(msgs)]
+    return Dictionary(dic.heads, columns)
 
 
 #-----------------------------------------------------------------------------
@@ -208,75 +636,411 @@ def gen_msg_ids(rows):
 def gen_lang_id_hfile(rows, h_fn):
     """Generate a C header file of language ID enumeration.
     """
-    lines = ['/** Language Indexes */']
-    lines += ['typedef enum {']
-    lines += ['    L_%s,' % lang for lang in get_lang_names(rows)]
-    lines += ['    L_End,']
-    lines += ['    L_Total = L_End']
-    lines += ['} Lang;']
+    with phase('format'):
+        lines = ['/** Language Indexes */']
+        lines += ['typedef enum {']
+        lines += ['    L_%s,' % lang for lang in get_lang_names(rows)]
+        lines += ['    L_End,']
+        lines += ['    L_Total = L_End']
+        lines += ['} Lang;']
 
-    lines = wrap_header_guard(lines, h_fn)
-    lines = prefix_authorship(lines, comment_mark='//')
-    save_utf8_file(h_fn, lines)
+        lines = wrap_header_guard(lines, h_fn)
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        save_utf8_file(h_fn, lines)
 
 
-def gen_msg_id_hfile(rows, h_fn):
+def gen_msg_id_hfile(rows, h_fn, registry_fn=None, key_fn=None):
     """Generate a C header file of message ID enumeration.
+
+    With a registry file, message IDs are enumerated with the values fixed in
+    it, and the registry file is updated to register new message IDs and
+    tombstone deleted ones.
+
+    With a key file, a C included file of mlkey.c is generated as well, which
+    lists a minimal perfect hash that maps the names of message IDs (without
+    "MSG_") to their values (see the perfhash module).
     """
-    lines = ['/** IDs of Messages */']
-    lines += ["typedef enum {"]
-    lines += ['    MSG_%s,' % id for id in gen_msg_ids(rows)]
-    lines += ['    MSG_End,']
-    lines += ['    MSG_Total = MSG_End']
-    lines += ['} MsgID;']
+    msg_ids = gen_msg_ids(rows)
+    if registry_fn:
+        with phase('read'):
+            entries = registry.read_registry(registry_fn)
+        entries = registry.register(entries, msg_ids)
+        with phase('write'):
+            registry.save_registry(registry_fn, entries)
+    if key_fn:
+        gen_msg_key_file(msg_ids, key_fn, entries if registry_fn else None)
+
+    with phase('format'):
+        lines = ['/** IDs of Messages */']
+        lines += ["typedef enum {"]
+        if registry_fn:
+            lines += [('    // MSG_%s = %d, (deleted)' if deleted else
+                       '    MSG_%s = %d,') % (id, v)
+                        for v, id, deleted in entries]
+            lines += ['    MSG_End = %d,' %
+                        (entries[-1][0] + 1 if entries else 0)]
+        else:
+            lines += ['    MSG_%s,' % id for id in msg_ids]
+            lines += ['    MSG_End,']
+        lines += ['    MSG_Total = MSG_End']
+        lines += ['} MsgID;']
+
+        lines = wrap_header_guard(lines, h_fn)
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        save_utf8_file(h_fn, lines)
 
-    lines = wrap_header_guard(lines, h_fn)
-    lines = prefix_authorship(lines, comment_mark='//')
-    save_utf8_file(h_fn, lines)
 
+def gen_msg_key_file(msg_ids, key_fn, entries=None):
+    """Generate a C included file listing a minimal perfect hash table of the
+    names of message IDs.
 
-def verify(rows, char_tbl, report_fn):
+    Arguments
+    ---------
+    msg_ids
+        message IDs (i.e., the names without "MSG_")
+    entries
+        (value, message ID, deleted) entries of the registry, if any, which
+        give the values of message IDs
+    """
+    if entries is None:
+        values = range(len(msg_ids))
+    else:
+        value = dict((id, v) for v, id, deleted in entries if not deleted)
+        values = [value[id] for id in msg_ids]
+    keys = [id.encode('ascii') for id in msg_ids]
+    with phase('index'):
+        seeds, slots = perfhash.build(keys)
+    with phase('format'):
+        lines = perfhash.table_lines(seeds, [keys[i] for i in slots],
+                                     [values[i] for i in slots])
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        save_utf8_file(key_fn, lines)
+
+
+def verify(rows, char_tbl, report_fn, json_fn=None, state_fn=None, jobs=1,
+           cache=None):
     """Generate a report file to list used-but-not-listed characters and
-    listed-but-not-used characters.
+    listed-but-not-used characters, with the messages using each of the
+    used-but-not-listed characters.
+
+    Chars are collected into an inverted index from chars to messages of each
+    language (see charuse.CharIndex). The indexes are updated incrementally
+    for changed messages from the last verify of a BuildCache or of a state
+    file, if any; otherwise they are built from scratch. With more than one
+    job, Arabic messages are shaped across a pool of processes.
+
+    Arguments
+    ---------
+    json_fn
+        the filename to save the report as JSON as well, if any
+    state_fn
+        filename of the state file to keep the indexes between runs, if any
+    cache
+        a BuildCache keeping the indexes between runs of a process, if any
     """
-    def get_mlang_records(rows):
-        """Get records without ID column
-        """
-        heads, records = rows[0], rows[1:]
-        heads = [h.upper() for h in heads]
-        try:
-            i = heads.index('ARABIC')
-            records = [list(r) for r in records]
-            for r in records:
-                r[i] = arabic.shape(r[i])
-        except ValueError:
-            pass
-        i = heads.index('ID')
-        return [r[:i] + r[i+1:] for r in records]
+    dic = as_dictionary(rows)
+    char_indexes = {} if cache is None else cache.char_indexes
+    if state_fn:
+        with phase('read'):
+            for lang, idx in charuse.load_state(state_fn).iteritems():
+                char_indexes.setdefault(lang, idx)
 
     char_use = set([])
-    for r in get_mlang_records(rows):
-        char_use |= set(''.join(r))
+    indexed = 0
+    for lang in dic.langs:
+        msgs = get_lang_msgs(dic, lang, jobs)
+        with phase('index'):
+            if lang in char_indexes:
+                indexed += char_indexes[lang].update(msgs)
+            else:
+                char_indexes[lang] = charuse.CharIndex(msgs)
+                indexed += len(msgs)
+            char_use.update(char_indexes[lang].chars())
+    if state_fn and indexed:
+        with phase('write'):
+            charuse.save_state(state_fn, dict((lang, char_indexes[lang])
+                                              for lang in dic.langs))
+
+    with phase('index'):
+        char_lst = set(char_tbl)
+        char_not_lst = sorted(char_use - char_lst)
+        char_not_use = sorted(char_lst - char_use)
+        msg_ids = gen_msg_ids(dic) if char_not_lst else []
+        uses = [[(lang, ['MSG_' + msg_ids[i]
+                            for i in char_indexes[lang].messages(c)])
+                    for lang in dic.langs if char_indexes[lang].messages(c)]
+                        for c in char_not_lst]
+
+    with phase('format'):
+        lines = []
+        if char_not_lst != []:
+            lines += ['', '# Chars used but not listed:']
+            lines += seq_divide(''.join(char_not_lst), 10)
+        if char_not_use != []:
+            lines += ['', '# Chars listed but not used:']
+            lines += seq_divide(''.join(char_not_use), 10)
+        if char_not_lst != []:
+            lines += ['', '# Messages using chars not listed:']
+            for c, use in zip(char_not_lst, uses):
+                lines += [u'%s (U+%04X)' % (c, ord(c))]
+                lines += ['    %s: %s' % (lang, ', '.join(ids))
+                            for lang, ids in use]
+
+        lines = prefix_authorship(lines, comment_mark='#')
+    with phase('write'):
+        save_utf16_file(report_fn, lines)
+        if json_fn:
+            charuse.save_json_file(json_fn, charuse.json_report(
+                zip(char_not_lst, uses), char_not_use))
+
+
+def get_lang_msgs(dic, lang, jobs=1):
+    """Return the Column of messages of a given language in the form to be
+    packed. Arabic messages are shaped, in chunks across a pool of processes
+    with more than one job.
+    """
+    msgs = dic.column(lang)
+    if lang.upper() == 'ARABIC':
+        with phase('shape'):
+            msgs = Column.from_msgs(pool_map(shape, msgs.msgs(), jobs,
+                                             len(msgs) // (4 * jobs) + 1))
+    return msgs
 
-    char_lst = set(char_tbl)
-    char_not_lst = sorted(char_use - char_lst)
-    char_not_use = sorted(char_lst - char_use)
 
-    lines = []
-    if char_not_lst != []:
-        lines += ['', '# Chars used but not listed:']
-        lines += seq_divide(''.join(char_not_lst), 10)
-    if char_not_use != []:
-        lines += ['', '# Chars listed but not used:']
-        lines += seq_divide(''.join(char_not_use), 10)
+def code_page(msgs, char_tbl):
+    """Return the sorted char indexes used by a given Column of messages.
+    """
+    return sorted(set(char_tbl[c] for c in set(msgs.text)))
+
 
-    lines = prefix_authorship(lines, comment_mark='#')
-    save_utf16_file(report_fn, lines)
+def char_size(msgs, char_tbl, code_pages=False):
+    """Return the size in bytes of a packed char of a given Column of
+    messages.
+    """
+    if code_pages and len(code_page(msgs, char_tbl)) <= 256:
+        return 1
+    return 2
+
+
+def check_chars(text, char_tbl):
+    """Raise a KeyError of the first char of a text not listed in a
+    char:index table, if any.
+    """
+    missing = set(text).difference(char_tbl)
+    if missing:
+        raise KeyError(next(c for c in text if c in missing))
+
+
+_idx_tbl = [None, None]     # the char:index table, and its translate table
+                            # from chars to chars of 16-bit indexes
+
+
+def char_idxes(text, char_tbl):
+    """Return the indexes of the chars of a text in a char:index table as an
+    array('H'). A KeyError is raised for the first char not listed.
+
+    Chars are translated into chars of their indexes and encoded as UTF-16 in
+    one pass, instead of looking indexes up char by char.
+
+    Example
+    -------
+    >>> char_idxes(u'abca', {u'a': 1, u'b': 2, u'c': 300}).tolist()
+    [1, 2, 300, 1]
+    """
+    check_chars(text, char_tbl)
+    if max(char_tbl.itervalues()) > 0xFFFF:
+        return array('i', [char_tbl[c] for c in text])
+    if _idx_tbl[0] is not char_tbl:
+        _idx_tbl[:] = [char_tbl, dict((ord(c), unichr(i))
+                                      for c, i in char_tbl.iteritems())]
+    idxes = array('H')
+    idxes.fromstring(text.translate(_idx_tbl[1]).encode('utf-16-le'))
+    if sys.byteorder == 'big':
+        idxes.byteswap()
+    return idxes
+
+
+def pack_lang(lang, msgs, char_tbl, code_pages=False, order=None):
+    """Return the LangMsg of a language as a list of (comment, IntRows)
+    sections.
+
+    A LangMsg of the code-page layout is prefixed with a code page. A language
+    using more than 256 chars gets an empty code page and keeps 16-bit char
+    indexes; otherwise its messages are 8-bit indexes into the code page and
+    every two of them are packed into a word.
+
+    Messages, a Column, are laid out in the given order of message IDs, if
+    any. The text of all messages is indexed at once into an array('H') (or
+    into a byte string for 8-bit chars), and rows are slices of it.
+    """
+    with phase('index'):
+        text, lens = msgs.text, list(msgs.lengths())
+        if order is not None:
+            text = u''.join([msgs[m] for m in order])
+            lens = [lens[m] for m in order]
+        ends = array('i', cumsum(lens))
+        if not code_pages:
+            offsets = offsets_from_lens(lens)
+            return [('%s message offsets' % lang,
+                     IntRows.from_lists([offsets])),
+                    ('%s messages' % lang,
+                     IntRows(char_idxes(text, char_tbl), ends))]
+
+        check_chars(text, char_tbl)
+        page = code_page(msgs, char_tbl)
+        offsets = IntRows.from_lists([[0] + ends.tolist()])
+        if char_size(msgs, char_tbl, code_pages) == 2:
+            return [('%s code page (none; 16-bit chars)' % lang,
+                     IntRows.from_lists([[0]])),
+                    ('%s message offsets' % lang, offsets),
+                    ('%s messages' % lang,
+                     IntRows(char_idxes(text, char_tbl), ends))]
+
+        local = dict((c, unichr(i)) for i, c in enumerate(page))
+        table = dict((ord(c), local[i]) for c, i in char_tbl.iteritems()
+                        if i in local)
+        data = text.translate(table).encode('latin-1')
+        words = array('H')
+        words.fromstring(data + '\0' * (len(data) % 2))
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return [('%s code page' % lang,
+                 IntRows.from_lists([[len(page)]] + seq_divide(page, 16))),
+                ('%s message offsets (in bytes)' % lang, offsets),
+                ('%s messages (8-bit chars)' % lang,
+                 IntRows.divide(words, 16))]
+
+
+def section_lines(sections):
+    """Return an iterator over lines of the C array of given (comment,
+    IntRows) sections. Lines are formatted as they are iterated, e.g., as
+    they are written.
+    """
+    for comment, rows in sections:
+        yield ''
+        yield '// %s' % comment
+        for line in rows.lines():
+            yield line
 
 
-def pack(rows, char_tbl, h_fn):
+def section_words(sections):
+    """Return the number of words of given (comment, IntRows) sections.
+    """
+    return sum(rows.size() for _, rows in sections)
+
+
+def pack_lang_job(job):
+    """Return the number of words and the sections of the LangMsg of a
+    language with pack_lang arguments in a tuple. Sections are arrays, which
+    are passed from a worker process compactly.
+    """
+    sections = pack_lang(*job)
+    return section_words(sections), sections
+
+
+def pack_lang_jobs(jobs_, jobs=1, cache=None):
+    """Return the results of pack_lang_job of given pack_lang arguments across
+    a pool of the given jobs. With a BuildCache, a language is packed again
+    only if its arguments differ from those of the last pack of the cache.
+    """
+    if cache is None:
+        return pool_map(pack_lang_job, jobs_, jobs)
+    packed = cache.packed
+    todo = [x for x in jobs_ if packed.get(x[0], (None,))[0] != x]
+    for x, result in zip(todo, pool_map(pack_lang_job, todo, jobs)):
+        packed[x[0]] = (x, result)
+    return [packed[x[0]][1] for x in jobs_]
+
+
+def pack_header(msg_total, lang_words, order=None):
+    """Return the MLangHeader of a pack as an integer list.
+
+    Arguments
+    ---------
+    msg_total
+        the total number of messages
+    lang_words
+        the number of words of the LangMsg of each language
+    order
+        message IDs in the order of the layout; None for the ID order
+    """
+    offsets = offsets_from_lens(list(lang_words))
+    header = [msg_total, len(lang_words)]
+    if order is None:
+        header += offsets
+    else:
+        slots = [0] * msg_total
+        for slot, m in enumerate(order):
+            slots[m] = slot
+        header += [x + msg_total for x in offsets] + slots
+    return header
+
+
+def build_pack(langs, msgs, char_tbl, code_pages=False, order=None):
+    """Return the MLangHeader as an integer list and the LangMsg sections of
+    each language of a pack.
+
+    Arguments
+    ---------
+    langs
+        language names
+    msgs
+        the Column of messages of each language in the form to be packed
+    char_tbl
+        the char:index table
+    code_pages
+        True to pack with the code-page format
+    order
+        message IDs in the order of the layout; None for the ID order
+    """
+    msg_total = len(msgs[0]) if msgs else 0
+    lang_msgs = [pack_lang(lang, m, char_tbl, code_pages, order)
+                    for lang, m in zip(langs, msgs)]
+    header = pack_header(msg_total, [section_words(s) for s in lang_msgs],
+                         order)
+    return header, lang_msgs
+
+
+def pack_size(header, lang_msgs):
+    """Return the size in bytes of a pack with given header and LangMsg list.
+    """
+    return (len(header) + section_words(sum(lang_msgs, []))) * 2
+
+
+def pack_text_spans(header, lang_msgs, msgs, char_sizes, order=None):
+    """Return (address, size) of message texts in bytes of each language of a
+    pack.
+    """
+    spans = []
+    msg_total = header[0]
+    for i, sections in enumerate(lang_msgs):
+        words = section_words(sections)
+        text = section_words(sections[-1:])
+        start = 2 * (2 + header[2 + i] + words - text)
+        lens = list(msgs[i].lengths())
+        spans += [layout.text_spans(lens, order or range(msg_total), start,
+                                    char_sizes[i])]
+    return spans
+
+
+def pack(rows, char_tbl, h_fn, code_pages=False, access_profile=None,
+         layout_mode='hot', page_size=256, cache_size=4096, cache_line=32,
+         registry_fn=None, bdf_fn=None, width_fn='mwidth.i', wrap_widths=(),
+         widget_widths=None, overflow_fn='overflow.report',
+         cache_fn=None, fmt_fn=None, jobs=1, cache=None):
     """Generate a C included file listing an array that packs multilanguage
-    messages.
+    messages. With more than one job, languages are packed and formatted
+    across a pool of processes. With a BuildCache, only languages that
+    changed since the last pack of the cache are packed again.
+
+    With a BDF font, a width table of the packed messages is generated as
+    well (see gen_width_file). With fmt_fn, a format table of messages with
+    printf-style placeholders is generated as well (see gen_fmt_file), and a
+    ValueError is raised before any file is generated if the placeholders of
+    a message differ from those of ENGLISH.
 
     The Output Format
     -----------------
@@ -285,54 +1049,736 @@ def pack(rows, char_tbl, h_fn):
     MLangHeader: MsgCounterPerLang LangCount LangOffset^(L+1)
     LangMsg: MsgOffset^(M+1) Msg^M
         M: the total number of messages
+
+    The Code-page Format (code_pages=True)
+    --------------------------------------
+    LangMsg: CodePageSize CodePage^P MsgOffset^(M+1) Text
+        P: CodePageSize, the number of chars of a language (0 if > 256)
+        CodePage: the index of a char listed in the char list file
+        MsgOffset: the offset of a message from Text; a message of a language
+                   with a code page is a byte sequence of indexes of CodePage
+
+    The Ordered Format (with access_profile)
+    ----------------------------------------
+    MLangHeader: MsgCounterPerLang LangCount LangOffset^(L+1) MsgSlot^M
+        MsgSlot: the position of a message in the layout; message offsets and
+                 messages of each language are listed in the layout order
+
+    With a registry file, messages are packed in the order of the values of
+    their IDs in it, and a tombstone is packed as an empty message. Empty
+    messages are reserved for new message IDs (see registered_rows), so that
+    unchanged messages keep their offsets across releases.
     """
-    def lang_offsets(langs, mlang_tbl):
-        """Return language offsets.
-        """
-        msg_total = len(mlang_tbl['ID'])
-        langs = [lang.upper() for lang in langs]
-        lens = [msg_total+1+len(''.join(mlang_tbl[lang])) for lang in langs]
-        return offsets_from_lens(lens)
+    if widget_widths and not bdf_fn:
+        raise ValueError('Widget widths need a BDF font to measure messages')
+    dic = as_dictionary(rows)
+    if registry_fn:
+        dic = registered_rows(dic, registry_fn)
+    langs = dic.langs
+    msg_total = len(dic)
+    msgs = [get_lang_msgs(dic, lang, jobs) for lang in langs]
+
+    if fmt_fn:
+        with phase('index'):
+            segs = segments.split_langs(langs, msgs, gen_msg_ids(dic))
+            digits = segments.digit_idxes(char_tbl, segs)
+
+    info = []
+    order = None
+    if access_profile:
+        msg_ids = gen_msg_ids(dic)
+        with phase('read'):
+            counts = layout.read_access_profile(access_profile, msg_ids)
+        char_sizes = [char_size(m, char_tbl, code_pages) for m in msgs]
+        if layout_mode == 'cluster':
+            sizes = [sum(m.length(i) * n for m, n in zip(msgs, char_sizes))
+                        // max(len(langs), 1) for i in xrange(msg_total)]
+            order = layout.cluster_order(counts, sizes, page_size)
+        else:
+            order = layout.hot_order(counts)
+
+        def cache_misses(order):
+            """Return cache misses of each language with a given layout.
+            """
+            header, lang_msgs = build_pack(langs, msgs, char_tbl, code_pages,
+                                           order)
+            spans = pack_text_spans(header, lang_msgs, msgs, char_sizes, order)
+            return [layout.cache_misses(trace, s, cache_size, cache_line)
+                        for s in spans]
+
+        trace = layout.access_trace(counts)
+        before, misses = cache_misses(None), cache_misses(order)
+        info += ['Text cache misses of %d accesses (%d-byte cache, '
+                 '%d-byte lines), row order -> %s layout:'
+                    % (len(trace), cache_size, cache_line, layout_mode)]
+        info += ['    %s: %d -> %d' % x for x in zip(langs, before, misses)]
+        info += ['    Total: %d -> %d' % (sum(before), sum(misses))]
+
+    with phase('index'):
+        jobs_ = [(lang, m, char_tbl, code_pages, order)
+                    for lang, m in zip(langs, msgs)]
+        lang_words, lang_msgs = (zip(*pack_lang_jobs(jobs_, jobs, cache))
+                                 or ([], []))
+    header = pack_header(msg_total, lang_words, order)
+
+    with phase('format'):
+        lines = [''] * 2
+        lines += ['%4d,   // the total messages of a language' % msg_total]
+        lines += ['%4d,   // the total number of languages' % len(langs)]
+        lines += ['', '// The offsets of languages']
+        lines += [array_str_from_ints(header[2:len(langs) + 3])]
+        if order is not None:
+            lines += ['', '// The slots of messages in the layout']
+            lines += [array_str_from_ints(header[len(langs) + 3:])]
+
+    if code_pages:
+        single = build_pack(langs, msgs, char_tbl, order=order)
+        sizes = (2 * (len(header) + sum(lang_words)), pack_size(*single))
+        info = ['ROM size: %d bytes (%d bytes with a single table)'
+                    % sizes] + info
+
+    if info:
+        lines = [''] + ['// ' + x for x in info] + lines
+        sys.stdout.write('\n'.join(info) + '\n')
+
+    with phase('format'):
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        # LangMsg sections are formatted as they are written in chunks
+        save_utf8_file(h_fn, chain(lines, *[section_lines(x)
+                                            for x in lang_msgs]))
+
+    if bdf_fn:
+        gen_width_file(dic, msgs, width_fn, bdf_fn, wrap_widths,
+                       widget_widths, overflow_fn, cache_fn)
+    if fmt_fn:
+        gen_fmt_file(dic, segs, digits, char_tbl, fmt_fn)
+
+
+def gen_width_file(dic, msgs, width_fn, bdf_fn, wrap_widths=(),
+                   widget_widths=None, report_fn='overflow.report',
+                   cache_fn=None):
+    """Generate a C included file listing a width table of packed messages,
+    which lists the width in pixels of each message and the line breaks of
+    messages wrapped in given widths (see the metrics module for the format).
+    Arabic messages are measured as they are shaped, and wrapped in logical
+    order (see metrics.rtl_line_breaks). A char without a glyph in the font
+    is of zero width, with a warning printed.
 
-    def msg_offsets(msgs):
-        """Return message offsets.
-        """
-        return offsets_from_lens([len(x) for x in msgs])
+    Arguments
+    ---------
+    dic
+        the Dictionary of messages as packed
+    msgs
+        the Column of the packed messages of each language of dic
+    bdf_fn
+        filename of the BDF font file
+    wrap_widths
+        the widths in pixels to wrap messages in
+    widget_widths
+        filename of a text file listing message IDs with the widths in pixels
+        of their widgets (see metrics.read_widget_widths); messages wider than
+        their widgets are listed in a report file
+    report_fn
+        filename of the report file of messages wider than their widgets
+    cache_fn
+        filename of the glyph cache file (see gen_font_file)
+    """
+    if cache_fn is None:
+        cache_fn = font.cache_filename(bdf_fn)
+    wrap_widths = list(wrap_widths or [])
+    used = set()
+    for m in msgs:
+        used.update(m.text)
+    with phase('read'):
+        widths, missing = metrics.advance_widths(bdf_fn, used,
+                                                 cache_fn or None)
+    for c in missing:
+        sys.stdout.write('Warning: no glyph of U+%04X in "%s"; measured as '
+                         'zero width\n' % (ord(c), bdf_fn))
+
+    with phase('index'):
+        measured = [metrics.measure(m, widths, wrap_widths,
+                                    list(dic.column(lang))
+                                    if lang.upper() == 'ARABIC' else None)
+                        for lang, m in zip(dic.langs, msgs)]
+        sections = [metrics.lang_sections(lang, w, wraps, wrap_widths)
+                        for lang, (w, wraps) in zip(dic.langs, measured)]
+
+    with phase('format'):
+        lines = metrics.header_lines(len(dic), wrap_widths,
+                                     [section_words(x) for x in sections])
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        save_utf8_file(width_fn, chain(lines, *[section_lines(x)
+                                                for x in sections]))
+
+    if not widget_widths:
+        return
+    msg_ids = gen_msg_ids(dic)
+    with phase('read'):
+        limits = metrics.read_widget_widths(widget_widths, msg_ids)
+    with phase('format'):
+        lines = []
+        total = 0
+        for lang, m, (w, _) in zip(dic.langs, msgs, measured):
+            over = metrics.overflows(w, limits)
+            total += len(over)
+            if over:
+                lines += ['', '# %s: messages wider than their widgets' % lang]
+                lines += [u'MSG_%s: %d > %d pixels "%s"'
+                            % (msg_ids[i], width, limit,
+                               m[i].replace(u'\n', u'\\n'))
+                            for i, width, limit in over]
+        lines = prefix_authorship(lines, comment_mark='#')
+    with phase('write'):
+        save_utf16_file(report_fn, lines)
+    sys.stdout.write('Overflows: %d messages wider than their widgets of %d '
+                     '(see "%s")\n' % (total, len(limits), report_fn))
+
+
+def gen_fmt_file(dic, segs, digits, char_tbl, fmt_fn):
+    """Generate a C included file listing a format table, which splits
+    messages with printf-style placeholders into literal char runs and typed
+    placeholder slots in the order of each language, so that mlfmt.c
+    assembles them without parsing formats (see the segments module for the
+    format).
+
+    Arguments
+    ---------
+    dic
+        the Dictionary of messages as packed
+    segs
+        the segments of each message of each language of dic (see
+        segments.split_langs)
+    digits
+        the char indexes of segments.DIGITS (see segments.digit_idxes)
+    char_tbl
+        the char:index table
+    """
+    idxes = lambda text: char_idxes(text, char_tbl)
+    with phase('index'):
+        sections = [segments.lang_sections(lang, s, idxes)
+                        for lang, s in zip(dic.langs, segs)]
+
+    with phase('format'):
+        lines = segments.header_lines(len(dic), digits,
+                                      [section_words(x) for x in sections])
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        save_utf8_file(fmt_fn, chain(lines, *[section_lines(x)
+                                              for x in sections]))
 
-    def char_idx_str_from_msg(msg, char_tbl):
-        """Generate the string of indexes of chars in a message.
+
+def gen_footprint_report(rows, char_tbl, report_fn, code_pages=False,
+                         access_profile=None, top=10, json_fn=None,
+                         budget=None, registry_fn=None):
+    """Generate a report file that breaks the ROM footprint of a pack down.
+
+    Arguments
+    ---------
+    code_pages, access_profile, registry_fn
+        packing options as those of pack
+    top
+        the number of the largest messages and duplicate messages to list
+    json_fn
+        the filename to save the footprint as JSON, if any
+    budget
+        the ROM budget in bytes; exit with an error if the pack exceeds it
+    """
+    dic = as_dictionary(rows)
+    if registry_fn:
+        dic = registered_rows(dic, registry_fn)
+    langs = dic.langs
+    msg_ids = gen_msg_ids(dic)
+    msgs = [get_lang_msgs(dic, lang) for lang in langs]
+    char_sizes = [char_size(m, char_tbl, code_pages) for m in msgs]
+
+    def size(code_pages, ordered):
+        """Return the pack size in bytes with given packing options.
         """
-        return array_str_from_ints([char_tbl[c] for c in msg])
+        order = range(len(msg_ids)) if ordered else None
+        return pack_size(*build_pack(langs, msgs, char_tbl, code_pages, order))
+
+    order = None
+    if access_profile:
+        with phase('read'):
+            counts = layout.read_access_profile(access_profile, msg_ids)
+        order = layout.hot_order(counts)
+    header, lang_msgs = build_pack(langs, msgs, char_tbl, code_pages, order)
+
+    fp = OrderedDict()
+    fp['total'] = pack_size(header, lang_msgs)
+    fp['budget'] = budget
+    fp['sections'] = footprint.breakdown(langs, header, lang_msgs,
+                                         order is not None)
+    fp['options'] = OrderedDict([
+        ('single table', size(False, False)),
+        ('--code-pages', size(True, False)),
+        ('--access-profile', size(False, True)),
+        ('--code-pages --access-profile', size(True, True)),
+    ])
+    fp['top'] = footprint.top_messages(langs, msg_ids, msgs, char_sizes, top)
+    fp['duplicates'] = footprint.duplicates(langs, msg_ids, msgs, char_sizes,
+                                            top)
+
+    with phase('format'):
+        lines = footprint.table_lines(fp)
+        lines = prefix_authorship(lines, comment_mark='#')
+    with phase('write'):
+        save_utf16_file(report_fn, lines)
+        if json_fn:
+            footprint.save_json_file(json_fn, fp)
+
+    sys.stdout.write('ROM footprint: %d bytes\n' % fp['total'])
+    if budget is not None and fp['total'] > budget:
+        sys.exit('ROM footprint %d bytes exceeds the budget of %d bytes'
+                    % (fp['total'], budget))
+
+
+def pack_diff(old_fn, new_fn, patch_fn):
+    """Generate a patch file that updates an old pack to a new one in place.
+
+    A pack is read from a C included file generated by pack command, or from
+    a binary file of the pack. The patch is verified by applying it to the old
+    pack before saving.
+    """
+    with phase('read'):
+        old = packdiff.read_pack(old_fn)
+        new = packdiff.read_pack(new_fn)
+    patch = packdiff.encode(old, new, *packdiff.diff(old, new))
+    if packdiff.apply_patch(old, patch) != new:
+        raise ValueError('Failed to verify the patch from "%s" to "%s"'
+                            % (old_fn, new_fn))
+
+    with phase('write'):
+        with open(patch_fn, 'wb') as out_file:
+            out_file.write(patch)
+    size = 2 * len(new)
+    sys.stdout.write('Patch: %d bytes (%.1f%% of the %d-byte pack)\n'
+                % (len(patch), 100.0 * len(patch) / max(size, 1), size))
+
+
+def gen_font_file(rows, char_tbl, font_fn, bdf_fn, cache_fn=None,
+                  all_chars=False):
+    """Generate a C included file listing a glyph table of a BDF font indexed
+    by the char indexes of a char list, as those of pack (see the font
+    module for the format).
+
+    Only glyphs of chars used by messages (Arabic messages shaped) are listed,
+    or those of all listed chars with all_chars=True. A warning is printed for
+    each of these char indexes without a glyph in the font.
+
+    Arguments
+    ---------
+    bdf_fn
+        filename of the BDF font file
+    cache_fn
+        filename of the cache file of rasterized glyphs (default: that of
+        font.cache_filename); "" to read the font without a cache file
+    """
+    if cache_fn is None:
+        cache_fn = font.cache_filename(bdf_fn)
+    dic = as_dictionary(rows)
+    if all_chars:
+        used = set(char_tbl)
+    else:
+        used = set()
+        for lang in dic.langs:
+            used.update(get_lang_msgs(dic, lang).text)
+        check_chars(u''.join(sorted(used)), char_tbl)
+
+    with phase('read'):
+        ascent, descent, glyphs = font.glyph_records(
+            bdf_fn, sorted(ord(c) for c in used), cache_fn or None)
+
+    chars = [None] * (max(char_tbl.itervalues()) + 1 if char_tbl else 0)
+    for c, i in char_tbl.iteritems():
+        chars[i] = c
+    table = [(c, glyphs[ord(c)] if c in used else None) for c in chars]
+    for i, (c, g) in enumerate(table):
+        if c in used and g is None:
+            sys.stdout.write('Warning: no glyph of char index %d (U+%04X) in '
+                             '"%s"\n' % (i, ord(c), bdf_fn))
+
+    with phase('format'):
+        lines = font.table_lines(ascent, descent, table)
+        lines = prefix_authorship(lines, comment_mark='//')
+    with phase('write'):
+        save_utf8_file(font_fn, lines)
+    sys.stdout.write('Glyphs: %d of %d char indexes\n'
+                        % (sum(1 for _, g in table if g), len(table)))
+
+
+def export_mo(rows, mo_dir, shaped=False):
+    """Export multilanguage messages as GNU gettext message catalogs, a .mo
+    file of each language named after the language in a given directory, with
+    the hash table for O(1) lookups (see the mo module).
+
+    The original string of a message is its message ID without "MSG_" (e.g.,
+    "MenuSetting"), and the translation is the message in UTF-8. Empty
+    messages are left out, as untranslated messages are by GNU msgfmt.
 
+    Arguments
+    ---------
+    mo_dir
+        the directory to place .mo files into
+    shaped
+        True to shape Arabic messages as pack does; False to leave them to
+        the text engine of the application
+
+    Example
+    -------
+    >>> import gettext, shutil, tempfile
+    >>> dic = Dictionary.from_rows([(u'ID', u'English', u'Spanish'),
+    ...     (u'', u'Yes', u'S\\xed'), (u'', u'No', u'')])
+    >>> tmp = tempfile.mkdtemp()
+    >>> export_mo(dic, tmp)
+    >>> with open(os.path.join(tmp, 'Spanish.mo'), 'rb') as in_file:
+    ...     t = gettext.GNUTranslations(in_file)
+    >>> t.ugettext('Yes'), t.ugettext('No'), t.info()['language']
+    (u'S\\xed', u'No', 'Spanish')
+    >>> shutil.rmtree(tmp)
+    """
+    tbl = gen_mlang_tbl(rows)
     langs = get_lang_names(rows)
-    mlang_tbl = gen_mlang_tbl(rows)
-
-    lines = [''] * 2
-    lines += ['%4d,   // the total messages of a language'
-                % len(mlang_tbl['ID'])]
-    lines += ['%4d,   // the total number of languages' % len(langs)]
-    lines += ['', '// The offsets of languages']
-    lines += [array_str_from_ints(lang_offsets(langs, mlang_tbl))]
+    msg_ids = [id.encode('ascii') for id in gen_msg_ids(rows)]
+    if not os.path.isdir(mo_dir):
+        os.makedirs(mo_dir)
     for lang in langs:
-        msgs = mlang_tbl[lang.upper()]
-        lines += ['', '// %s message offsets' % lang]
-        lines += [array_str_from_ints(msg_offsets(msgs))]
-        lines += ['', '// %s messages' % lang]
-        if lang.upper() == 'ARABIC':
-            msgs = [arabic.shape(m) for m in msgs]
-        lines += [char_idx_str_from_msg(m, char_tbl) for m in msgs]
+        msgs = tbl[lang.upper()]
+        if shaped and lang.upper() == 'ARABIC':
+            with phase('shape'):
+                msgs = [shape(m) for m in msgs]
+        with phase('format'):
+            messages = [('', mo.header_entry(lang, __software__))]
+            messages += [(id, m.encode('utf-8'))
+                            for id, m in izip(msg_ids, msgs) if m]
+            data = mo.mo_bytes(messages)
+        with phase('write'):
+            with open(os.path.join(mo_dir, lang + '.mo'), 'wb') as out_file:
+                out_file.write(data)
+
+
+#-----------------------------------------------------------------------------
+# Batch
+#-----------------------------------------------------------------------------
+
+# command: (function, default output, uses char list)
+PRODUCT_COMMANDS = OrderedDict([
+    ('lang_id', (gen_lang_id_hfile, 'LangID.h', False)),
+    ('msg_id', (gen_msg_id_hfile, 'MsgID.h', False)),
+    ('verify', (verify, 'verify.report', True)),
+    ('pack', (pack, 'mlang.i', True)),
+    ('footprint', (gen_footprint_report, 'footprint.report', True)),
+    ('export_mo', (export_mo, 'mo', False)),
+])
+
+
+def build_product(job):
+    """Build the outputs of a product of a batch manifest with (product,
+    Dictionary, char:index table, shaped Arabic messages) parsed by the
+    parent process, and return the name, the seconds spent, and the output
+    filenames of the product.
+    """
+    product, rows, char_tbl, shaped = job
+    start = time.time()
+    _shaped.update(shaped)
+    if not os.path.isdir(product['output']):
+        os.makedirs(product['output'])
+
+    outputs = []
+    for cmd, opts in product['commands'].items():
+        func, outfile, uses_chars = PRODUCT_COMMANDS[cmd]
+        opts = dict((str(k), v) for k, v in opts.items() if k != 'jobs')
+        fn = os.path.join(product['output'], opts.pop('output', outfile))
+        if uses_chars:
+            func(rows, char_tbl, fn, **opts)
+        else:
+            func(rows, fn, **opts)
+        outputs += [fn]
+    return product['name'], time.time() - start, outputs
+
+
+def build_batch(manifest_fn, jobs=None):
+    """Build the products listed in a batch manifest (see batch module).
+
+    Each distinct dictionary sheet and char list file is parsed once, and
+    Arabic messages are shaped once, before building products. Products are
+    then built by a pool of the given jobs (or the jobs of the manifest),
+    which are sent the parsed dictionary, char list, and shaped messages of
+    their products, so they parse nothing again whether they are forked or
+    spawned (e.g., on Windows).
+    """
+    import multiprocessing
+
+    start = time.time()
+    commands = dict((k, (v[0], v[2])) for k, v in PRODUCT_COMMANDS.items())
+    manifest_jobs, products = batch.read_manifest(manifest_fn, commands)
+    jobs = max(jobs or manifest_jobs, 1)
+
+    # parse each distinct sheet and file once
+    sources = dic_sources(sorted(set(x for p in products for x in p['dic'])))
+    read_sources(sources, min(jobs, len(sources)))
+    files = [(read_char_lst, fn) for fn in
+                sorted(set(p['chars'] for p in products if p['chars']))]
+    for (read, fn), result in zip(files, pool_map(read_file_job, files,
+                                                   min(jobs, len(files)))):
+        batch.store(read, fn, result)
+    jobs_ = []
+    for p in products:
+        dic = read_dic(p['dic'], jobs=1)
+        char_tbl = (batch.cached_read(read_char_lst, p['chars'])
+                    if p['chars'] else None)
+        shaped = {}
+        if 'ARABIC' in dic:
+            with phase('shape'):
+                shaped = dict((m, shape(m))
+                                for m in dic.column('ARABIC').msgs())
+        jobs_ += [(p, dic, char_tbl, shaped)]
+    parsed = time.time() - start
+
+    # build products with a fresh pool sent the parsed files
+    if jobs > 1 and len(products) > 1:
+        pool = multiprocessing.Pool(min(jobs, len(products)))
+        try:
+            results = pool.map(build_product, jobs_, 1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(build_product, jobs_)
+
+    lines = ['', 'Parsed %d sheets and %d char lists in %.3f s'
+                    % (len(sources), len(files), parsed)]
+    lines += ['%-24s %9s  %s' % ('Product', 'Time (s)', 'Outputs')]
+    lines += ['%-24s %9.3f  %s' % (name, t, ' '.join(os.path.basename(x)
+                                                     for x in outputs))
+                for name, t, outputs in results]
+    lines += ['%-24s %9.3f' % ('Total', time.time() - start)]
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+
+#-----------------------------------------------------------------------------
+# Watch
+#-----------------------------------------------------------------------------
+
+def watch(specs, lst_fn, lang_id_fn='LangID.h', msg_id_fn='MsgID.h',
+          verify_fn='verify.report', pack_fn='mlang.i', interval=0.5, jobs=1):
+    """Regenerate the outputs of lang_id, msg_id, verify, and pack commands
+    whenever the dictionary files or the char list file are modified, until
+    interrupted (e.g., by Ctrl+C).
+
+    Files are polled every interval seconds. Parsed sheets, the char list,
+    shaped Arabic messages, message IDs, and a BuildCache of char indexes and
+    packed languages are kept in memory, so only modified sheets are parsed
+    again, only changed messages are indexed again, and only languages that
+    changed are packed again. An output whose content is unchanged is not
+    rewritten.
+
+    Arguments
+    ---------
+    specs
+        dictionary specs (see dic_sources)
+    lst_fn
+        filename of the char list file
+    lang_id_fn, msg_id_fn, verify_fn, pack_fn
+        output filenames; None to skip an output
+    """
+    import xlrd
+
+    outputs = [(gen_lang_id_hfile, lang_id_fn, False),
+               (gen_msg_id_hfile, msg_id_fn, False),
+               (verify, verify_fn, True),
+               (pack, pack_fn, True)]
+    outputs = [x for x in outputs if x[1]]
+    files = sorted(set(split_spec(x)[0] for x in specs)) + [lst_fn]
+    cache = BuildCache()
+
+    def stamp(fn):
+        """Return the modification time of a file, or None if it is missing.
+        """
+        return os.path.getmtime(fn) if os.path.exists(fn) else None
+
+    def build():
+        """Regenerate outputs and return the filenames rewritten.
+        """
+        dic = read_dic(specs)
+        char_tbl = cached_char_lst(lst_fn)
+        rewritten = []
+        for func, fn, uses_chars in outputs:
+            before = stamp(fn)
+            if func in (verify, pack):
+                func(dic, char_tbl, fn, jobs=jobs, cache=cache)
+            elif uses_chars:
+                func(dic, char_tbl, fn, jobs=jobs)
+            else:
+                func(dic, fn)
+            if stamp(fn) != before:
+                rewritten += [fn]
+        return rewritten
+
+    keep_unchanged_files()
+    stamps = None
+    print 'Watching %s (Ctrl+C to stop)' % ', '.join(files)
+    try:
+        while True:
+            if [stamp(fn) for fn in files] != stamps:
+                stamps = [stamp(fn) for fn in files]
+                start = time.time()
+                try:
+                    rewritten = build()
+                except KeyError as err:
+                    print '%s Error: char %r is not listed in %s' % (
+                        time.strftime('%H:%M:%S'), err.args[0], lst_fn)
+                except (IOError, OSError, ValueError, xlrd.XLRDError) as err:
+                    print '%s Error: %s' % (time.strftime('%H:%M:%S'), err)
+                else:
+                    print '%s Rebuilt in %.3f s: %s' % (
+                        time.strftime('%H:%M:%S'), time.time() - start,
+                        ' '.join(rewritten) or 'no output changed')
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        keep_unchanged_files(False)
+
+
+#-----------------------------------------------------------------------------
+# Serve
+#-----------------------------------------------------------------------------
+
+# file arguments of commands, resolved against the working directory of a
+# request (see run_command)
+PATH_ARGS = ('dicfile', 'outfile', 'rows', 'char_tbl', 'specs', 'lst_fn',
+             'old_fn', 'new_fn', 'manifest_fn', 'report_fn', 'registry_fn',
+             'key_fn', 'json_fn', 'state_fn', 'access_profile', 'bdf_fn',
+             'width_fn', 'widget_widths', 'overflow_fn', 'cache_fn', 'fmt_fn',
+             'profile')
+
+
+def resolve_paths(args, cwd):
+    """Join a working directory to the relative file arguments of a parsed
+    command line; "" (no file) is left as it is.
+
+    Example
+    -------
+    >>> args = parse_args(['pack', 'a.xls#*', '/tmp/char.lst', '-o', ''])
+    >>> resolve_paths(args, '/work')
+    >>> args.rows, args.char_tbl, args.outfile, args.registry_fn
+    (['/work/a.xls#*'], '/tmp/char.lst', '', None)
+    """
+    def resolve(fn):
+        return os.path.join(cwd, fn) if fn else fn
+
+    for k in PATH_ARGS:
+        v = getattr(args, k, None)
+        if isinstance(v, list):
+            setattr(args, k, [resolve(x) for x in v])
+        elif v is not None:
+            setattr(args, k, resolve(v))
+
+
+def run_command(argv, cwd, cache=None):
+    """Run a command line (with the program name) in a working directory as
+    the main function does, with a BuildCache if any, and return the exit
+    status of the command. Relative file arguments are resolved against the
+    working directory instead of changing the working directory of the
+    process.
+    """
+    sys.argv = argv     # for the trail lines of generated files
+    try:
+        args = parse_args(argv[1:])
+        if args.func in (serve, watch):
+            sys.stderr.write('The %s command cannot run on a server\n' %
+                             args.func.__name__)
+            return 2
+        resolve_paths(args, cwd)
+        execute(args, cache)
+    except SystemExit as e:
+        if isinstance(e.code, (int, long)) or e.code is None:
+            return e.code or 0
+        sys.stderr.write('%s\n' % e.code)
+        return 1
+    except Exception:
+        sys.stderr.write(traceback.format_exc())
+        return 1
+    return 0
+
+
+def run_requests(conn):
+    """Run the command lines received from a connection as (argv, cwd) one at
+    a time, and send back (status, stdout, stderr) of each (see
+    server.Runner), until the connection is closed.
+
+    This is the function of the runner process of a server, whose standard
+    streams are kept in buffers for the output of commands, and whose
+    BuildCache is kept across commands.
+    """
+    cache = BuildCache()
+    sys.stdout = out = StringIO()
+    sys.stderr = err = StringIO()
+    while True:
+        try:
+            argv, cwd = conn.recv()
+        except EOFError:
+            break
+        status = run_command(argv, cwd, cache)
+        conn.send((status, out.getvalue(), err.getvalue()))
+        out.truncate(0)
+        err.truncate(0)
+
+
+def serve(address=None):
+    """Serve command lines sent by clients (see client module) at an address
+    (default: the address of client.server_address) until interrupted (e.g.,
+    by Ctrl+C).
+
+    Commands are run one at a time in a runner process (see run_requests),
+    so parsed dictionary sheets, char lists, shaped Arabic messages, message
+    IDs, a BuildCache of char indexes and packed languages, and pools of
+    processes are kept warm across requests.
+    """
+    import server
+    import client
 
-    lines = prefix_authorship(lines, comment_mark='//')
-    save_utf8_file(h_fn, lines)
+    server.serve(address or client.server_address(), run_requests)
 
 
 #-----------------------------------------------------------------------------
 # Command Line Interface
 #-----------------------------------------------------------------------------
 
+def profile_parser():
+    """Return the parser of the timing and profiling options, which are
+    global options given before a command.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--timings', action='store_true',
+        help='''print wall time and CPU time of each phase (read, clean,
+            shape, index, format, and write) of the command.''')
+    parser.add_argument('--profile', metavar='<file>',
+        help='''save cProfile stats of the command into <file>; view them
+            with "python -m pstats <file>".''')
+    parser.add_argument('--trace-memory', action='store_true',
+        help='''print peak and retained memory of each phase and the top
+            allocation sites (with tracemalloc) of the command; without
+            tracemalloc, print the resident set size growth of each phase
+            and the high-water mark of the process.''')
+    parser.add_argument('--memory-budget', metavar='<MiB>', type=float,
+        help='''trace memory and exit with an error status at the first
+            start or end of a phase after the peak memory (the high-water
+            mark of the process without tracemalloc) exceeds <MiB>.''')
+    return parser
+
+
 def parse_args(args):
+    """Return the namespace of a command line parsed; the usage is printed
+    and SystemExit is raised for a bad command line.
+    """
     # create top-level parser
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     parents=[profile_parser()])
     parser.add_argument('-v', '--version', action='version',
                         version='%s v%s by %s' %
                         (__software__, __version__, __author__))
@@ -344,19 +1790,40 @@ def parse_args(args):
     sub = subparsers.add_parser('trans_dic',
         help='Translate/Fill an Excel dictionary file.')
     sub.set_defaults(func=trans_dicfile,
-        srcfile='dic_empty.xls', outfile='dic_trans.xls')
+        srcfile='dic_empty.xls', outfile='dic_trans.xls',
+        opts=['tm_threshold', 'tm_flag', 'report_fn'])
     sub.add_argument('dicfile', metavar='XLS-file',
         help='An empty Excel dictionary file to translate.')
     sub.add_argument('-o', '--output', metavar='<XLS-file>', dest='outfile',
-        help='''place the output into <XLS-file>, an Excel file (default "%s").
+        help='''place the output into <XLS-file>, an Excel file; an .xlsx
+            file is written row by row in constant memory (default "%s").
             ''' % sub.get_default('outfile'))
+    sub.add_argument('--tm-threshold', metavar='<ratio>', type=float,
+        dest='tm_threshold', default=0.7,
+        help='''fill an empty message with the translation of a near match
+            whose similarity is not less than <ratio> (default %(default)s);
+            1 reuses only the translations of the same source texts.''')
+    sub.add_argument('--tm-flag', action='store_true',
+        help='''translate the messages of near matches, other than those
+            differing only in numbers, instead of filling them.''')
+    sub.add_argument('--tm-report', metavar='<file>', dest='report_fn',
+        default='trans.report',
+        help='''place the near matches into <file>, a text file (default
+            "%(default)s").''')
 
     #--------------------------------------------------------------------------
 
     # create the parent parser of XLS-file
     xls = argparse.ArgumentParser(add_help=False)
-    xls.add_argument('rows', metavar='XLS-file', type=read_xls,
-        help='An Excel dictionary file for multilanguage translation.')
+    xls.add_argument('rows', metavar='XLS-file', nargs='+',
+        help='''An Excel dictionary file for multilanguage translation;
+            "<file>#<sheet>" names a sheet of the file and "<file>#*" takes
+            all sheets (default: the first sheet). Multiple sheets and files
+            are merged into one dictionary in the given order; they have the
+            same languages and no duplicate message IDs.''')
+    xls.add_argument('--suffix-id-collisions', action='store_true',
+        help='''append "_2", "_3", ... to a message ID generated again by
+            a later message, instead of failing.''')
 
     # create the parser for the "lang_id" command
     sub = subparsers.add_parser('lang_id', parents=[xls],
@@ -369,62 +1836,316 @@ def parse_args(args):
     # create the parser for the "msg_id" command
     sub = subparsers.add_parser('msg_id', parents=[xls],
         help='Generate a C header file of message ID enumeration.')
-    sub.set_defaults(func=gen_msg_id_hfile, outfile='MsgID.h')
+    sub.set_defaults(func=gen_msg_id_hfile, outfile='MsgID.h',
+        opts=['registry_fn', 'key_fn'])
     sub.add_argument('-o', '--output', metavar='<file>', dest='outfile',
         help='''place the output into <file>, a C header file (default "%s").
             ''' % sub.get_default('outfile'))
+    sub.add_argument('--registry', metavar='<file>', dest='registry_fn',
+        help='''keep message IDs at the values fixed in <file>, a registry
+            file; new message IDs are registered and deleted ones are
+            tombstoned.''')
+    sub.add_argument('--keys', metavar='<file>', dest='key_fn',
+        help='''place a minimal perfect hash table that maps the names of
+            message IDs to them into <file>, a C included file of mlkey.c.
+            ''')
 
     #--------------------------------------------------------------------------
 
     # create the parent parser of char list file
     lst = argparse.ArgumentParser(add_help=False)
-    lst.add_argument('char_tbl', metavar='LST-file', type=read_char_lst,
+    lst.add_argument('char_tbl', metavar='LST-file',
         help='An unicode text file that lists unicode characters.')
 
+    # create the parent parser of jobs
+    jobs = argparse.ArgumentParser(add_help=False)
+    jobs.add_argument('-j', '--jobs', metavar='<n>', type=int, default=1,
+        help='''spread the work across <n> processes; the output is the same
+            as that of one process (default %(default)s).''')
+
     # create the parser for the "verify" command
-    sub = subparsers.add_parser('verify', parents=[xls, lst],
+    sub = subparsers.add_parser('verify', parents=[xls, lst, jobs],
         help='''Generate a report file that lists used-but-not-listed
             characters and listed-but-not-used characters.''')
-    sub.set_defaults(func=verify, outfile='verify.report')
+    sub.set_defaults(func=verify, outfile='verify.report', opts=['json_fn',
+        'state_fn', 'jobs'])
     sub.add_argument('-o', '--output', metavar='<file>', dest='outfile',
         help='''place the output into <file>, an unicode text file
             (default "%s").
             ''' % sub.get_default('outfile'))
+    sub.add_argument('--json', metavar='<file>', dest='json_fn',
+        help='save the report into <file> as JSON as well.')
+    sub.add_argument('--state', metavar='<file>', dest='state_fn',
+        help='''keep the index of chars used by messages in <file> between
+            runs, so only changed messages are indexed again.''')
 
     # create the parser for the "pack" command
-    sub = subparsers.add_parser('pack', parents=[xls, lst],
+    sub = subparsers.add_parser('pack', parents=[xls, lst, jobs],
         help='''Generate a C included file listing an array that packs
             multilanguage messages.''')
-    sub.set_defaults(func=pack, outfile='mlang.i')
+    sub.set_defaults(func=pack, outfile='mlang.i', opts=['code_pages',
+        'access_profile', 'layout_mode', 'page_size', 'cache_size',
+        'cache_line', 'registry_fn', 'bdf_fn', 'width_fn', 'wrap_widths',
+        'widget_widths', 'overflow_fn', 'cache_fn', 'fmt_fn', 'jobs'])
     sub.add_argument('-o', '--output', metavar='<file>', dest='outfile',
         help='''place the output into <file>, a C included file
             (default "%s").
             ''' % sub.get_default('outfile'))
+    sub.add_argument('--code-pages', action='store_true',
+        help='''assign a code page to each language and pack messages of a
+            language with 8-bit chars if it uses 256 chars or fewer (build
+            mlang.c with ML_CODE_PAGES defined).''')
+    sub.add_argument('--access-profile', metavar='<file>',
+        help='''lay messages out by <file>, a text file listing message IDs
+            with hit counts (build mlang.c with ML_MSG_ORDER defined);
+            message IDs are unchanged.''')
+    sub.add_argument('--layout', dest='layout_mode', default='hot',
+        choices=['hot', 'cluster'],
+        help='''lay hot messages out first, or in clusters of flash pages
+            (default "%(default)s").''')
+    sub.add_argument('--page-size', metavar='<bytes>', type=int, default=256,
+        help='flash page size of the cluster layout (default %(default)s).')
+    sub.add_argument('--cache-size', metavar='<bytes>', type=int,
+        default=4096,
+        help='cache size of the simulated flash cache (default %(default)s).')
+    sub.add_argument('--cache-line', metavar='<bytes>', type=int, default=32,
+        help='''cache line size of the simulated flash cache
+            (default %(default)s).''')
+    sub.add_argument('--registry', metavar='<file>', dest='registry_fn',
+        help='''pack messages in the order of the message ID values fixed in
+            <file>, the registry file of msg_id command.''')
+    sub.add_argument('--font', metavar='<BDF-file>', dest='bdf_fn',
+        help='''measure packed messages with the glyphs of <BDF-file>, and
+            generate a table of their widths in pixels (see --widths).''')
+    sub.add_argument('--widths', metavar='<file>', dest='width_fn',
+        default='mwidth.i',
+        help='''place the width table into <file>, a C included file
+            (default "%(default)s").''')
+    sub.add_argument('--wrap', metavar='<pixels>', dest='wrap_widths',
+        type=int, nargs='+', default=[],
+        help='''list the line breaks of messages wrapped in each of
+            <pixels> in the width table.''')
+    sub.add_argument('--widget-widths', metavar='<file>',
+        help='''report messages wider than their widgets listed in <file>,
+            a text file listing message IDs with widths in pixels, into the
+            file of --overflow-report.''')
+    sub.add_argument('--overflow-report', metavar='<file>',
+        dest='overflow_fn', default='overflow.report',
+        help='''place the report of messages wider than their widgets into
+            <file>, an unicode text file (default "%(default)s").''')
+    sub.add_argument('--glyph-cache', metavar='<file>', dest='cache_fn',
+        help='''cache glyphs of the font in <file> between runs, as the
+            --cache option of font; "" not to cache them (default: the
+            BDF-file of --font with a ".cache" suffix).''')
+    sub.add_argument('--formats', metavar='<file>', dest='fmt_fn',
+        help='''split messages with printf-style placeholders (e.g., "%%d"
+            and "%%2$s") into literal char runs and typed slots, and place
+            them into <file>, a C included file for mlfmt.c; fail if the
+            placeholders of a message differ from those of ENGLISH.''')
+
+    # create the parser for the "footprint" command
+    sub = subparsers.add_parser('footprint', parents=[xls, lst],
+        help='''Generate a report file that breaks the ROM footprint of
+            packed multilanguage messages down.''')
+    sub.set_defaults(func=gen_footprint_report, outfile='footprint.report',
+        opts=['code_pages', 'access_profile', 'top', 'json_fn', 'budget',
+              'registry_fn'])
+    sub.add_argument('-o', '--output', metavar='<file>', dest='outfile',
+        help='''place the output into <file>, an unicode text file
+            (default "%s").
+            ''' % sub.get_default('outfile'))
+    sub.add_argument('--code-pages', action='store_true',
+        help='measure the pack with the --code-pages option of pack.')
+    sub.add_argument('--access-profile', metavar='<file>',
+        help='measure the pack with the --access-profile option of pack.')
+    sub.add_argument('--registry', metavar='<file>', dest='registry_fn',
+        help='measure the pack with the --registry option of pack.')
+    sub.add_argument('--top', metavar='<n>', type=int, default=10,
+        help='''list the <n> largest messages and duplicate messages
+            (default %(default)s).''')
+    sub.add_argument('--json', metavar='<file>', dest='json_fn',
+        help='save the footprint into <file> as JSON as well.')
+    sub.add_argument('--budget', metavar='<bytes>', type=int,
+        help='''exit with an error status if the pack exceeds <bytes>.
+            ''')
+
+    # create the parser for the "pack_diff" command
+    sub = subparsers.add_parser('pack_diff',
+        help='''Generate a patch file that updates an old pack of
+            multilanguage messages to a new one in place.''')
+    sub.set_defaults(func=pack_diff, outfile='mlang.patch')
+    sub.add_argument('old_fn', metavar='OLD-file',
+        help='''The old pack, a C included file generated by pack command or
+            a binary file of 16-bit words in little endian.''')
+    sub.add_argument('new_fn', metavar='NEW-file',
+        help='The new pack in the same form as OLD-file.')
+    sub.add_argument('-o', '--output', metavar='<file>', dest='outfile',
+        help='''place the output into <file>, a binary patch file
+            (default "%s").
+            ''' % sub.get_default('outfile'))
+
+    # create the parser for the "font" command
+    sub = subparsers.add_parser('font', parents=[xls, lst],
+        help='''Generate a C glyph table of a BDF font indexed by the char
+            list file as packed messages are.''')
+    sub.set_defaults(func=gen_font_file, outfile='font.i',
+        opts=['bdf_fn', 'cache_fn', 'all_chars'])
+    sub.add_argument('bdf_fn', metavar='BDF-file',
+        help='A bitmap font file in Glyph Bitmap Distribution Format.')
+    sub.add_argument('-o', '--output', metavar='<file>', dest='outfile',
+        help='''place the output into <file>, a C included file (default
+            "%s").''' % sub.get_default('outfile'))
+    sub.add_argument('--cache', metavar='<file>', dest='cache_fn',
+        help='''cache rasterized glyphs in <file> between runs; "" not to
+            cache them (default: BDF-file with a ".cache" suffix, e.g.,
+            "font.bdf.cache").''')
+    sub.add_argument('--all-chars', action='store_true',
+        help='''list the glyphs of all chars of LST-file instead of those
+            used by messages.''')
+
+    # create the parser for the "export_mo" command
+    sub = subparsers.add_parser('export_mo', parents=[xls],
+        help='''Export multilanguage messages as GNU gettext message
+            catalogs (.mo files) for host applications.''')
+    sub.set_defaults(func=export_mo, outfile='mo', opts=['shaped'])
+    sub.add_argument('-o', '--output', metavar='<dir>', dest='outfile',
+        help='''place a .mo file of each language, e.g., "English.mo", into
+            <dir> (default "%s").''' % sub.get_default('outfile'))
+    sub.add_argument('--shaped', action='store_true',
+        help='shape Arabic messages as pack command does.')
+
+    # create the parser for the "batch" command
+    sub = subparsers.add_parser('batch',
+        help='''Build multiple products listed in a manifest file in one
+            process.''')
+    sub.set_defaults(func=build_batch, opts=['jobs'])
+    sub.add_argument('manifest_fn', metavar='JSON-file',
+        help='''A manifest file listing products with their dictionary
+            files, char list files, output directories, and commands.''')
+    sub.add_argument('-j', '--jobs', metavar='<n>', type=int,
+        help='''build <n> products at a time (default: "jobs" of the
+            manifest, or 1).''')
+
+    # create the parser for the "watch" command
+    sub = subparsers.add_parser('watch', parents=[jobs],
+        help='''Regenerate the outputs of lang_id, msg_id, verify, and pack
+            commands whenever their input files are modified.''')
+    sub.set_defaults(func=watch, opts=['lang_id_fn', 'msg_id_fn',
+        'verify_fn', 'pack_fn', 'interval', 'jobs'])
+    sub.add_argument('specs', metavar='XLS-file', nargs='+',
+        help='An Excel dictionary file as that of the other commands.')
+    sub.add_argument('lst_fn', metavar='LST-file',
+        help='An unicode text file that lists unicode characters.')
+    sub.add_argument('--lang-id', metavar='<file>', dest='lang_id_fn',
+        default='LangID.h',
+        help='''place the output of lang_id into <file>; "" to skip it
+            (default "%(default)s").''')
+    sub.add_argument('--msg-id', metavar='<file>', dest='msg_id_fn',
+        default='MsgID.h',
+        help='''place the output of msg_id into <file>; "" to skip it
+            (default "%(default)s").''')
+    sub.add_argument('--verify', metavar='<file>', dest='verify_fn',
+        default='verify.report',
+        help='''place the output of verify into <file>; "" to skip it
+            (default "%(default)s").''')
+    sub.add_argument('--pack', metavar='<file>', dest='pack_fn',
+        default='mlang.i',
+        help='''place the output of pack into <file>; "" to skip it
+            (default "%(default)s").''')
+    sub.add_argument('--interval', metavar='<seconds>', type=float,
+        default=0.5,
+        help='check the input files every <seconds> (default %(default)s).')
+
+    # create the parser for the "serve" command
+    sub = subparsers.add_parser('serve',
+        help='''Serve commands sent by client.py with warm caches, instead
+            of starting a process per command.''')
+    sub.set_defaults(func=serve, opts=['address'])
+    sub.add_argument('--address', metavar='<address>',
+        help='''listen at <address>, "unix:<path>" for a Unix domain
+            socket, "pipe:<name>" for a named pipe on Windows, or
+            "<host>:<port>" for TCP, which requires a token in the
+            LANGCONV_TOKEN environment variable (default: the
+            LANGCONV_SERVER environment variable, or a socket in
+            ~/.langconv, a pipe on Windows).''')
 
     #--------------------------------------------------------------------------
 
-    # parse args and execute functions
-    args = parser.parse_args(args)
+    return parser.parse_args(args)
+
+
+def run_args(args, cache=None):
+    """Execute the function of the command of a parsed command line, with a
+    BuildCache if any (see serve).
+    """
+    opts = dict((k, getattr(args, k)) for k in getattr(args, 'opts', []))
+    if cache is not None and args.func in (verify, pack):
+        opts['cache'] = cache
+    suffix_id_collisions(getattr(args, 'suffix_id_collisions', False))
+    if 'rows' in args:
+        args.rows = read_dic(args.rows)
+    if 'char_tbl' in args:
+        args.char_tbl = cached_char_lst(args.char_tbl)
     if 'dicfile' in args:
-        args.func(args.dicfile, args.outfile)
+        args.func(args.dicfile, args.outfile, **opts)
+    elif 'manifest_fn' in args:
+        args.func(args.manifest_fn, **opts)
+    elif 'address' in args:
+        args.func(**opts)
+    elif 'lst_fn' in args:
+        args.func(args.specs, args.lst_fn, **opts)
+    elif 'old_fn' in args:
+        args.func(args.old_fn, args.new_fn, args.outfile, **opts)
     elif 'char_tbl' in args:
-        args.func(args.rows, args.char_tbl, args.outfile)
+        args.func(args.rows, args.char_tbl, args.outfile, **opts)
     else:
-        args.func(args.rows, args.outfile)
+        args.func(args.rows, args.outfile, **opts)
 
 
-def main():
-    """Start point of this module.
+def execute(args, cache=None):
+    """Execute a parsed command line with the global options (e.g.,
+    --timings), with a BuildCache if any (see serve).
     """
+    import cProfile
+
+    profiler = cProfile.Profile() if args.profile else None
+    timing.reset()
+    if args.trace_memory or args.memory_budget is not None:
+        budget = args.memory_budget
+        timing.trace_memory(None if budget is None else int(budget * 2**20))
+    start = timing.now()
     try:
-        parse_args(sys.argv[1:])
+        if profiler:
+            profiler.runcall(run_args, args, cache)
+        else:
+            run_args(args, cache)
     except IOError as err:
         print err
     except ValueError as err:
         print err
+    finally:
+        if profiler:
+            profiler.dump_stats(args.profile)
+        if args.timings:
+            total = [end - begin for begin, end in zip(start, timing.now())]
+            print '\n'.join(timing.report_lines(total))
+        if args.trace_memory:
+            print '\n'.join(timing.memory_lines())
+
+
+def main():
+    """Start point of this module.
+
+    The global options (e.g., --timings) are those given before the command,
+    and a bad command line exits before timing or profiling starts.
+    """
+    execute(parse_args(sys.argv[1:]))
 
 
 if __name__ == '__main__':
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
     #rows = read_xls()
     #gen_lang_id_hfile(rows, 'LangID.h')
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+This module lays out packed messages by an access profile, and simulates the
+flash cache misses of reading messages from a layout.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+from collections import OrderedDict
+
+from myutil import read_unicode
+
+
+#------------------------------------------------------------------------------
+# Access Profile
+#------------------------------------------------------------------------------
+
+def read_msg_numbers(fn, msg_ids, kind='access profile'):
+    """Return (message ID, number) pairs of the lines of a file listing a
+    message per line with a number, e.g., "MSG_MenuSetting 120". A message
+    can be given with its name in MsgID.h (with or without the "MSG_" prefix)
+    or with its number. A line prefixing '#' denotes a comment line.
+
+    Arguments
+    ---------
+    fn
+        filename of the file
+    msg_ids
+        message IDs (i.e., the names without "MSG_")
+    kind
+        the kind of the file named in error messages
+    """
+    idx = dict((id, i) for i, id in enumerate(msg_ids))
+    pairs = []
+    for line in read_unicode(fn).splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split()
+        if len(fields) != 2 or not fields[1].isdigit():
+            raise ValueError('Bad line in %s "%s": %s' % (kind, fn, line))
+        name = fields[0]
+        if name.startswith('MSG_'):
+            name = name[4:]
+        if name.isdigit() and int(name) < len(msg_ids):
+            i = int(name)
+        elif name in idx:
+            i = idx[name]
+        else:
+            raise ValueError('Unknown message in %s "%s": %s' %
+                             (kind, fn, fields[0]))
+        pairs += [(i, int(fields[1]))]
+    return pairs
+
+
+def read_access_profile(fn, msg_ids):
+    """Return a hit-count list indexed by message IDs from an access profile.
+
+    An access profile lists a message per line with its hit count (see
+    read_msg_numbers). An unlisted message has zero hits.
+
+    Arguments
+    ---------
+    fn
+        filename of the access profile
+    msg_ids
+        message IDs (i.e., the names without "MSG_")
+    """
+    counts = [0] * len(msg_ids)
+    for i, n in read_msg_numbers(fn, msg_ids):
+        counts[i] += n
+    return counts
+
+
+#------------------------------------------------------------------------------
+# Layouts
+#------------------------------------------------------------------------------
+
+def hot_order(counts):
+    """Return message IDs ordered from hot to cold. Messages with the same hit
+    count keep their ID order.
+
+    Example
+    -------
+    >>> hot_order([0, 5, 1, 5])
+    [1, 3, 2, 0]
+    """
+    return sorted(range(len(counts)), key=lambda m: -counts[m])
+
+
+def cluster_order(counts, sizes, page_size):
+    """Return message IDs grouped into flash-page-sized clusters.
+
+    Hot messages are placed into pages by first-fit decreasing hotness, so a
+    hot message does not straddle a page if it fits in one. The room left in
+    a page is then filled with cold messages. Pages are ordered by their
+    hottest message.
+
+    Arguments
+    ---------
+    counts
+        hit counts indexed by message IDs
+    sizes
+        sizes in bytes indexed by message IDs
+    page_size
+        flash page size in bytes
+
+    Example
+    -------
+    >>> cluster_order([9, 8, 0, 7], [3, 3, 1, 2], 4)
+    [0, 2, 1, 3]
+    """
+    pages = []      # [room, ids]
+    def place(m):
+        for page in pages:
+            if sizes[m] <= page[0]:
+                page[0] -= sizes[m]
+                page[1] += [m]
+                return True
+        return False
+
+    order = hot_order(counts)
+    hot = [m for m in order if counts[m] > 0]
+    cold = [m for m in order if counts[m] == 0]
+    for m in hot:
+        if not place(m):
+            pages += [[page_size - sizes[m], [m]]]
+
+    rest = [m for m in sorted(cold, key=lambda m: -sizes[m]) if not place(m)]
+    return sum((ids for _, ids in pages), []) + sorted(rest)
+
+
+#------------------------------------------------------------------------------
+# Cache Simulation
+#------------------------------------------------------------------------------
+
+def access_trace(counts, rounds=100):
+    """Return a message access trace interleaving messages by hit counts.
+
+    Hit counts are scaled to at most the given rounds; a round accesses every
+    message that has hits left.
+
+    Example
+    -------
+    >>> access_trace([2, 0, 1])
+    [0, 2, 0]
+    """
+    top = max(counts + [0])
+    if top > rounds:
+        counts = [(c * rounds + top - 1) // top for c in counts]
+        top = rounds
+    return [m for r in xrange(top)
+              for m, c in enumerate(counts) if c > r]
+
+
+def cache_misses(trace, spans, cache_size, line_size):
+    """Return the number of misses of a fully associative LRU cache running
+    an access trace.
+
+    Arguments
+    ---------
+    trace
+        message IDs in the order of accesses
+    spans
+        (address, size) of message texts in bytes, indexed by message IDs
+    cache_size
+        cache size in bytes
+    line_size
+        cache line size in bytes
+
+    Example
+    -------
+    >>> cache_misses([0, 1, 0], [(0, 8), (32, 8)], 16, 16)
+    3
+    >>> cache_misses([0, 1, 0], [(0, 8), (8, 8)], 32, 16)
+    1
+    """
+    capacity = max(cache_size // line_size, 1)
+    cache = OrderedDict()
+    misses = 0
+    for m in trace:
+        addr, size = spans[m]
+        if size == 0:
+            continue
+        for line in xrange(addr // line_size,
+                           (addr + size - 1) // line_size + 1):
+            if line in cache:
+                del cache[line]
+            else:
+                misses += 1
+                if len(cache) >= capacity:
+                    cache.popitem(last=False)
+            cache[line] = True
+    return misses
+
+
+def text_spans(lens, order, start, char_size):
+    """Return (address, size) of message texts in bytes indexed by message
+    IDs.
+
+    Arguments
+    ---------
+    lens
+        message lengths in chars indexed by message IDs
+    order
+        message IDs in the order of the layout
+    start
+        address of the text in bytes
+    char_size
+        size of a char in bytes
+
+    Example
+    -------
+    >>> text_spans([2, 3], [1, 0], 100, 2)
+    [(106, 4), (100, 6)]
+    """
+    spans = [None] * len(lens)
+    addr = start
+    for m in order:
+        spans[m] = (addr, lens[m] * char_size)
+        addr += lens[m] * char_size
+    return spans
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+This module measures packed messages in pixels with the advance widths
+(DWidth) of the glyphs of a BDF font, breaks them into lines of given wrap
+widths, and finds messages overflowing the widths of their widgets, so that
+the target needs not measure or wrap messages at run time.
+
+The Width Table Format
+----------------------
+WidthHeader LangOffset^(L+1) LangWidth^L
+    L: the total number of languages
+WidthHeader: MsgCounterPerLang LangCount WrapCount WrapWidth^W
+    W: WrapCount, the number of wrap widths
+LangOffset: the offset of a LangWidth from the first LangOffset
+LangWidth: MsgWidth^M LineBreaks^W
+    M: the total number of messages
+    MsgWidth: the width in pixels of a message; that of the widest line of a
+              message of more than one line
+LineBreaks: BreakOffset^(M+1) Break^B
+    BreakOffset: the offset of the breaks of a message from the first Break
+    Break: the position of the char starting a line of a message wrapped in
+           a WrapWidth; the first line starting at zero is not listed. Lines
+           of an Arabic message, packed in the order of display, are counted
+           from its end: a Break is the position after the end of a line,
+           so its Breaks are descending
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+from array import array
+
+from myutil import array_str_from_ints, offsets_from_lens
+from carray import IntRows
+import font
+import layout
+
+
+#------------------------------------------------------------------------------
+# Widths
+#------------------------------------------------------------------------------
+
+def advance_widths(bdf_fn, chars, cache_fn=None):
+    """Return a char: advance width table of given chars of a BDF font file,
+    and the sorted chars without a glyph in the font, which are of zero
+    width. Glyphs are cached as font.glyph_records does.
+    """
+    _, _, glyphs = font.glyph_records(bdf_fn, sorted(ord(c) for c in chars),
+                                      cache_fn)
+    widths = {}
+    missing = []
+    for c in sorted(chars):
+        g = glyphs[ord(c)]
+        widths[c] = g[0] if g else 0
+        if g is None:
+            missing += [c]
+    return widths, missing
+
+
+def text_width(text, widths):
+    """Return the width of a text of a char: width table; that of the widest
+    line of a text of more than one line.
+
+    Example
+    -------
+    >>> text_width(u'ab\\nc', {u'a': 5, u'b': 6, u'c': 12})
+    12
+    """
+    return max(sum(widths.get(c, 0) for c in line)
+                for line in text.split(u'\n'))
+
+
+def is_cjk(c):
+    """Return True if a char is a CJK ideograph, a kana, a Hangul syllable,
+    or a full-width form, between which a line can break.
+    """
+    n = ord(c)
+    return (0x2E80 <= n <= 0x9FFF or 0xAC00 <= n <= 0xD7AF or
+            0xF900 <= n <= 0xFAFF or 0xFF00 <= n <= 0xFFEF)
+
+
+def line_breaks(text, widths, max_width):
+    """Return the positions of the chars starting lines of a text wrapped in
+    a given width, except the first line.
+
+    A line breaks after a newline, before a word following spaces, or before
+    or after a CJK char. Spaces at the end of a line hang over the width. A
+    word wider than a line is broken between chars.
+
+    Arguments
+    ---------
+    widths
+        a char: width table
+    max_width
+        the width in pixels of a line
+
+    Example
+    -------
+    >>> widths = dict.fromkeys(u'abcdefg \\u4e2d\\u6587', 1)
+    >>> line_breaks(u'abc de fg', widths, 6)
+    [7]
+    >>> line_breaks(u'abcdefg', widths, 3), line_breaks(u'a\\nb', widths, 3)
+    ([3, 6], [2])
+    >>> line_breaks(u'ab\\u4e2d\\u6587', widths, 3)
+    [3]
+    """
+    breaks = []
+    start = 0       # the start of the current line
+    last = None     # the last break opportunity of the current line
+    width = 0       # the width of text[start:i]
+    prev = None
+    for i, c in enumerate(text):
+        if c == u'\n':
+            breaks += [i + 1]
+            start, last, width, prev = i + 1, None, 0, None
+            continue
+        if (prev is not None and c != u' ' and
+                (prev == u' ' or is_cjk(c) or is_cjk(prev))):
+            last = i
+        w = widths.get(c, 0)
+        if c != u' ' and i > start and width + w > max_width:
+            brk = last if last is not None else i
+            breaks += [brk]
+            start, last = brk, None
+            width = sum(widths.get(x, 0) for x in text[brk:i])
+        width += w
+        prev = c
+    return breaks
+
+
+def visual_breaks(breaks, order):
+    """Return the line breaks of a text in logical order (see line_breaks) as
+    those of the text laid out from right to left in an order of display,
+    the positions of its chars (see arabic.reorder_positions).
+
+    Lines are counted from the end of the laid-out text, so a break is the
+    position after the end of a line, and breaks are descending. A break
+    within a run of chars kept from left to right (e.g., digits) is moved
+    back to the start of the run, so every line is a slice of the text.
+
+    Example
+    -------
+    >>> visual_breaks([2, 4], [5, 4, 3, 2, 1, 0])
+    [4, 2]
+    >>> visual_breaks([3], [4, 2, 3, 1, 0])
+    [3]
+    """
+    n = len(order)
+    positions = [0] * n     # the position of display of each char
+    for i, x in enumerate(order):
+        positions[x] = i
+    lows = [n]              # the lowest position of display of each prefix
+    for x in positions:
+        lows += [min(lows[-1], x)]
+
+    result = []
+    prev = 0
+    for brk in breaks:
+        # a prefix of the text laid out is a suffix of the laid-out text
+        i = brk
+        while i > prev and lows[i] != n - i:
+            i -= 1
+        if i == prev:
+            i = max(brk, prev + 1)
+            while i < n and lows[i] != n - i:
+                i += 1
+        if i < n:
+            result += [n - i]
+            prev = i
+    return result
+
+
+def rtl_line_breaks(msg, widths, max_width):
+    """Return the line breaks of an Arabic message, as shaped by arabic.shape,
+    wrapped in a given width. The shaped message is wrapped in logical order,
+    and the breaks are mapped into the order of display (see visual_breaks).
+
+    Example
+    -------
+    >>> import arabic
+    >>> words = [u'\u0627\u0644\u0623\u0648\u0644 ',
+    ...          u'\u0627\u0644\u062b\u0627\u0646\u064a ',
+    ...          u'\u0627\u0644\u062b\u0627\u0644\u062b']
+    >>> text = arabic.shape(u''.join(words))
+    >>> breaks = rtl_line_breaks(u''.join(words), dict.fromkeys(text, 1), 7)
+    >>> breaks
+    [13, 6]
+    >>> lines = [text[b:e] for b, e in zip(breaks + [0], [len(text)] + breaks)]
+    >>> lines == [arabic.shape(w) for w in words]
+    True
+    """
+    import arabic
+
+    text, order = arabic.shape_order(msg)
+    return visual_breaks(line_breaks(text, widths, max_width), order)
+
+
+def measure(msgs, widths, wrap_widths=(), rtl_msgs=None):
+    """Return the widths of a Column of messages, and the line breaks of the
+    messages wrapped in each of given wrap widths as a list of IntRows.
+
+    Messages shaped by arabic.shape are given with their messages before
+    shaping, rtl_msgs, which are wrapped by rtl_line_breaks.
+    """
+    msg_widths = array('i', (text_width(m, widths) for m in msgs))
+    if rtl_msgs is None:
+        wraps = [IntRows.from_lists((line_breaks(m, widths, w) for m in msgs))
+                    for w in wrap_widths]
+    else:
+        wraps = [IntRows.from_lists((rtl_line_breaks(m, widths, w)
+                                     for m in rtl_msgs))
+                    for w in wrap_widths]
+    return msg_widths, wraps
+
+
+#------------------------------------------------------------------------------
+# Overflows
+#------------------------------------------------------------------------------
+
+def read_widget_widths(fn, msg_ids):
+    """Return a message ID: widget width table from a file listing a message
+    per line with the width in pixels of its widget, e.g., "MSG_Title 120",
+    as an access profile does (see layout.read_msg_numbers). The last width
+    of a message listed more than once takes effect.
+
+    Arguments
+    ---------
+    fn
+        filename of the widget width file
+    msg_ids
+        message IDs (i.e., the names without "MSG_")
+    """
+    return dict(layout.read_msg_numbers(fn, msg_ids, 'widget width file'))
+
+
+def overflows(msg_widths, widget_widths):
+    """Return (message ID, message width, widget width) items of messages
+    wider than their widgets.
+
+    Example
+    -------
+    >>> overflows([30, 50, 70], {1: 40, 2: 80})
+    [(1, 50, 40)]
+    """
+    return [(i, msg_widths[i], w) for i, w in sorted(widget_widths.items())
+                if msg_widths[i] > w]
+
+
+#------------------------------------------------------------------------------
+# Width Table
+#------------------------------------------------------------------------------
+
+def lang_sections(lang, msg_widths, wraps, wrap_widths):
+    """Return the (comment, IntRows) sections of the LangWidth of a language
+    from the results of measure.
+    """
+    sections = [('%s message widths' % lang, IntRows.divide(msg_widths, 16))]
+    for w, rows in zip(wrap_widths, wraps):
+        offsets = array('i', [0])
+        offsets.extend(rows.ends)
+        sections += [('%s break offsets of messages wrapped in %d pixels'
+                      % (lang, w), IntRows.divide(offsets, 16))]
+        sections += [('%s breaks of messages wrapped in %d pixels' % (lang, w),
+                      IntRows.divide(rows.values, 16))]
+    return sections
+
+
+def header_lines(msg_total, wrap_widths, lang_words):
+    """Return lines of the WidthHeader and the LangOffsets of a width table.
+
+    Arguments
+    ---------
+    msg_total
+        the total number of messages
+    wrap_widths
+        the wrap widths
+    lang_words
+        the number of words of the LangWidth of each language
+
+    Example
+    -------
+    >>> for line in header_lines(3, [100], [10, 12]):
+    ...     print line
+    <BLANKLINE>
+       3,   // the total messages of a language
+       2,   // the total number of languages
+       1,   // the number of wrap widths
+     100,
+    <BLANKLINE>
+    // The offsets of languages
+       3,  13,  25,
+    """
+    lines = ['']
+    lines += ['%4d,   // the total messages of a language' % msg_total]
+    lines += ['%4d,   // the total number of languages' % len(lang_words)]
+    lines += ['%4d,   // the number of wrap widths' % len(wrap_widths)]
+    if wrap_widths:
+        lines += [array_str_from_ints(wrap_widths)]
+    lines += ['', '// The offsets of languages']
+    lines += [array_str_from_ints(offsets_from_lens(list(lang_words)))]
+    return lines
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+This module formats GNU gettext message catalogs (.mo files) with the hash
+table of GNU gettext, so a catalog can be mapped into memory and a message
+looked up in O(1) without building a dictionary at startup.
+
+The MO File Format
+------------------
+Header OrigEntry^N TransEntry^N HashEntry^S Orig^N Trans^N
+    N: the number of messages, sorted by their original strings
+    S: the size of the hash table, a prime greater than 4N/3
+Header: Magic Revision N OrigOffset TransOffset S HashOffset
+    (32-bit words in little endian; Magic is 0x950412DE, Revision is 0)
+OrigEntry, TransEntry: Length Offset, of a string without its NUL
+HashEntry: the index + 1 of the message of a slot; 0 for an empty slot
+Orig, Trans: NUL-terminated strings
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import struct
+
+
+MAGIC = 0x950412DE
+HEADER_SIZE = 7 * 4
+
+
+#------------------------------------------------------------------------------
+# Hash
+#------------------------------------------------------------------------------
+
+def hash_string(s):
+    """Return the hashpjw hash of a byte string, as hash_string of GNU gettext
+    does.
+
+    Example
+    -------
+    >>> hash_string(''), hash_string('a'), hash_string('MenuSetting')
+    (0, 97, 160984039)
+    """
+    h = 0
+    for c in s:
+        h = (h << 4) + ord(c)
+        g = h & 0xF0000000
+        if g:
+            h ^= g >> 24
+            h ^= g
+    return h
+
+
+def next_prime(n):
+    """Return the smallest odd prime not less than n, as GNU msgfmt does for
+    the size of a hash table.
+
+    Example
+    -------
+    >>> [next_prime(x) for x in (0, 4, 9, 24)]
+    [3, 5, 11, 29]
+    """
+    n = max(n, 3) | 1
+    while any(n % d == 0 for d in xrange(3, int(n ** 0.5) + 1, 2)):
+        n += 2
+    return n
+
+
+def hash_slots(msgids):
+    """Return the hash table of given original strings, a list of the index
+    + 1 of the string of each slot (0 for an empty slot).
+    """
+    size = next_prime(len(msgids) * 4 // 3)
+    table = [0] * size
+    for i, msgid in enumerate(msgids):
+        h = hash_string(msgid)
+        idx = h % size
+        incr = 1 + h % (size - 2)
+        while table[idx]:
+            idx = idx + incr - size if idx + incr >= size else idx + incr
+        table[idx] = i + 1
+    return table
+
+
+#------------------------------------------------------------------------------
+# Catalog
+#------------------------------------------------------------------------------
+
+def header_entry(lang, software):
+    """Return the metadata of a catalog in UTF-8, the translation of the
+    empty original string.
+    """
+    return (u'Project-Id-Version: %s\n'
+            u'Language: %s\n'
+            u'MIME-Version: 1.0\n'
+            u'Content-Type: text/plain; charset=UTF-8\n'
+            u'Content-Transfer-Encoding: 8bit\n'
+                % (software, lang)).encode('utf-8')
+
+
+def mo_bytes(messages):
+    """Return the bytes of a .mo file of (original, translation) pairs of
+    byte strings; the pairs are sorted by their original strings.
+
+    Example
+    -------
+    >>> import gettext
+    >>> from StringIO import StringIO
+    >>> data = mo_bytes([('', header_entry('Spanish', 'test')),
+    ...                  ('Yes', 'S\\xc3\\xad'), ('No', 'No')])
+    >>> t = gettext.GNUTranslations(StringIO(data))
+    >>> t.ugettext('Yes'), t.ugettext('No'), t.info()['language']
+    (u'S\\xed', u'No', 'Spanish')
+    >>> lookup(data, 'Yes'), lookup(data, 'Maybe')
+    ('S\\xc3\\xad', None)
+    """
+    messages = sorted(messages)
+    n = len(messages)
+    table = hash_slots([m for m, _ in messages])
+    orig_offset = HEADER_SIZE
+    trans_offset = orig_offset + 8 * n
+    hash_offset = trans_offset + 8 * n
+    offset = hash_offset + 4 * len(table)
+
+    entries = []
+    strings = []
+    for s in [m for m, _ in messages] + [t for _, t in messages]:
+        entries += [len(s), offset]
+        strings += [s, '\0']
+        offset += len(s) + 1
+    header = struct.pack('<7I', MAGIC, 0, n, orig_offset, trans_offset,
+                         len(table), hash_offset)
+    return ''.join([header, struct.pack('<%dI' % len(entries), *entries),
+                    struct.pack('<%dI' % len(table), *table)] + strings)
+
+
+def lookup(data, msgid):
+    """Return the translation of an original string from the bytes of a .mo
+    file by its hash table, or None if the string is not in the catalog.
+    """
+    word = lambda offset: struct.unpack_from('<I', data, offset)[0]
+    orig_offset, trans_offset = word(12), word(16)
+    size, hash_offset = word(20), word(24)
+
+    def string(table, i):
+        length, offset = word(table + 8 * i), word(table + 8 * i + 4)
+        return data[offset:offset + length]
+
+    h = hash_string(msgid)
+    idx = h % size
+    incr = 1 + h % (size - 2)
+    while True:
+        i = word(hash_offset + 4 * idx)
+        if i == 0:
+            return None
+        if string(orig_offset, i - 1) == msgid:
+            return string(trans_offset, i - 1)
+        idx = idx + incr - size if idx + incr >= size else idx + incr
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -8,24 +8,139 @@ __date__ = "2016/01/27 (initial version) ~ 2016/04/27 (last revision)"
 import re
 import os
 import sys
+import codecs
+import filecmp
 
 
 #------------------------------------------------------------------------------
 # File
 #------------------------------------------------------------------------------
 
+_saving = {'keep_unchanged': False}
+
+
+def keep_unchanged_files(keep=True):
+    """Make save functions keep a file as is, instead of rewriting it, if its
+    content is unchanged (e.g., not to trigger rebuilds of unchanged outputs).
+    """
+    _saving['keep_unchanged'] = keep
+
+
+def save_file(fn, data, mode="wb"):
+    """Save a byte string into a file, and return True if the file is written.
+    """
+    if _saving['keep_unchanged'] and os.path.isfile(fn):
+        with open(fn, mode.replace("w", "r")) as in_file:
+            if in_file.read() == data:
+                return False
+    with open(fn, mode) as out_file:
+        out_file.write(data)
+    return True
+
+
+class LineWriter(object):
+    """Write string lines joined by a newline into a file in an encoding.
+
+    Lines are encoded and written in chunks of about chunk_size chars, so
+    lines from an iterator are saved without joining a whole text in memory.
+    The file is the same as that of saving the joined and encoded text. If
+    unchanged files are kept (see keep_unchanged_files), lines are written
+    into a temporary file, which replaces the file only if their contents
+    differ.
+
+    Example
+    -------
+    >>> import tempfile
+    >>> fn = tempfile.mktemp()
+    >>> with LineWriter(fn, "\\r\\n", "utf-16", chunk_size=4) as writer:
+    ...     writer.write_lines([u"ab", u"", u"cde"])
+    >>> open(fn, "rb").read() == u"ab\\r\\n\\r\\ncde".encode("utf-16")
+    True
+    >>> os.remove(fn)
+    """
+    def __init__(self, fn, newline="\n", encoding="utf-8", mode="wb",
+                 chunk_size=2**16):
+        self.fn = fn
+        self.newline = newline
+        self.chunk_size = chunk_size
+        self.encoder = codecs.getincrementalencoder(encoding)()
+        self.keep = _saving['keep_unchanged'] and os.path.isfile(fn)
+        self.out_fn = "%s.%d.tmp" % (fn, os.getpid()) if self.keep else fn
+        self.out_file = open(self.out_fn, mode)
+        self.chunk = []
+        self.size = 0
+        self.sep = ""   # the newline before the next chunk
+        self.written = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.out_file.close()
+            if self.keep:
+                os.remove(self.out_fn)
+
+    def write_lines(self, lines):
+        """Write string lines.
+        """
+        for line in lines:
+            self.chunk.append(line)
+            self.size += len(line)
+            if self.size >= self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Write the lines of the current chunk.
+        """
+        if self.chunk:
+            text = self.sep + self.newline.join(self.chunk)
+            self.out_file.write(self.encoder.encode(text))
+            self.sep = self.newline
+            self.chunk = []
+            self.size = 0
+
+    def close(self):
+        """Finish writing, and return True if the file is written.
+        """
+        if self.written is not None:
+            return self.written
+        self.flush()
+        self.out_file.write(self.encoder.encode("", True))
+        self.out_file.close()
+        self.written = True
+        if self.keep:
+            if filecmp.cmp(self.out_fn, self.fn, shallow=False):
+                os.remove(self.out_fn)
+                self.written = False
+            else:
+                os.remove(self.fn)
+                os.rename(self.out_fn, self.fn)
+        return self.written
+
+
+def save_lines(fn, lines, newline, encoding, mode="wb"):
+    """Save string lines, a list or an iterator, joined by a newline into a
+    file in an encoding with a LineWriter, and return True if the file is
+    written.
+    """
+    with LineWriter(fn, newline, encoding, mode) as writer:
+        writer.write_lines(lines)
+    return writer.close()
+
+
 def save_utf8_file(fn, lines):
     """Save string lines into an UTF8 text files.
     """
-    with open(fn, "w") as out_file:
-        out_file.write("\n".join(lines).encode("utf-8"))
+    save_lines(fn, lines, "\n", "utf-8", "w")
 
 
 def save_utf16_file(fn, lines):
     """Save string lines into an UTF16 text files.
     """
-    with open(fn, "wb") as out_file:
-        out_file.write("\r\n".join(lines).encode("utf-16"))
+    save_lines(fn, lines, "\r\n", "utf-16", "wb")
 
 
 def read_unicode(fn):
@@ -102,6 +217,39 @@ def seq_divide(sequence, modulus):
     return [sequence[i:i + modulus] for i in xrange(0, len(sequence), modulus)]
 
 
+#------------------------------------------------------------------------------
+# Process
+#------------------------------------------------------------------------------
+
+_pools = {}     # jobs: pool
+
+
+def pool_map(func, seq, jobs=1, chunksize=1):
+    """Return the list of func(x) for x in a sequence. With more than one
+    job, items are spread across a pool of processes in chunks, and the
+    results are kept in the order of the sequence. The pool of given jobs is
+    created once and reused.
+    >>> pool_map(abs, [-1, 2, -3], jobs=2)
+    [1, 2, 3]
+    """
+    if jobs <= 1:
+        return map(func, seq)
+    if jobs not in _pools:
+        import multiprocessing
+        _pools[jobs] = multiprocessing.Pool(jobs)
+    return _pools[jobs].map(func, seq, chunksize)
+
+
+def close_pools():
+    """Close the pools of processes created by pool_map, with the results
+    cached in their processes.
+    """
+    for pool in _pools.values():
+        pool.close()
+        pool.join()
+    _pools.clear()
+
+
 #------------------------------------------------------------------------------
 # String
 #------------------------------------------------------------------------------
@@ -139,23 +287,25 @@ def camel_case(string):
     return ''.join(w.capitalize() for w in string.split())
 
 
+PUNCTUATIONS = [
+    ('?', 'Q'),   # Q:  question mark
+    ('.', 'P'),   # P:  period; full stop
+    ('!', 'E'),   # E:  exclamation mark
+    ("'", 'SQ'),  # SQ: single quotation mark; single quote
+    ('"', 'DQ'),  # DQ: double quotation mark; double quotes
+    ('(', 'LP'),  # LP: left parenthese
+    (')', 'RP'),  # RP: right parenthese
+    (':', 'Cn'),  # Cn: colon
+    (',', 'Ca'),  # Ca: comma
+    (';', 'S'),   # S:  semicolon
+]
+
+
 def replace_punctuations(text):
     """Replace punctuation characters with abbreviations for a string.
     """
-    punctuations = [
-        ('?', 'Q'),   # Q:  question mark
-        ('.', 'P'),   # P:  period; full stop
-        ('!', 'E'),   # E:  exclamation mark
-        ("'", 'SQ'),  # SQ: single quotation mark; single quote
-        ('"', 'DQ'),  # DQ: double quotation mark; double quotes
-        ('(', 'LP'),  # LP: left parenthese
-        (')', 'RP'),  # RP: right parenthese
-        (':', 'Cn'),  # Cn: colon
-        (',', 'Ca'),  # Ca: comma
-        (';', 'S'),   # S:  semicolon
-    ]
     deleted = '+-*/^=%$#@|\\<>{}[]'
-    return replace_chars(text, punctuations, deleted)
+    return replace_chars(text, PUNCTUATIONS, deleted)
 
 
 def remain_alnum(text):
@@ -198,6 +348,34 @@ def c_identifier(text):
     return remain_alnum(text)
 
 
+_PLUS_DIGIT = re.compile(r'\+(?=\d)')
+_MINUS_DIGIT = re.compile(r'-(?=\d)')
+_NOT_ALNUM = re.compile(r'[^0-9A-Za-z\n]+')
+
+
+def c_identifiers(texts):
+    """Convert input texts into legal identifiers in C, as c_identifier does
+    for each of them. The texts are joined into one text, converted with
+    precompiled patterns and replacements at once, and split back.
+
+    Example
+    -------
+    >>> c_identifiers([u'Hello World', u'Volume +5', u'Why?', u'-1 dB', u''])
+    [u'HelloWorld', u'VolumeP5', u'WhyQ', u'N1Db', u'']
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    joined = u'\n'.join(camel_case(x) if ' ' in x else x for x in texts)
+    if (joined.count(u'\n') != len(texts) - 1 or
+            not all(isinstance(x, unicode) for x in texts)):
+        return [c_identifier(x) for x in texts]
+    joined = _PLUS_DIGIT.sub(u'P', joined)
+    joined = _MINUS_DIGIT.sub(u'N', joined)
+    joined = _NOT_ALNUM.sub(u'', replace_chars(joined, PUNCTUATIONS))
+    return joined.split(u'\n')
+
+
 def wrap_header_guard(lines, h_fn):
     """Wrap a C header guard for a given line list.
     """
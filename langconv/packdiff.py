@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+This module makes a patch between two packs of multilanguage messages and
+applies the patch to the old pack in place.
+
+The Patch Format
+----------------
+A patch is a byte sequence; an integer is an unsigned LEB128 varint and a word
+is 2 bytes in little endian.
+
+Patch: "MLP\\x01" OldWords NewWords OldCrc NewCrc CopyCount Copy^C
+       DataCount Data^D
+    OldCrc, NewCrc: CRC-32 of the old/new pack as words in little endian
+Copy: Dst Src Len
+    moves Len words at Src to Dst; copies are listed in the order to apply
+    them in place
+Data: Dst Len Word^Len
+    writes words to Dst after all copies
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import re
+import struct
+import zlib
+from bisect import bisect_left
+
+
+MAGIC = 'MLP\x01'
+
+
+#------------------------------------------------------------------------------
+# Pack Read
+#------------------------------------------------------------------------------
+
+def read_pack(fn):
+    """Return words of a pack from a C included file (e.g., mlang.i) or from
+    a binary file of 16-bit words in little endian.
+    """
+    with open(fn, 'rb') as in_file:
+        bs = in_file.read()
+
+    text = re.sub(r'//[^\n]*', '', bs)
+    if re.match(r'^[\d,\s]*$', text):
+        return [int(x) for x in re.findall(r'\d+', text)]
+    if len(bs) % 2:
+        raise ValueError('Bad binary pack "%s": odd size' % fn)
+    return list(struct.unpack('<%dH' % (len(bs) // 2), bs))
+
+
+def crc32(words):
+    """Return the CRC-32 of words in little endian.
+    """
+    return zlib.crc32(struct.pack('<%dH' % len(words), *words)) & 0xFFFFFFFF
+
+
+#------------------------------------------------------------------------------
+# Diff
+#------------------------------------------------------------------------------
+
+def matches(old, new, k=4):
+    """Return (dst, src, len) matches of at least k words from old to new.
+    Both sources and destinations of the matches are ascending and do not
+    overlap. Of the candidates of a match, the one nearest to the shift of
+    the previous match is taken; a match changing the shift should be at
+    least 4k words, so that a short match far away does not stop later
+    matches.
+
+    Example
+    -------
+    >>> matches(range(8), [9] + range(8), 2)
+    [(1, 0, 8)]
+    >>> matches(range(8) + [1, 2], [1, 2] + range(8), 2)
+    [(2, 0, 8)]
+    """
+    index = {}
+    for i in xrange(len(old) - k + 1):
+        index.setdefault(tuple(old[i:i + k]), []).append(i)
+
+    result = []
+    src_end = shift = 0
+    j = 0
+    while j <= len(new) - k:
+        cands = index.get(tuple(new[j:j + k]), [])
+        lo = bisect_left(cands, src_end)
+        if lo == len(cands):
+            j += 1
+            continue
+        expected = j - shift
+        c = max(bisect_left(cands, expected), lo)
+        i = min(cands[max(c - 1, lo):c + 1], key=lambda x: abs(x - expected))
+        n = k
+        end = min(len(new) - j, len(old) - i)
+        while n < end and new[j + n] == old[i + n]:
+            n += 1
+        if i != expected and n < 4 * k:
+            j += 1
+            continue
+        result += [(j, i, n)]
+        src_end = i + n
+        shift = j - i
+        j += n
+    return result
+
+
+def diff(old, new, k=4):
+    """Return copies and data of a patch from old to new. Copies are ordered
+    to apply them in place: moves toward lower addresses in ascending order,
+    and then moves toward higher addresses in descending order.
+
+    Example
+    -------
+    >>> diff(range(8), [9] + range(8), 2)
+    ([(1, 0, 8)], [(0, [9])])
+    """
+    copies = matches(old, new, k)
+    data = []
+    pos = 0
+    for dst, _, n in copies + [(len(new), 0, 0)]:
+        if dst > pos:
+            data += [(pos, new[pos:dst])]
+        pos = dst + n
+
+    lefts = [x for x in copies if x[0] < x[1]]
+    rights = [x for x in copies if x[0] > x[1]]
+    return lefts + rights[::-1], data
+
+
+#------------------------------------------------------------------------------
+# Patch Encode/Decode
+#------------------------------------------------------------------------------
+
+def varint(n):
+    """Return the unsigned LEB128 bytes of an integer.
+
+    Example
+    -------
+    >>> varint(300)
+    '\\xac\\x02'
+    """
+    bs = []
+    while n >= 0x80:
+        bs += [chr(n & 0x7F | 0x80)]
+        n >>= 7
+    return ''.join(bs) + chr(n)
+
+
+def encode(old, new, copies, data):
+    """Return the bytes of a patch.
+    """
+    parts = [MAGIC]
+    parts += [varint(x) for x in (len(old), len(new), crc32(old), crc32(new))]
+    parts += [varint(len(copies))]
+    parts += [varint(x) for copy in copies for x in copy]
+    parts += [varint(len(data))]
+    for dst, words in data:
+        parts += [varint(dst), varint(len(words))]
+        parts += [struct.pack('<%dH' % len(words), *words)]
+    return ''.join(parts)
+
+
+def apply_patch(old, patch):
+    """Return the new pack by applying a patch to the old pack in place the
+    same way as MLP_apply of mlpatch.c does.
+
+    Example
+    -------
+    >>> old, new = range(8) + [1, 2], [1, 2] + range(8)
+    >>> apply_patch(old, encode(old, new, *diff(old, new, 2))) == new
+    True
+    """
+    pos = [len(MAGIC)]
+    def read_varint():
+        n = shift = 0
+        while True:
+            b = ord(patch[pos[0]])
+            pos[0] += 1
+            n |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                return n
+
+    if not patch.startswith(MAGIC):
+        raise ValueError('Bad patch: no magic number')
+    old_len, new_len, old_crc, new_crc = [read_varint() for _ in xrange(4)]
+    if len(old) != old_len or crc32(old) != old_crc:
+        raise ValueError('Bad patch: the old pack does not match')
+
+    image = list(old) + [0] * max(new_len - old_len, 0)
+    for _ in xrange(read_varint()):
+        dst, src, n = [read_varint() for _ in xrange(3)]
+        image[dst:dst + n] = image[src:src + n]
+    for _ in xrange(read_varint()):
+        dst, n = read_varint(), read_varint()
+        image[dst:dst + n] = struct.unpack('<%dH' % n,
+                                           patch[pos[0]:pos[0] + 2 * n])
+        pos[0] += 2 * n
+    image = image[:new_len]
+
+    if crc32(image) != new_crc:
+        raise ValueError('Bad patch: the new pack does not match')
+    return image
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
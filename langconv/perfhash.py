@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+This module builds a minimal perfect hash of the names of message IDs, so
+the firmware can look a message ID up by its name (e.g., "SaveSettings") in
+O(1) with a single string compare (see mlkey.c), and formats it as a C
+included file.
+
+The keys are hashed and displaced: a key falls into the bucket of its FNV-1a
+hash, and the keys of a bucket are placed into free slots by the mix of
+another FNV-1a hash of the key (seeded with SLOT_SEED) and the seed of the
+bucket. A bucket of a key is placed directly into a free slot, denoted by a
+negative seed -(slot + 1).
+
+The Key Table Format
+--------------------
+#define MLK_KEYS N
+    N: the number of keys, i.e., the number of buckets and slots
+_mlkSeeds[N]: the seed of each bucket
+_mlkKeys[N]: the key of each slot
+_mlkIDs[N]: the message ID of the key of each slot
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+from myutil import array_str_from_ints
+
+
+FNV_BASIS = 0x811C9DC5
+FNV_PRIME = 0x01000193
+SLOT_SEED = 0x5BD1E995  # the FNV-1a seed of the hash placing a key in a slot
+
+
+#------------------------------------------------------------------------------
+# Hash
+#------------------------------------------------------------------------------
+
+def fnv1a(key, seed=0):
+    """Return the 32-bit FNV-1a hash of a byte string whose offset basis is
+    xored with a seed, as _hash of mlkey.c does.
+
+    Example
+    -------
+    >>> '%08x' % fnv1a('a'), fnv1a('a', 1) == fnv1a('a')
+    ('e40c292c', False)
+    """
+    h = FNV_BASIS ^ seed
+    for c in key:
+        h = ((h ^ ord(c)) * FNV_PRIME) & 0xFFFFFFFF
+    return h
+
+
+def mix(h):
+    """Return a 32-bit integer mixed by the finalizer of MurmurHash3, as
+    _mix of mlkey.c does.
+
+    Example
+    -------
+    >>> '%08x' % mix(1), mix(0)
+    ('514e28b7', 0)
+    """
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    return h ^ (h >> 16)
+
+
+def build(keys):
+    """Return the seeds of buckets and the key indexes of slots of a minimal
+    perfect hash of distinct byte strings.
+
+    Example
+    -------
+    >>> keys = ['English', 'Chinese', 'MenuSetting', 'SaveSettings']
+    >>> seeds, slots = build(keys)
+    >>> sorted(slots) == range(len(keys))
+    True
+    >>> [slots[lookup(k, seeds, [keys[i] for i in slots])] for k in keys]
+    [0, 1, 2, 3]
+    """
+    n = len(keys)
+    if len(set(keys)) != n:
+        raise ValueError('Duplicate keys of a perfect hash')
+    buckets = [[] for _ in xrange(n)]
+    for i, k in enumerate(keys):
+        buckets[fnv1a(k) % n] += [i]
+    hashes = [fnv1a(k, SLOT_SEED) for k in keys]
+
+    seeds = [0] * n
+    slots = [None] * n
+    order = sorted(xrange(n), key=lambda b: -len(buckets[b]))
+    multi = [b for b in order if len(buckets[b]) > 1]
+    for b in multi:
+        bucket = buckets[b]
+        seed = 1
+        while True:
+            taken = [mix(hashes[i] ^ seed) % n for i in bucket]
+            if (len(set(taken)) == len(bucket) and
+                    all(slots[s] is None for s in taken)):
+                break
+            seed += 1
+            if seed > 0x7FFFFFFF:
+                raise ValueError('No perfect hash of keys %s' %
+                                 ', '.join(keys[i] for i in bucket))
+        for i, s in zip(bucket, taken):
+            slots[s] = i
+        seeds[b] = seed
+
+    free = (s for s in xrange(n) if slots[s] is None)
+    for b in order[len(multi):]:
+        if not buckets[b]:
+            break
+        s = next(free)
+        slots[s] = buckets[b][0]
+        seeds[b] = -s - 1
+    return seeds, slots
+
+
+def lookup(key, seeds, keys_by_slot):
+    """Return the slot of a key, or None if it is not a key, as
+    MLK_getMsgID of mlkey.c does.
+
+    Example
+    -------
+    >>> keys = ['Yes', 'No']
+    >>> seeds, slots = build(keys)
+    >>> keys_by_slot = [keys[i] for i in slots]
+    >>> keys_by_slot[lookup('No', seeds, keys_by_slot)]
+    'No'
+    >>> lookup('Maybe', seeds, keys_by_slot) is None
+    True
+    """
+    n = len(seeds)
+    if not n:
+        return None
+    seed = seeds[fnv1a(key) % n]
+    if seed < 0:
+        slot = -seed - 1
+    else:
+        slot = mix(fnv1a(key, SLOT_SEED) ^ seed) % n
+    return slot if keys_by_slot[slot] == key else None
+
+
+#------------------------------------------------------------------------------
+# Key Table
+#------------------------------------------------------------------------------
+
+def table_lines(seeds, keys_by_slot, ids_by_slot):
+    """Return lines of the C key table of a perfect hash, with the keys and
+    the message IDs of slots.
+
+    Example
+    -------
+    >>> for line in table_lines([-2, -1], ['No', 'Yes'], [1, 0]):
+    ...     print line
+    <BLANKLINE>
+    #define MLK_KEYS 2
+    <BLANKLINE>
+    /** Seeds of buckets */
+    static const int32_t _mlkSeeds[MLK_KEYS] = {
+      -2,  -1,
+    };
+    <BLANKLINE>
+    /** Keys of slots */
+    static const char* const _mlkKeys[MLK_KEYS] = {
+        "No",
+        "Yes",
+    };
+    <BLANKLINE>
+    /** Message IDs of slots */
+    static const MsgID _mlkIDs[MLK_KEYS] = {
+       1,   0,
+    };
+    """
+    lines = ['', '#define MLK_KEYS %d' % len(seeds)]
+    lines += ['', '/** Seeds of buckets */']
+    lines += ['static const int32_t _mlkSeeds[MLK_KEYS] = {']
+    lines += [array_str_from_ints(seeds[i:i + 16])
+                for i in xrange(0, len(seeds), 16)]
+    lines += ['};']
+    lines += ['', '/** Keys of slots */']
+    lines += ['static const char* const _mlkKeys[MLK_KEYS] = {']
+    lines += ['    "%s",' % k for k in keys_by_slot]
+    lines += ['};']
+    lines += ['', '/** Message IDs of slots */']
+    lines += ['static const MsgID _mlkIDs[MLK_KEYS] = {']
+    lines += [array_str_from_ints(ids_by_slot[i:i + 16])
+                for i in xrange(0, len(ids_by_slot), 16)]
+    lines += ['};']
+    return lines
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+This module keeps a registry of message IDs, which fixes the enumeration value
+of each message ID across releases.
+
+A registry file lists a message ID per line with its value, e.g.,
+"7 MenuSetting". A deleted message ID is tombstoned with a trailing "deleted"
+and its value is never reused. A line prefixing '#' denotes a comment line.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+from collections import Counter
+
+from myutil import read_unicode, save_utf8_file
+
+
+#------------------------------------------------------------------------------
+# Common Help functions
+#------------------------------------------------------------------------------
+
+def duplicates(seq):
+    """Return sorted items appearing more than once in a sequence.
+
+    Example
+    -------
+    >>> duplicates('abcbca')
+    ['a', 'b', 'c']
+    """
+    return sorted(x for x, n in Counter(seq).items() if n > 1)
+
+
+#------------------------------------------------------------------------------
+# File Read/Write
+#------------------------------------------------------------------------------
+
+def read_registry(fn):
+    """Return (value, ID, deleted) entries of a registry file sorted by values.
+    A registry file not existing yet is an empty registry.
+    """
+    if not os.path.exists(fn):
+        return []
+
+    entries = []
+    for line in read_unicode(fn).splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split()
+        if (len(fields) not in (2, 3) or not fields[0].isdigit()
+                or fields[2:] not in ([], ['deleted'])):
+            raise ValueError('Bad line in registry "%s": %s' % (fn, line))
+        entries += [(int(fields[0]), fields[1], len(fields) == 3)]
+
+    entries.sort()
+    for i, what in ((0, 'value'), (1, 'message ID')):
+        dups = duplicates(x[i] for x in entries)
+        if dups:
+            raise ValueError('Duplicate %s in registry "%s": %s' %
+                             (what, fn, dups[0]))
+    return entries
+
+
+def save_registry(fn, entries):
+    """Save (value, ID, deleted) entries into a registry file.
+    """
+    lines = ['# Message ID registry; do not edit values or reuse them', '']
+    lines += ['%d %s%s' % (v, id, ' deleted' if deleted else '')
+                for v, id, deleted in entries]
+    save_utf8_file(fn, lines + [''])
+
+
+#------------------------------------------------------------------------------
+# Registration
+#------------------------------------------------------------------------------
+
+def register(entries, msg_ids):
+    """Return registry entries updated with the current message IDs.
+
+    A registered ID keeps its value, an ID coming back is revived, a new ID is
+    appended with the next value, and a registered ID no longer used is
+    tombstoned.
+
+    Example
+    -------
+    >>> entries = register([], ['A', 'B', 'C'])
+    >>> register(entries, ['C', 'D', 'A'])
+    [(0, 'A', False), (1, 'B', True), (2, 'C', False), (3, 'D', False)]
+    """
+    dups = duplicates(msg_ids)
+    if dups:
+        raise ValueError('Duplicate message ID: %s' % dups[0])
+
+    used = set(msg_ids)
+    known = set(id for _, id, _ in entries)
+    entries = [(v, id, id not in used) for v, id, _ in entries]
+    value = max([v + 1 for v, _, _ in entries] + [0])
+    for id in msg_ids:
+        if id not in known:
+            entries += [(value, id, False)]
+            value += 1
+    return entries
+
+
+def slots(entries, msg_ids, block=1):
+    """Return the row index of each value of registry entries; None for a
+    tombstone or a reserved value. The number of values is rounded up to a
+    multiple of the given block.
+
+    Example
+    -------
+    >>> slots([(0, 'A', False), (1, 'B', True), (3, 'C', False)], ['C', 'A'])
+    [1, None, None, 0]
+    >>> slots([(0, 'A', False)], ['A'], 4)
+    [0, None, None, None]
+    """
+    rows = dict((id, i) for i, id in enumerate(msg_ids))
+    total = max([v + 1 for v, _, _ in entries] + [0])
+    total = (total + block - 1) // block * block
+    result = [None] * total
+    for v, id, deleted in entries:
+        if not deleted:
+            result[v] = rows[id]
+    return result
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
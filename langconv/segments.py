@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+This module splits messages with printf-style placeholders (e.g., "%d",
+"%s", and positional "%2$s") into segments of literal chars and typed
+placeholder slots, checks that the placeholders of each language match those
+of ENGLISH, and formats the segments as a C included file, so the target
+assembles messages with arguments without parsing formats (see mlfmt.c).
+
+A placeholder is "%[n$][flags][width]type": n is the number of its argument
+(from 1; placeholders without n take arguments in order), the flags are "-"
+(left-justified) and "0" (zero-padded), and the type is one of "d", "i",
+"u", "x", "X", "o", "s" (a Char string), and "c" (a Char). "%%" is a "%".
+Any other "%" is a literal char. A message is parameterized if its ENGLISH
+message has a placeholder or "%%"; the other messages have no segments.
+
+The Format Table Format
+-----------------------
+FmtHeader LangOffset^(L+1) LangFmt^L
+    L: the total number of languages
+FmtHeader: MsgCounterPerLang LangCount Digit^24
+    Digit: the index of each char of "0123456789abcdefABCDEF- " (0xFFFF for
+           a char not listed) to format numbers and pad placeholders
+LangOffset: the offset of a LangFmt from the first LangOffset
+LangFmt: SegOffset^(M+1) Seg^S
+    M: the total number of messages
+    SegOffset: the offset of the segments of a message from the first Seg;
+               a message without segments is not parameterized
+    Seg: Literal | Slot
+    Literal: Length Char^Length (0 < Length < 0x8000)
+    Slot: 0x8000 | Type << 12 | Arg << 8 | ZeroPad << 7 | Left << 6 | Width
+        Type: 0 to 6 for "d" ("i"), "u", "x", "X", "o", "s", and "c"
+        Arg: the number of the argument - 1 (0 to 15)
+        Width: the least width of the placeholder in chars (0 to 63)
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import re
+
+from myutil import array_str_from_ints, offsets_from_lens
+from carray import IntRows
+
+
+_PLACEHOLDER = re.compile(r'%%|%(?:(\d+)\$)?([-0]*)(\d*)([diuxXosc])')
+
+TYPES = 'duxXosc'
+DIGITS = u'0123456789abcdefABCDEF- '
+MAX_ARGS = 16
+MAX_WIDTH = 63
+
+# the argument kind of each type, which placeholders of an argument share
+_KINDS = {'d': 'd', 'i': 'd', 'u': 'u', 'x': 'u', 'X': 'u', 'o': 'u',
+          's': 's', 'c': 'c'}
+
+# the digit chars that placeholders of each type may put
+_TYPE_DIGITS = {'d': u'0123456789-', 'u': u'0123456789',
+                'x': u'0123456789abcdef', 'X': u'0123456789ABCDEF',
+                'o': u'01234567', 's': u'', 'c': u''}
+
+
+#------------------------------------------------------------------------------
+# Placeholders
+#------------------------------------------------------------------------------
+
+def split(msg):
+    """Return the segments of a message: literal strings and (argument
+    number, type, zero-padded, left-justified, width) slots; None if it has
+    neither a placeholder nor "%%". A ValueError is raised for a message
+    mixing positional and ordered placeholders, or out of the limits of the
+    format table.
+
+    Example
+    -------
+    >>> split(u'Delete %d files?')
+    [u'Delete ', (1, 'd', False, False, 0), u' files?']
+    >>> split(u'%2$s: %1$05X')
+    [(2, 's', False, False, 0), u': ', (1, 'X', True, False, 5)]
+    >>> split(u'100%% of %-3c'), split(u'50% off')
+    ([u'100% of ', (1, 'c', False, True, 3)], None)
+    """
+    segs = []
+    literal = []
+    pos = 0
+    args = 0
+    positional = set()
+    found = False
+    for m in _PLACEHOLDER.finditer(msg):
+        found = True
+        literal += [msg[pos:m.start()]]
+        pos = m.end()
+        if m.group(0) == u'%%':
+            literal += [u'%']
+            continue
+        number, flags, width, type_ = m.groups()
+        positional.add(number is not None)
+        if number is None:
+            args += 1
+            number = args
+        number, width = int(number), int(width or 0)
+        if not 1 <= number <= MAX_ARGS:
+            raise ValueError('Argument %d of "%s" is not in 1 to %d'
+                             % (number, m.group(0), MAX_ARGS))
+        if width > MAX_WIDTH:
+            raise ValueError('Width %d of "%s" is over %d'
+                             % (width, m.group(0), MAX_WIDTH))
+        if ''.join(literal):
+            segs += [u''.join(literal)]
+        literal = []
+        segs += [(number, 'd' if type_ == 'i' else str(type_), '0' in flags,
+                  '-' in flags, width)]
+    if not found:
+        return None
+    if len(positional) > 1:
+        raise ValueError('Positional and ordered placeholders are mixed')
+    literal += [msg[pos:]]
+    if ''.join(literal):
+        segs += [u''.join(literal)]
+    return segs
+
+
+def arg_kinds(segs):
+    """Return the argument number: kind ("d", "u", "s", or "c") dictionary
+    of segments. A ValueError is raised for an argument of two kinds.
+
+    Example
+    -------
+    >>> sorted(arg_kinds(split(u'%2$s %1$x %1$u')).items())
+    [(1, 'u'), (2, 's')]
+    """
+    kinds = {}
+    for seg in segs or []:
+        if isinstance(seg, tuple):
+            kind = _KINDS[seg[1]]
+            if kinds.setdefault(seg[0], kind) != kind:
+                raise ValueError('Argument %d is of two kinds' % seg[0])
+    return kinds
+
+
+def kinds_str(kinds):
+    """Return the string of an argument kind dictionary as placeholders.
+
+    Example
+    -------
+    >>> kinds_str({2: 's', 1: 'd'}), kinds_str({})
+    ('%1$d %2$s', 'none')
+    """
+    return ' '.join('%%%d$%s' % x for x in sorted(kinds.items())) or 'none'
+
+
+def split_langs(langs, msgs, msg_ids):
+    """Return the segments of each message of each language (None for a
+    message not parameterized). A ValueError listing all the messages is
+    raised if a language has a message whose placeholders differ from those
+    of ENGLISH, or a message out of the limits of the format table.
+
+    Arguments
+    ---------
+    langs
+        language names, ENGLISH among them
+    msgs
+        the Column of the packed messages of each language
+    msg_ids
+        the message IDs of messages (i.e., the names without "MSG_")
+
+    Example
+    -------
+    >>> segs = split_langs(['English', 'Spanish'],
+    ...                    [[u'%d of %s', u'Ok'], [u'%2$s: %1$d', u'Vale']],
+    ...                    ['Count', 'Ok'])
+    >>> segs[1]
+    [[(2, 's', False, False, 0), u': ', (1, 'd', False, False, 0)], None]
+    >>> split_langs(['English', 'Spanish'], [[u'%d'], [u'%s']], ['Count'])
+    Traceback (most recent call last):
+    ...
+    ValueError: Placeholders of 1 messages differ from those of ENGLISH:
+        MSG_Count of Spanish "%s": %1$s, not %1$d
+    """
+    heads = [lang.upper() for lang in langs]
+    if 'ENGLISH' not in heads:
+        raise ValueError('Placeholders need the ENGLISH column to match')
+    english = msgs[heads.index('ENGLISH')]
+
+    errors = []
+    result = [[None] * len(english) for _ in langs]
+    for i, en in enumerate(english):
+        try:
+            en_segs = split(en)
+            en_kinds = arg_kinds(en_segs)
+        except ValueError as e:
+            errors += [u'MSG_%s of ENGLISH "%s": %s' % (msg_ids[i], en, e)]
+            continue
+        for lang, m, segs in zip(langs, msgs, result):
+            msg = m[i]
+            if not msg:
+                continue
+            try:
+                segs[i] = split(msg)
+                kinds = arg_kinds(segs[i])
+            except ValueError as e:
+                errors += [u'MSG_%s of %s "%s": %s' % (msg_ids[i], lang, msg,
+                                                       e)]
+                continue
+            if kinds != en_kinds:
+                errors += [u'MSG_%s of %s "%s": %s, not %s'
+                            % (msg_ids[i], lang, msg, kinds_str(kinds),
+                               kinds_str(en_kinds))]
+            if en_segs is None:
+                segs[i] = None
+            elif segs[i] is None:
+                segs[i] = [msg]
+    if errors:
+        raise ValueError('\n    '.join(
+            ['Placeholders of %d messages differ from those of ENGLISH:'
+                % len(errors)] + errors))
+    return result
+
+
+#------------------------------------------------------------------------------
+# Format Table
+#------------------------------------------------------------------------------
+
+def digit_idxes(char_tbl, segs):
+    """Return the char indexes of DIGITS (0xFFFF for a char not listed) of a
+    char:index table. A ValueError is raised if segments of messages have a
+    placeholder putting a char not listed.
+    """
+    needed = set()
+    for lang_segs in segs:
+        for msg_segs in lang_segs:
+            for seg in msg_segs or []:
+                if isinstance(seg, tuple):
+                    number, type_, zero, left, width = seg
+                    needed.update(_TYPE_DIGITS[type_])
+                    if width:
+                        zero = zero and not left and type_ not in 'sc'
+                        needed.add(u'0' if zero else u' ')
+    missing = sorted(needed.difference(char_tbl))
+    if missing:
+        raise ValueError('Chars of placeholders are not listed: %s'
+                         % ' '.join('U+%04X' % ord(c) for c in missing))
+    return [char_tbl.get(c, 0xFFFF) for c in DIGITS]
+
+
+def seg_words(segs, char_idxes):
+    """Return the words of the segments of a message.
+
+    Arguments
+    ---------
+    char_idxes
+        a function returning the char indexes of a string
+
+    Example
+    -------
+    >>> idxes = lambda s: [ord(c) for c in s]
+    >>> seg_words([u'No ', (2, 's', False, False, 0), u'!'], idxes)
+    [3, 78, 111, 32, 53504, 1, 33]
+    >>> '%04X' % seg_words([(1, 'X', True, False, 5)], idxes)[0]
+    'B085'
+    """
+    words = []
+    for seg in segs:
+        if isinstance(seg, tuple):
+            number, type_, zero, left, width = seg
+            words += [0x8000 | TYPES.index(type_) << 12 | (number - 1) << 8 |
+                      zero << 7 | left << 6 | width]
+        else:
+            for i in xrange(0, len(seg), 0x7FFF):
+                part = seg[i:i + 0x7FFF]
+                words += [len(part)]
+                words.extend(char_idxes(part))
+    return words
+
+
+def lang_sections(lang, lang_segs, char_idxes):
+    """Return the (comment, IntRows) sections of the LangFmt of a language
+    from the segments of its messages.
+    """
+    words = [seg_words(s, char_idxes) if s else [] for s in lang_segs]
+    offsets = [0]
+    for w in words:
+        offsets += [offsets[-1] + len(w)]
+    return [('%s segment offsets of messages' % lang,
+             IntRows.divide(offsets, 16)),
+            ('%s segments of parameterized messages' % lang,
+             IntRows.from_lists(w for w in words if w))]
+
+
+def header_lines(msg_total, digits, lang_words):
+    """Return lines of the FmtHeader and the LangOffsets of a format table.
+
+    Arguments
+    ---------
+    msg_total
+        the total number of messages
+    digits
+        the char indexes of DIGITS
+    lang_words
+        the number of words of the LangFmt of each language
+
+    Example
+    -------
+    >>> for line in header_lines(3, range(24), [10, 12]):
+    ...     print line
+    <BLANKLINE>
+       3,   // the total messages of a language
+       2,   // the total number of languages
+    <BLANKLINE>
+    // The chars of "0123456789abcdefABCDEF- "
+       0,   1,   2,   3,   4,   5,   6,   7,   8,   9,  10,  11,
+      12,  13,  14,  15,  16,  17,  18,  19,  20,  21,  22,  23,
+    <BLANKLINE>
+    // The offsets of languages
+       3,  13,  25,
+    """
+    lines = ['']
+    lines += ['%4d,   // the total messages of a language' % msg_total]
+    lines += ['%4d,   // the total number of languages' % len(lang_words)]
+    lines += ['', '// The chars of "%s"' % DIGITS]
+    lines += [array_str_from_ints(digits[:12]),
+              array_str_from_ints(digits[12:])]
+    lines += ['', '// The offsets of languages']
+    lines += [array_str_from_ints(offsets_from_lens(list(lang_words)))]
+    return lines
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+This module serves command lines of the Multi-language converting tool at a
+Unix domain socket, a named pipe, or a TCP port with a token (see the client
+module for the addresses and the protocol). Requests are run one at a time in
+a runner process of their own, so caches of the runner stay warm across
+requests, while the standard streams and the working directory of the server
+are left alone.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import sys
+import time
+import signal
+import socket
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import Listener, AuthenticationError
+
+from client import parse_address, server_token, DEFAULT_TOKEN
+
+
+#------------------------------------------------------------------------------
+# Server
+#------------------------------------------------------------------------------
+
+class Runner(object):
+    """A runner process, started by a function that receives (argv, cwd) of
+    requests from a connection and sends back (status, stdout, stderr) of
+    each. The process is started again if it dies.
+    """
+    def __init__(self, target):
+        self.target = target
+        self.process = None
+
+    def start(self):
+        self.conn, child_conn = Pipe()
+        self.process = Process(target=self.target, args=(child_conn,))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+    def run(self, argv, cwd):
+        """Return the exit status, the standard output, and the standard
+        error of a command line run in a working directory.
+        """
+        if self.process is None or not self.process.is_alive():
+            self.start()
+        try:
+            self.conn.send((argv, cwd))
+            return self.conn.recv()
+        except (EOFError, IOError):
+            self.process = None
+            return 1, '', 'The runner process of the server died\n'
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+
+def listener(address):
+    """Return a Listener at an address, authenticated with the token of
+    client.server_token. A TCP address requires a token; a Unix domain
+    socket is made accessible only to the user.
+    """
+    kind, where = parse_address(address)
+    token = server_token()
+    if kind == 'tcp' and token is None:
+        raise ValueError('A TCP server requires a token in LANGCONV_TOKEN')
+    if kind == 'unix':
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix domain sockets are not supported here')
+        folder = os.path.dirname(where)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder, 0o700)
+        if os.path.exists(where):
+            os.remove(where)
+        mask = os.umask(0o077)
+        try:
+            return Listener(where, 'AF_UNIX', authkey=token or DEFAULT_TOKEN)
+        finally:
+            os.umask(mask)
+    family = 'AF_PIPE' if kind == 'pipe' else 'AF_INET'
+    return Listener(where, family, authkey=token or DEFAULT_TOKEN)
+
+
+def serve(address, target):
+    """Serve command lines at an address until interrupted (e.g., by Ctrl+C).
+
+    Arguments
+    ---------
+    address
+        the server address (see client.parse_address)
+    target
+        the function of the runner process (see Runner)
+    """
+    kind, where = parse_address(address)
+    server = listener(address)
+    runner = Runner(target)
+    runner.start()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print 'Serving on %s (Ctrl+C to stop)' % address
+    sys.stdout.flush()
+    try:
+        while True:
+            try:
+                conn = server.accept()
+            except AuthenticationError:
+                print '%s rejected a client with a bad token' % (
+                    time.strftime('%H:%M:%S'))
+                sys.stdout.flush()
+                continue
+            except (EOFError, IOError):
+                continue
+            try:
+                req = conn.recv()
+                argv, cwd = list(req['argv']), req['cwd']
+            except (EOFError, IOError, ValueError, KeyError, TypeError):
+                conn.close()
+                continue
+
+            start = time.time()
+            status, out, err = runner.run(argv, cwd)
+            try:
+                conn.send({'status': status, 'stdout': out, 'stderr': err})
+            except IOError:
+                pass
+            conn.close()
+            print '%s %s -> %d (%.3f s)' % (time.strftime('%H:%M:%S'),
+                ' '.join(argv[1:]), status, time.time() - start)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop()
+        server.close()
+        if kind == 'unix' and os.path.exists(where):
+            os.remove(where)
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
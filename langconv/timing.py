@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+This module accumulates wall time and CPU time of the phases of converting
+(read, clean, shape, index, format, and write), and optionally traces their
+peak and retained memory against a memory budget.
+
+A phase is timed with the phase context manager. Time of a nested phase is
+not counted in its outer phase, so the time of phases sums up to the time
+spent in them.
+
+Memory is traced with tracemalloc if it is available (Python 3.4+ or
+pytracemalloc); otherwise the resident set size of the process is read with
+the resource module, and allocation sites are not listed. The resident set
+size has no peak of its own phase, so each phase reports the growth of the
+resident set size from its start to its end, and the high-water mark of the
+process at its end.
+
+Imports of a statement are timed in a fresh interpreter and listed in the
+format of -X importtime of Python 3.7+.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+PHASES = ('read', 'clean', 'shape', 'index', 'format', 'write')
+
+_totals = OrderedDict()     # name: [wall, cpu]
+_memory = OrderedDict()     # name: [peak, retained]
+_stack = []                 # [name, wall, cpu, inner wall, inner cpu,
+                            #  memory at start, peak memory]
+_tracer = {}                # 'budget': bytes; 'rss': True if reading RSS;
+                            # 'sites': (memory, top allocation sites) at
+                            # the most memory of phase ends
+
+
+#------------------------------------------------------------------------------
+# Clock
+#------------------------------------------------------------------------------
+
+def cpu_time():
+    """Return the user and system CPU time in seconds of this process.
+    """
+    t = os.times()
+    return t[0] + t[1]
+
+
+def now():
+    """Return the current (wall time, CPU time) in seconds.
+    """
+    return time.time(), cpu_time()
+
+
+#------------------------------------------------------------------------------
+# Memory
+#------------------------------------------------------------------------------
+
+def trace_memory(budget=None):
+    """Start tracing memory of phases.
+
+    Arguments
+    ---------
+    budget
+        the memory budget in bytes; exit with an error as soon as the peak
+        memory (the high-water mark of the process without tracemalloc) is
+        over the budget when a phase starts or ends normally, so a command
+        exits at the first phase boundary (e.g., the next language packed)
+        after going over the budget
+    """
+    if tracemalloc is None and resource is None:
+        raise ValueError('Tracing memory needs tracemalloc or resource module')
+    if tracemalloc is not None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+    _tracer.clear()
+    _tracer['budget'] = budget
+    _tracer['rss'] = tracemalloc is None
+
+
+def memory_usage():
+    """Return the (current, peak) memory in bytes. Traced Python memory is
+    returned with tracemalloc; otherwise the resident set size and its
+    high-water mark of the process are returned.
+    """
+    if not _tracer['rss']:
+        return tracemalloc.get_traced_memory()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak *= 1 if sys.platform == 'darwin' else 1024
+    try:
+        with open('/proc/self/statm') as in_file:
+            pages = int(in_file.read().split()[1])
+        current = pages * os.sysconf('SC_PAGESIZE')
+    except (IOError, OSError):
+        current = peak
+    return current, peak
+
+
+def _update_peaks():
+    """Fold the peak memory since the last update into the phases being run
+    and return the current memory.
+    """
+    current, peak = memory_usage()
+    for frame in _stack:
+        frame[6] = max(frame[6], peak)
+    if not _tracer['rss'] and hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    return current
+
+
+def _check_budget(name, peak):
+    """Exit with an error if the peak memory in a phase is over the budget.
+    """
+    budget = _tracer['budget']
+    if budget is not None and peak > budget:
+        sys.exit('Memory budget exceeded in phase "%s": %s %.1f MiB > budget '
+                 '%.1f MiB' % (name, 'high-water mark' if _tracer['rss'] else
+                               'peak', peak / 2.0**20, budget / 2.0**20))
+
+
+def _take_snapshot(current, n=20):
+    """Keep the n top allocation sites if the current memory is the most at
+    phase ends so far.
+    """
+    if _tracer['rss'] or current <= _tracer.get('sites', (0, []))[0]:
+        return
+    pattern = os.path.splitext(__file__)[0] + '.py*'
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, pattern)])
+    stats = snapshot.statistics('lineno')[:n]
+    _tracer['sites'] = (current, [
+        ('%s:%d' % (s.traceback[0].filename, s.traceback[0].lineno),
+         s.size, s.count) for s in stats])
+    del snapshot, stats
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+
+
+def top_allocations(n=10):
+    """Return the n top allocation sites as (file:line, size, count) items
+    at the most memory of phase ends; an empty list without tracemalloc.
+    """
+    return _tracer.get('sites', (0, []))[1][:n]
+
+
+#------------------------------------------------------------------------------
+# Phases
+#------------------------------------------------------------------------------
+
+def reset():
+    """Clear the time and the memory accumulated in phases.
+    """
+    _totals.clear()
+    _memory.clear()
+    for name in PHASES:
+        _totals[name] = [0.0, 0.0]
+
+
+@contextmanager
+def phase(name):
+    """Accumulate the time spent in a with-block to a phase.
+
+    Example
+    -------
+    >>> reset()
+    >>> with phase('format'):
+    ...     with phase('write'):
+    ...         time.sleep(0.01)
+    >>> t = times()
+    >>> t['write'][0] >= 0.01, t['format'][0] < 0.01
+    (True, True)
+    """
+    memory = 0
+    if _tracer:
+        memory = _update_peaks()
+        if _stack:
+            outer = _stack[-1]
+            _check_budget(outer[0], outer[6])
+    wall, cpu = now()
+    _stack.append([name, wall, cpu, 0.0, 0.0, memory, memory])
+    try:
+        yield
+    finally:
+        end_wall, end_cpu = now()
+        end_memory = _update_peaks() if _tracer else 0
+        _, wall, cpu, inner_wall, inner_cpu, memory, peak = _stack.pop()
+        wall, cpu = end_wall - wall, end_cpu - cpu
+        total = _totals.setdefault(name, [0.0, 0.0])
+        total[0] += wall - inner_wall
+        total[1] += cpu - inner_cpu
+        if _stack:
+            _stack[-1][3] += wall
+            _stack[-1][4] += cpu
+
+        if _tracer:
+            _take_snapshot(end_memory)
+            usage = _memory.setdefault(name, [0, 0])
+            usage[0] = max(usage[0], peak)
+            usage[1] += end_memory - memory
+
+    # checked after the finally clause, so that the exit does not replace an
+    # exception raised in the phase
+    if _tracer:
+        _check_budget(name, peak)
+
+
+def times():
+    """Return phase: (wall time, CPU time) items in seconds.
+    """
+    return OrderedDict((name, tuple(t)) for name, t in _totals.items())
+
+
+def memory():
+    """Return phase: (peak, retained) items in bytes of traced phases. The
+    peak is the highest memory while running a phase (the high-water mark of
+    the process at its end without tracemalloc), and the retained is the
+    memory growth from its start to its end.
+    """
+    return OrderedDict((name, tuple(m)) for name, m in _memory.items())
+
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+# Run the statement of argv[1] with __import__ timed; a module is listed when
+# it finishes importing, indented by the depth of the nested import.
+_IMPORT_TIMER = r'''
+import sys, time, __builtin__
+_import = __builtin__.__import__
+_inner = [0.0]
+
+def _timed_import(name, *args, **kwargs):
+    fresh = name not in sys.modules
+    count = len(sys.modules)
+    _inner.append(0.0)
+    start = time.time()
+    try:
+        return _import(name, *args, **kwargs)
+    finally:
+        total = time.time() - start
+        inner = _inner.pop()
+        if fresh and len(sys.modules) > count:
+            _inner[-1] += total
+            sys.stderr.write('import time: %9d | %11d | %s%s\n' % (
+                (total - inner) * 1e6, total * 1e6,
+                '  ' * (len(_inner) - 1), name))
+
+sys.stderr.write('import time: self [us] | cumulative | imported package\n')
+__builtin__.__import__ = _timed_import
+exec sys.argv[1]
+'''
+
+
+def import_time_lines(stmt, cwd=None):
+    """Return lines of the imports of a statement run in a fresh interpreter
+    in a working directory, in the format of -X importtime of Python 3.7+.
+    """
+    import subprocess
+
+    proc = subprocess.Popen([sys.executable, '-c', _IMPORT_TIMER, stmt],
+                            cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    _, err = proc.communicate()
+    if proc.returncode:
+        raise ValueError('Failed to run "%s":\n%s' % (stmt, err))
+    return [x for x in err.splitlines() if x.startswith('import time:')]
+
+
+def import_times(stmt, cwd=None):
+    """Return module: (self time, cumulative time) items in seconds of the
+    modules imported by a statement (see import_time_lines).
+
+    Example
+    -------
+    >>> t = import_times('import json')
+    >>> 'json' in t, t['json'][1] >= t['json'][0]
+    (True, True)
+    """
+    pattern = re.compile(r'import time:\s*(\d+) \|\s*(\d+) \| +(\S+)')
+    items = OrderedDict()
+    for line in import_time_lines(stmt, cwd):
+        mo = pattern.match(line)
+        if mo:
+            items[mo.group(3)] = (int(mo.group(1)) / 1e6,
+                                  int(mo.group(2)) / 1e6)
+    return items
+
+
+#------------------------------------------------------------------------------
+# Report
+#------------------------------------------------------------------------------
+
+def report_lines(total=None):
+    """Return lines of a table listing the time of phases. Given the total
+    (wall time, CPU time), the time not spent in phases is listed as "other".
+
+    Example
+    -------
+    >>> reset()
+    >>> report_lines((0.5, 0.25))[-1]
+    'total       0.500     0.250'
+    """
+    items = list(times().items())
+    if total is not None:
+        other = [total[i] - sum(t[i] for _, t in items) for i in (0, 1)]
+        items += [('other', other), ('total', total)]
+    lines = ['%-8s %8s %9s' % ('phase', 'wall (s)', 'CPU (s)')]
+    lines += ['%-8s %8.3f %9.3f' % (name, t[0], t[1]) for name, t in items]
+    return lines
+
+
+def memory_lines(top=10):
+    """Return lines of a table listing the peak and the retained memory of
+    phases, followed by the top allocation sites.
+    """
+    mib = lambda x: x / 2.0**20
+    if _tracer.get('rss'):
+        heads = ('high-water (MiB)', 'RSS delta (MiB)')
+        notes = ['', 'Resident set size: the high-water mark is of the '
+                 'process at the end of a', 'phase, not of the phase; the '
+                 'delta is from the start to the end of a phase.']
+    else:
+        heads = ('peak (MiB)', 'retained (MiB)')
+        notes = []
+    lines = ['%-8s %16s %15s' % (('phase',) + heads)]
+    lines += ['%-8s %16.1f %15.1f' % (name, mib(m[0]), mib(m[1]))
+                for name, m in memory().items()]
+    lines += notes
+    sites = top_allocations(top)
+    if sites:
+        lines += ['', 'Top %d allocation sites:' % len(sites)]
+        lines += ['%10.1f KiB %8d blocks  %s' % (size / 1024.0, count, site)
+                    for site, size, count in sites]
+    return lines
+
+
+reset()
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
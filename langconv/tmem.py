@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+This module keeps a translation memory of source messages with a trigram
+index, and finds near matches of a message, e.g., a message with a changed
+number or an added punctuation, to reuse their translations.
+
+Messages are compared by the Jaccard similarity of their trigram sets. A
+search scans the postings of only the rarest trigrams of a message that any
+match above a threshold must share (prefix filtering), so it reads a few
+short postings instead of all messages, and compares the trigram IDs kept
+for each candidate instead of splitting its text into trigrams again.
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import re
+import math
+from array import array
+
+
+_DIGITS = re.compile(r'\d+')
+
+
+#------------------------------------------------------------------------------
+# Similarity
+#------------------------------------------------------------------------------
+
+def trigrams(text):
+    """Return the set of trigrams of a text, case-insensitive and padded, so
+    a short text has trigrams as well. Numbers are taken as "0", so texts
+    differing only in numbers have the same trigrams.
+
+    Example
+    -------
+    >>> sorted(trigrams(u'Ok'))
+    [u'  o', u' ok', u'ok ']
+    >>> trigrams(u'Page 12') == trigrams(u'page 3')
+    True
+    """
+    text = u'  %s ' % _DIGITS.sub(u'0', text.lower())
+    return set(text[i:i + 3] for i in xrange(len(text) - 2))
+
+
+def similarity(a, b):
+    """Return the Jaccard similarity of the trigram sets of two texts.
+
+    Example
+    -------
+    >>> similarity(u'Delete 3 files', u'Delete 5 files')
+    1.0
+    >>> round(similarity(u'Delete 3 files', u'Delete 3 files?'), 2)
+    0.82
+    """
+    a, b = trigrams(a), trigrams(b)
+    return len(a & b) / float(len(a | b))
+
+
+def adapt(text, src, trans):
+    """Return a translation of a text from the translation of a near match,
+    with the numbers of the match replaced by those of the text; None if the
+    texts differ in more than numbers, or the translation does not have the
+    numbers of the match in order.
+
+    Example
+    -------
+    >>> adapt(u'Delete 5 files', u'Delete 3 files', u'\\u522a\\u9664 3')
+    u'\\u522a\\u9664 5'
+    >>> adapt(u'Delete 5 files?', u'Delete 3 files', u'\\u522a\\u9664 3')
+    """
+    if _DIGITS.split(text) != _DIGITS.split(src):
+        return None
+    old, new = _DIGITS.findall(src), _DIGITS.findall(text)
+    parts = _DIGITS.split(trans)
+    if _DIGITS.findall(trans) != old:
+        return None
+    return u''.join(p + n for p, n in zip(parts, new + [u'']))
+
+
+#------------------------------------------------------------------------------
+# Index
+#------------------------------------------------------------------------------
+
+class TransMemory(object):
+    """A trigram index of distinct source texts.
+
+    Example
+    -------
+    >>> tm = TransMemory([u'Delete 3 files', u'Copy files', u'Settings'])
+    >>> [(round(s, 2), t) for s, t in tm.search(u'Delete 5 file', 0.7)]
+    [(0.81, u'Delete 3 files')]
+    >>> tm.search(u'Settings', 0.8)
+    [(1.0, u'Settings')]
+    >>> tm.search(u'Setting', 0.7), tm.search(u'Display', 0.5)
+    ([(0.7, u'Settings')], [])
+    """
+    def __init__(self, texts=()):
+        self.texts = []         # the source texts by their IDs
+        self.grams = []         # the trigram IDs of each text, an array
+        self.ids = {}           # text: ID
+        self.gram_ids = {}      # trigram: trigram ID
+        self.postings = []      # arrays of IDs of texts having each trigram
+        for text in texts:
+            self.add(text)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text):
+        """Add a source text, and return its ID.
+        """
+        if text in self.ids:
+            return self.ids[text]
+        id = self.ids[text] = len(self.texts)
+        gram_ids, postings = self.gram_ids, self.postings
+        grams = trigrams(text)
+        for g in grams:
+            if g not in gram_ids:
+                gram_ids[g] = len(postings)
+                postings += [array('i')]
+        grams = array('i', map(gram_ids.__getitem__, grams))
+        for gram in grams:
+            postings[gram].append(id)
+        self.texts += [text]
+        self.grams += [grams]
+        return id
+
+    def search(self, text, threshold=0.7):
+        """Return (similarity, source text) items of the texts whose
+        similarity to a text is not less than a threshold (0 < threshold <=
+        1), from the most similar.
+        """
+        grams = trigrams(text)
+        n = len(grams)
+        # trigrams not indexed are in no text, so they are only counted in n
+        known = set(self.gram_ids[g] for g in grams if g in self.gram_ids)
+        # a match shares at least ceil(threshold * n) trigrams of the text,
+        # so it has one of the rarest n - ceil(threshold * n) + 1 trigrams
+        least = max(int(math.ceil(threshold * n - 1e-9)), 1)
+        if len(known) < least:
+            return []
+        rarest = sorted((self.postings[g] for g in known), key=len)
+        candidates = set()
+        for ids in rarest[:len(known) - least + 1]:
+            candidates.update(ids)
+
+        low, high = threshold * n, n / threshold
+        matches = []
+        for id in candidates:
+            size = len(self.grams[id])
+            if not low - 1e-9 <= size <= high + 1e-9:
+                continue
+            common = len(known.intersection(self.grams[id]))
+            s = common / float(n + size - common)
+            if s >= threshold - 1e-9:
+                matches += [(s, self.texts[id])]
+        matches.sort(key=lambda x: (-x[0], x[1]))
+        return matches
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()
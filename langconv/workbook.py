@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+This module writes the rows of the sheets of a workbook in order, into an
+.xlsx file streamed row by row with constant memory, or into an .xls file as
+a copy of an xlrd workbook with changed cells rewritten.
+
+The XLSX File Format
+--------------------
+An .xlsx file is a ZIP archive of XML parts (Office Open XML):
+[Content_Types].xml: the content types of the parts
+_rels/.rels: the relationship to the workbook
+xl/workbook.xml: the names of the sheets
+xl/_rels/workbook.xml.rels: the relationships to the sheets and the styles
+xl/styles.xml: the default cell format
+xl/worksheets/sheetN.xml: the rows of sheet N; strings are inline strings,
+    so no shared string table is kept in memory
+"""
+__author__ = "agent <agent@local>"
+__date__ = "2026/10/19 (initial version) ~ 2026/10/19 (last revision)"
+
+import os
+import re
+import shutil
+import zipfile
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+from myutil import LineWriter
+
+
+_INVALID_XML = re.compile(u'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DOC_REL = ('http://schemas.openxmlformats.org/officeDocument/2006/'
+           'relationships')
+CONTENT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+
+
+#------------------------------------------------------------------------------
+# Cells
+#------------------------------------------------------------------------------
+
+def column_name(c):
+    """Return the name of a column of an index from zero.
+
+    Example
+    -------
+    >>> [column_name(c) for c in (0, 25, 26, 701, 702)]
+    ['A', 'Z', 'AA', 'ZZ', 'AAA']
+    """
+    name = ''
+    c += 1
+    while c:
+        c, r = divmod(c - 1, 26)
+        name = chr(ord('A') + r) + name
+    return name
+
+
+def cell_xml(ref, value):
+    """Return the XML of a cell of a reference (e.g., "B2") and a value, a
+    string or a number; an empty string for an empty cell. Chars not allowed
+    in XML are removed.
+
+    Example
+    -------
+    >>> print cell_xml('A1', u'a < b ')
+    <c r="A1" t="inlineStr"><is><t xml:space="preserve">a &lt; b </t></is></c>
+    >>> cell_xml('B1', 2.0), cell_xml('C1', True), cell_xml('D1', u'')
+    ('<c r="B1"><v>2.0</v></c>', '<c r="C1" t="b"><v>1</v></c>', '')
+    """
+    if isinstance(value, basestring):
+        if not value:
+            return ''
+        value = _INVALID_XML.sub(u'', value)
+        space = ' xml:space="preserve"' if value != value.strip() else ''
+        return u'<c r="%s" t="inlineStr"><is><t%s>%s</t></is></c>' % (
+            ref, space, escape(value))
+    if isinstance(value, bool):
+        return '<c r="%s" t="b"><v>%d</v></c>' % (ref, value)
+    value = repr(value) if isinstance(value, float) else '%d' % value
+    return '<c r="%s"><v>%s</v></c>' % (ref, value)
+
+
+#------------------------------------------------------------------------------
+# Writers
+#------------------------------------------------------------------------------
+
+class XlsxWriter(object):
+    """Write rows of sheets into an .xlsx file. The rows of a sheet are
+    streamed into a temporary file, which is compressed into the file when
+    the sheet ends, so a sheet of any size is written in constant memory.
+
+    Example
+    -------
+    >>> import xlrd
+    >>> fn = tempfile.mktemp(suffix='.xlsx')
+    >>> with XlsxWriter(fn) as writer:
+    ...     writer.add_sheet(u'dic')
+    ...     writer.write_row([u'', u'ID', u'English'])
+    ...     writer.write_row([u'x', 1.0, u'Yes & No'])
+    >>> sheet = xlrd.open_workbook(fn).sheet_by_index(0)
+    >>> sheet.name, sheet.row_values(1)
+    (u'dic', [u'x', 1.0, u'Yes & No'])
+    >>> os.remove(fn)
+    """
+    def __init__(self, fn):
+        self.fn = fn
+        self.names = []         # the names of the sheets added
+        self.refs = []          # the names of columns by their indexes
+        self.rows = 0           # the number of rows of the current sheet
+        self.sheet = None       # the LineWriter of the current sheet
+        self.tmp_dir = tempfile.mkdtemp(prefix='xlsx_')
+        self.zip_file = zipfile.ZipFile(fn, 'w', zipfile.ZIP_DEFLATED)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            if self.sheet is not None:
+                self.sheet.out_file.close()
+            self.zip_file.close()
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            os.remove(self.fn)
+
+    def add_sheet(self, name):
+        """End the current sheet, and start a sheet of a name.
+        """
+        self._end_sheet()
+        self.names += [name]
+        self.rows = 0
+        self.sheet = LineWriter(os.path.join(self.tmp_dir, 'sheet.xml'))
+        self.sheet.write_lines([XML_DECL,
+                                '<worksheet xmlns="%s"><sheetData>' % MAIN_NS])
+
+    def write_row(self, values):
+        """Write the values of the next row of the current sheet.
+        """
+        self.rows += 1
+        refs = self.refs
+        while len(refs) < len(values):
+            refs += [column_name(len(refs))]
+        r = self.rows
+        cells = ''.join(cell_xml('%s%d' % (refs[c], r), v)
+                            for c, v in enumerate(values))
+        self.sheet.write_lines(['<row r="%d">%s</row>' % (r, cells)])
+
+    def _end_sheet(self):
+        if self.sheet is None:
+            return
+        self.sheet.write_lines(['</sheetData></worksheet>'])
+        self.sheet.close()
+        self.zip_file.write(self.sheet.fn,
+                            'xl/worksheets/sheet%d.xml' % len(self.names))
+        os.remove(self.sheet.fn)
+        self.sheet = None
+
+    def close(self):
+        """End the current sheet, and write the parts of the workbook.
+        """
+        if not self.names:
+            self.add_sheet(u'Sheet1')
+        self._end_sheet()
+        n = len(self.names)
+        parts = [
+            ('[Content_Types].xml', [
+                '<Types xmlns="%s">' % CONTENT_NS,
+                '<Default Extension="rels" ContentType="application/'
+                'vnd.openxmlformats-package.relationships+xml"/>',
+                '<Default Extension="xml" ContentType="application/xml"/>',
+                '<Override PartName="/xl/workbook.xml" ContentType="%s'
+                'sheet.main+xml"/>' % CONTENT_TYPE,
+                '<Override PartName="/xl/styles.xml" ContentType="%s'
+                'styles+xml"/>' % CONTENT_TYPE] +
+                ['<Override PartName="/xl/worksheets/sheet%d.xml" '
+                 'ContentType="%sworksheet+xml"/>' % (i, CONTENT_TYPE)
+                    for i in xrange(1, n + 1)] +
+                ['</Types>']),
+            ('_rels/.rels', [
+                '<Relationships xmlns="%s">' % REL_NS,
+                '<Relationship Id="rId1" Type="%s/officeDocument" '
+                'Target="xl/workbook.xml"/>' % DOC_REL,
+                '</Relationships>']),
+            ('xl/workbook.xml', [
+                '<workbook xmlns="%s" xmlns:r="%s"><sheets>'
+                    % (MAIN_NS, DOC_REL)] +
+                [u'<sheet name=%s sheetId="%d" r:id="rId%d"/>'
+                    % (quoteattr(name), i, i)
+                    for i, name in enumerate(self.names, 1)] +
+                ['</sheets></workbook>']),
+            ('xl/_rels/workbook.xml.rels', [
+                '<Relationships xmlns="%s">' % REL_NS] +
+                ['<Relationship Id="rId%d" Type="%s/worksheet" '
+                 'Target="worksheets/sheet%d.xml"/>' % (i, DOC_REL, i)
+                    for i in xrange(1, n + 1)] +
+                ['<Relationship Id="rId%d" Type="%s/styles" '
+                 'Target="styles.xml"/>' % (n + 1, DOC_REL),
+                 '</Relationships>']),
+            ('xl/styles.xml', [
+                '<styleSheet xmlns="%s">' % MAIN_NS,
+                '<fonts count="1"><font><sz val="11"/><name val="Calibri"/>'
+                '</font></fonts>',
+                '<fills count="1"><fill><patternFill patternType="none"/>'
+                '</fill></fills>',
+                '<borders count="1"><border/></borders>',
+                '<cellStyleXfs count="1"><xf/></cellStyleXfs>',
+                '<cellXfs count="1"><xf/></cellXfs>',
+                '</styleSheet>']),
+        ]
+        for name, lines in parts:
+            self.zip_file.writestr(name, u''.join([XML_DECL] + lines)
+                                            .encode('utf-8'))
+        self.zip_file.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class XlsWriter(object):
+    """Write rows of the sheets of an xlrd workbook into an .xls file as a
+    copy of the workbook (made by xlutils). Sheets are added in the order of
+    the workbook, and only cells whose values differ from those of the
+    workbook are written.
+    """
+    def __init__(self, fn, book):
+        import xlutils.copy
+
+        self.fn = fn
+        self.book = book
+        self.copy = xlutils.copy.copy(book)
+        self.index = -1         # the index of the current sheet
+        self.rows = 0           # the number of rows of the current sheet
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def add_sheet(self, name):
+        """Start the next sheet of the workbook.
+        """
+        self.index += 1
+        self.rows = 0
+
+    def write_row(self, values):
+        """Write the values of the next row of the current sheet.
+        """
+        src = self.book.sheet_by_index(self.index)
+        dest = self.copy.get_sheet(self.index)
+        r = self.rows
+        old = src.row_values(r) if r < src.nrows else []
+        for c, v in enumerate(values):
+            if c >= len(old) or v != old[c]:
+                dest.write(r, c, v)
+        self.rows += 1
+
+    def close(self):
+        """Save the copy of the workbook.
+        """
+        self.copy.save(self.fn)
+
+
+def open_writer(fn, book):
+    """Return a writer of rows of the sheets of an xlrd workbook into a file:
+    an XlsxWriter for an .xlsx file, or an XlsWriter otherwise.
+    """
+    if os.path.splitext(fn)[1].lower() == '.xlsx':
+        return XlsxWriter(fn)
+    return XlsWriter(fn, book)
+
+
+#------------------------------------------------------------------------------
+# Test
+#------------------------------------------------------------------------------
+
+def main():
+    import doctest
+    doctest.testmod()
+
+if __name__ == '__main__':
+    main()